@@ -0,0 +1,201 @@
+"""
+Module Name: Annotation_journal.py
+
+Description:
+    This module saves edits to an annotation file as a journal instead of writing the
+    whole file again. The journal is a JSON lines file next to the annotation file (the
+    file name followed by ".journal"), to which each save appends one line per edit:
+
+        {"frame": 12, "box": 3, "field": "y1", "delta": -10}
+        {"frame": 12, "box": 3, "field": "class", "value": "car"}
+        {"rows": [40, 41], "field": "objectID", "values": [7, 7]}
+
+    An edit addresses its boxes by frame and index within the frame, or by their rows in
+    the AnnotationStore, and either shifts a coordinate by `delta` or sets a field to
+    `value`, or to one of `values` for each row. Appending costs as much as the edits
+    being saved, whatever the size of the annotations.
+
+    The first line of a journal records the size and modification time of the annotation
+    file it applies to. Loading an annotation file replays its journal onto it, unless the
+    file has changed since, in which case the journal was written for an older version of
+    it and is ignored. A journal is compacted by writing the annotations with its edits
+    replayed to a temporary file, which atomically replaces the annotation file, and then
+    removing the journal. If the process stops in between, the replaced file no longer
+    matches the journal, so its edits are not applied twice. Lines are flushed to disk as
+    they are written, and a line cut short by a crash is ignored.
+
+Usage:
+    Append edits with AnnotationJournal.append(), load an annotation file with the edits of
+    its journal with load_journaled() and fold the journal into the file with compact_journal().
+    ObjManager.writeChanges() journals its edits and compacts them once there are many.
+
+Dependencies:
+    - json
+    - os
+    - Annotation_store: custom
+
+Author: team 120
+Date: 17/10/2026
+"""
+
+import sys
+import os
+#Used for testing:
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import json
+from Annotation_store import BOX_COORDS, load_annotations, save_annotations
+
+JOURNAL_SUFFIX = ".journal"
+
+class AnnotationJournal:
+    """
+    The journal of edits saved to an annotation file since it was last written in full.
+
+    Attributes:
+        file_path (str): The path of the annotation file.
+        entry_count (int): The number of edits in the journal.
+    """
+
+    def __init__(self, file_path):
+        """
+        Open the journal of an annotation file, which may not exist yet.
+
+        Args:
+            file_path (str): The path of the annotation file.
+        """
+        self.file_path = file_path
+        self.entry_count = len(read_journal(file_path))
+
+    def append(self, entries):
+        """
+        Append edits to the journal, starting it if the annotation file has none.
+
+        Args:
+            entries (list): The edits, as dictionaries in the journal's format.
+        """
+        if not entries:
+            return
+        path = journal_path(self.file_path)
+        lines = [json.dumps(entry) + "\n" for entry in entries]
+        if self.entry_count == 0 or not os.path.exists(path):
+            # A new journal, or one left for an older version of the annotation file
+            lines.insert(0, json.dumps(_base_stamp(self.file_path)) + "\n")
+            mode = "w"
+        else:
+            mode = "a"
+        with open(path, mode) as journal_file:
+            journal_file.writelines(lines)
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+        self.entry_count += len(entries)
+
+    def clear(self):
+        """
+        Remove the journal, once its edits are in the annotation file.
+        """
+        remove_journal(self.file_path)
+        self.entry_count = 0
+
+def journal_path(file_path):
+    return str(file_path) + JOURNAL_SUFFIX
+
+def remove_journal(file_path):
+    try:
+        os.remove(journal_path(file_path))
+    except FileNotFoundError:
+        pass
+
+def read_journal(file_path):
+    """
+    Read the edits journaled for an annotation file.
+
+    Args:
+        file_path (str): The path of the annotation file.
+
+    Returns:
+        list: The edits, or an empty list if there is no journal or it was written for an
+            older version of the annotation file.
+    """
+    try:
+        with open(journal_path(file_path)) as journal_file:
+            lines = journal_file.readlines()
+    except FileNotFoundError:
+        return []
+    if not lines or not lines[-1].endswith("\n"):
+        lines = lines[:-1] # Cut short while being written
+    try:
+        if not lines or json.loads(lines[0]) != _base_stamp(file_path):
+            return []
+    except (json.JSONDecodeError, FileNotFoundError):
+        return []
+    return [json.loads(line) for line in lines[1:]]
+
+def apply_entries(store, entries):
+    """
+    Apply journaled edits to an AnnotationStore, in order.
+
+    Args:
+        store (AnnotationStore): The annotations to edit.
+        entries (list): The edits, as dictionaries in the journal's format.
+    """
+    for entry in entries:
+        rows = entry["rows"] if "rows" in entry else [store.row(entry["frame"], entry["box"])]
+        values = entry["values"] if "values" in entry else [entry.get("value")] * len(rows)
+        field = entry["field"]
+        if field in BOX_COORDS:
+            column = BOX_COORDS.index(field)
+            if "delta" in entry:
+                store.boxes[rows, column] += entry["delta"]
+            else:
+                store.boxes[rows, column] = values
+        elif field in ("class", "objectID"):
+            set_rows = store.set_classes if field == "class" else store.set_object_ids
+            # One bulk update for each distinct value
+            rows_of_value = {}
+            for row, value in zip(rows, values):
+                rows_of_value.setdefault(value, []).append(row)
+            for value, value_rows in rows_of_value.items():
+                set_rows(value_rows, value)
+        else:
+            raise ValueError(f"Unknown field '{field}' in annotation journal")
+
+def load_journaled(file_path):
+    """
+    Load an annotation file with the edits of its journal applied.
+
+    Args:
+        file_path (str): The path of a JSON or .npz annotation file.
+
+    Returns:
+        AnnotationStore: The annotations.
+
+    Raises:
+        FileNotFoundError: If the annotation file does not exist.
+    """
+    store = load_annotations(file_path)
+    apply_entries(store, read_journal(file_path))
+    return store
+
+def compact_journal(file_path):
+    """
+    Write the edits of an annotation file's journal into the file and remove the journal.
+
+    Args:
+        file_path (str): The path of a JSON or .npz annotation file.
+
+    Returns:
+        bool: Whether there were edits to write.
+    """
+    entries = read_journal(file_path)
+    if entries:
+        store = load_annotations(file_path)
+        apply_entries(store, entries)
+        save_annotations(store, file_path)
+        print(f"[Annotation_journal] compacted {len(entries)} edits into {file_path}")
+    remove_journal(file_path)
+    return bool(entries)
+
+def _base_stamp(file_path):
+    stat = os.stat(file_path)
+    return {"base_size": stat.st_size, "base_mtime_ns": stat.st_mtime_ns}
@@ -0,0 +1,472 @@
+"""
+Module Name: Annotation_store.py
+
+Description:
+    This module keeps the annotations of a video in columns instead of one dictionary per
+    bounding box. Each field is a NumPy array with one row per annotation, ordered by
+    frame, and an array of frame offsets marks where each frame's rows start. Class names
+    and object IDs are interned: each distinct value is stored once and the rows hold an
+    integer code. The store also keeps an inverted index from each class and each object
+    ID to the sorted rows holding it, updated as annotations are relabelled or re-IDed,
+    so that filtering by class or object only touches the matching rows.
+
+    The annotation dictionaries used by the UI and written to JSON are only built when
+    they are read, one frame at a time, through an AnnotationView. A view always reflects
+    the current content of the store, so edits made through the store are seen by every
+    view of it without copying.
+
+    A store can be saved as a compressed NumPy (.npz) file holding its columns, a compact
+    alternative to the JSON annotation files that loads without parsing any text.
+    load_annotations() reads either format, so callers do not need to know which one a
+    video's annotations were saved in.
+
+Usage:
+    Build an AnnotationStore from JSON annotations with AnnotationStore.from_frames(),
+    read a frame with store.frame_annotations(), or wrap it in an AnnotationView that can
+    be indexed like the list of per-frame annotation lists. Export with to_frames().
+    Save to and load from either format with save_annotations() and load_annotations().
+
+Dependencies:
+    - json: For the JSON annotation files.
+    - os
+    - NumPy
+
+Author: team 120
+Date: 17/10/2026
+"""
+
+import json
+import os
+import numpy as np
+
+ANNOTATION_EXTENSIONS = (".json", ".npz")
+BOX_COORDS = ("x1", "y1", "x2", "y2") # Columns of `boxes`
+COLOUR_CHANNELS = ("B", "G", "R") # Columns of `colours`
+
+class AnnotationStore:
+    """
+    The annotations of every frame of a video, stored as columns.
+
+    Attributes:
+        frame_offsets (np.ndarray): The first row of each frame, followed by the number of rows.
+        boxes (np.ndarray): An (N, 4) array of boxes in the format (x1, y1, x2, y2).
+        colours (np.ndarray): An (N, 3) array of (B, G, R) display colours.
+        confidences (np.ndarray): The confidence of each annotation.
+        class_codes (np.ndarray): The index of each annotation's class in `classes`.
+        object_codes (np.ndarray): The index of each annotation's object ID in `object_ids`.
+        interpolated (np.ndarray): Whether each box was estimated between keyframes.
+        classes (list): The distinct class names.
+        object_ids (list): The distinct object IDs, as they appear in the annotations (int or str).
+        confidence_as_text (bool): Whether confidences are written as strings, as `Tracker.frame_annotations` does.
+        class_index (dict): Maps each class code to the sorted array of rows of that class.
+        object_index (dict): Maps each object code to the sorted array of rows of that object.
+    """
+
+    def __init__(self, frame_offsets, boxes, colours, confidences, class_codes, object_codes, interpolated,
+                 classes, object_ids, confidence_as_text=True):
+        self.frame_offsets = frame_offsets
+        self.boxes = boxes
+        self.colours = colours
+        self.confidences = confidences
+        self.class_codes = class_codes
+        self.object_codes = object_codes
+        self.interpolated = interpolated
+        self.classes = classes
+        self.object_ids = object_ids
+        self.class_lookup = {name: code for code, name in enumerate(classes)}
+        self.object_lookup = {object_id: code for code, object_id in enumerate(object_ids)}
+        self.confidence_as_text = confidence_as_text
+        self.class_index = _inverted_index(class_codes, len(classes))
+        self.object_index = _inverted_index(object_codes, len(object_ids))
+
+    @classmethod
+    def from_frames(cls, frames_annotations):
+        """
+        Build a store from annotations in the JSON format.
+
+        Args:
+            frames_annotations (list): The list of annotation dictionaries of each frame,
+                as written by `ObjectTracking.media_capture`.
+
+        Returns:
+            AnnotationStore: The store holding the same annotations. Keys other than those
+                written by the tracker are not kept.
+        """
+        counts = [len(frame) for frame in frames_annotations]
+        frame_offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=frame_offsets[1:])
+
+        annotations = [annotation for frame in frames_annotations for annotation in frame]
+        classes, class_codes = _intern([annotation["class"] for annotation in annotations])
+        object_ids, object_codes = _intern([annotation["objectID"] for annotation in annotations])
+        boxes = np.array([[annotation["bounding_box"][coord] for coord in BOX_COORDS] for annotation in annotations],
+                         dtype=np.int32).reshape(-1, 4)
+        colours = np.array([[annotation["colours"][channel] for channel in COLOUR_CHANNELS] for annotation in annotations],
+                           dtype=np.uint8).reshape(-1, 3)
+        confidences = np.array([float(annotation["confidence"]) for annotation in annotations], dtype=np.float32)
+        interpolated = np.array([annotation.get("interpolated", False) for annotation in annotations], dtype=bool)
+        confidence_as_text = not annotations or isinstance(annotations[0]["confidence"], str)
+
+        return cls(frame_offsets, boxes, colours, confidences, class_codes, object_codes, interpolated,
+                   classes, object_ids, confidence_as_text)
+
+    def __len__(self):
+        return len(self.frame_offsets) - 1
+
+    def frame_rows(self, frame_index):
+        """
+        Get the rows of a frame.
+
+        Args:
+            frame_index (int): The index of the frame.
+
+        Returns:
+            range: The rows holding the annotations of the frame, in their order within the frame.
+        """
+        return range(self.frame_offsets[frame_index], self.frame_offsets[frame_index + 1])
+
+    def row(self, frame_index, box_index):
+        # Row of the box_index-th annotation of a frame
+        return int(self.frame_offsets[frame_index]) + box_index
+
+    def class_code(self, class_name):
+        """
+        Get the code of a class name, adding it to `classes` if it is new.
+
+        Args:
+            class_name (str): The class name.
+
+        Returns:
+            int: The index of the class in `classes`.
+        """
+        if class_name not in self.class_lookup:
+            self.class_lookup[class_name] = len(self.classes)
+            self.class_index[len(self.classes)] = np.zeros(0, dtype=np.int64)
+            self.classes.append(class_name)
+        return self.class_lookup[class_name]
+
+    def object_code(self, object_id):
+        """
+        Get the code of an object ID, adding it to `object_ids` if it is new.
+
+        Args:
+            object_id (int or str): The object ID.
+
+        Returns:
+            int: The index of the object ID in `object_ids`.
+        """
+        if object_id not in self.object_lookup:
+            self.object_lookup[object_id] = len(self.object_ids)
+            self.object_index[len(self.object_ids)] = np.zeros(0, dtype=np.int64)
+            self.object_ids.append(object_id)
+        return self.object_lookup[object_id]
+
+    def class_rows(self, class_name):
+        """
+        Get the rows of a class from the index.
+
+        Args:
+            class_name (str): The class name.
+
+        Returns:
+            np.ndarray: The sorted rows of the class, empty if the class does not appear.
+        """
+        return self.class_index.get(self.class_lookup.get(class_name), np.zeros(0, dtype=np.int64))
+
+    def object_rows(self, object_id):
+        """
+        Get the rows of an object ID from the index.
+
+        Args:
+            object_id (int or str): The object ID.
+
+        Returns:
+            np.ndarray: The sorted rows of the object, empty if the ID does not appear.
+        """
+        return self.object_index.get(self.object_lookup.get(object_id), np.zeros(0, dtype=np.int64))
+
+    def set_class(self, row, class_name):
+        """
+        Relabel an annotation, keeping the class index up to date.
+
+        Args:
+            row (int): The row of the annotation.
+            class_name (str): The new class name.
+        """
+        code = self.class_code(class_name)
+        _move_row(self.class_index, int(self.class_codes[row]), code, row)
+        self.class_codes[row] = code
+
+    def set_object_id(self, row, object_id):
+        """
+        Change the object ID of an annotation, keeping the object index up to date.
+
+        Args:
+            row (int): The row of the annotation.
+            object_id (int or str): The new object ID.
+        """
+        code = self.object_code(object_id)
+        _move_row(self.object_index, int(self.object_codes[row]), code, row)
+        self.object_codes[row] = code
+
+    def set_classes(self, rows, class_name):
+        """
+        Relabel many annotations at once, keeping the class index up to date.
+
+        Args:
+            rows (np.ndarray): The distinct rows of the annotations.
+            class_name (str): The new class name.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        code = self.class_code(class_name)
+        _move_rows(self.class_index, self.class_codes[rows], code, rows)
+        self.class_codes[rows] = code
+
+    def set_object_ids(self, rows, object_id):
+        """
+        Change the object ID of many annotations at once, keeping the object index up to date.
+
+        Args:
+            rows (np.ndarray): The distinct rows of the annotations.
+            object_id (int or str): The new object ID.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        code = self.object_code(object_id)
+        _move_rows(self.object_index, self.object_codes[rows], code, rows)
+        self.object_codes[rows] = code
+
+    def rows_in_frames(self, rows, start_frame=None, end_frame=None):
+        """
+        Keep the rows that belong to a range of frames.
+
+        Args:
+            rows (np.ndarray): Sorted rows, such as those of a class or object from the index.
+            start_frame (int): The first frame of the range, by default the first frame.
+            end_frame (int): The last frame of the range, included, by default the last frame.
+
+        Returns:
+            np.ndarray: The rows within the frames.
+        """
+        start = self.frame_offsets[0 if start_frame is None else start_frame]
+        stop = self.frame_offsets[len(self) if end_frame is None else end_frame + 1]
+        return rows[np.searchsorted(rows, start):np.searchsorted(rows, stop)]
+
+    def row_frames(self, rows):
+        # Frame index of each row
+        return np.searchsorted(self.frame_offsets, rows, side="right") - 1
+
+    def find_object(self, frame_index, object_id):
+        """
+        Find the box of an object in a frame with the object index.
+
+        Args:
+            frame_index (int): The index of the frame.
+            object_id (int or str): The object ID.
+
+        Returns:
+            int: The index of the object's first box within the frame, or -1 if it is not in the frame.
+        """
+        rows = self.object_rows(object_id)
+        start, stop = self.frame_offsets[frame_index], self.frame_offsets[frame_index + 1]
+        position = np.searchsorted(rows, start)
+        if position < len(rows) and rows[position] < stop:
+            return int(rows[position] - start)
+        return -1
+
+    def frame_annotations(self, frame_index, rows=None):
+        """
+        Build the annotation dictionaries of a frame.
+
+        Args:
+            frame_index (int): The index of the frame.
+            rows (iterable): The rows of the frame to include, by default all of them.
+
+        Returns:
+            list: The annotation dictionaries in the JSON format, in their order within the frame.
+        """
+        rows = self.frame_rows(frame_index) if rows is None else rows
+        return [self.annotation(row) for row in rows]
+
+    def annotation(self, row):
+        """
+        Build the annotation dictionary of a row.
+
+        Args:
+            row (int): The row of the annotation.
+
+        Returns:
+            dict: The annotation with the keys "class", "confidence", "objectID", "colours"
+                  and "bounding_box", and "interpolated" if the box was estimated.
+        """
+        confidence = self.confidences[row]
+        B, G, R = self.colours[row].tolist()
+        x1, y1, x2, y2 = self.boxes[row].tolist()
+        annotation = {
+            "class": self.classes[self.class_codes[row]],
+            "confidence": str(confidence) if self.confidence_as_text else float(confidence),
+            "objectID": self.object_ids[self.object_codes[row]],
+            "colours": {"B": B, "G": G, "R": R},
+            "bounding_box": {"x1": x1, "y1": y1, "x2": x2, "y2": y2},
+        }
+        if self.interpolated[row]:
+            annotation["interpolated"] = True
+        return annotation
+
+    def to_frames(self):
+        """
+        Export the annotations in the JSON format.
+
+        Returns:
+            list: The list of annotation dictionaries of each frame.
+        """
+        return [self.frame_annotations(frame_index) for frame_index in range(len(self))]
+
+    def save(self, file_path):
+        """
+        Save the columns of the store to a compressed .npz file.
+
+        The file is written under a temporary name and then renamed, so that an
+        interrupted save never leaves a truncated file behind.
+
+        Args:
+            file_path (str): The path of the .npz file.
+        """
+        temporary_path = str(file_path) + ".tmp"
+        with open(temporary_path, "wb") as annotation_file:
+            np.savez_compressed(annotation_file,
+                                frame_offsets=self.frame_offsets, boxes=self.boxes, colours=self.colours,
+                                confidences=self.confidences, class_codes=self.class_codes,
+                                object_codes=self.object_codes, interpolated=self.interpolated,
+                                classes=np.array(self.classes, dtype=str),
+                                # Object IDs can be ints or strings, their type is kept alongside
+                                object_ids=np.array([str(object_id) for object_id in self.object_ids], dtype=str),
+                                object_id_is_text=np.array([isinstance(object_id, str) for object_id in self.object_ids], dtype=bool),
+                                confidence_as_text=np.array(self.confidence_as_text))
+        os.replace(temporary_path, file_path)
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Load a store saved with `save`.
+
+        Args:
+            file_path (str): The path of the .npz file.
+
+        Returns:
+            AnnotationStore: The loaded store.
+        """
+        with np.load(file_path) as arrays:
+            object_ids = [object_id if is_text else int(object_id)
+                          for object_id, is_text in zip(arrays["object_ids"].tolist(), arrays["object_id_is_text"].tolist())]
+            return cls(arrays["frame_offsets"], arrays["boxes"], arrays["colours"], arrays["confidences"],
+                       arrays["class_codes"], arrays["object_codes"], arrays["interpolated"],
+                       arrays["classes"].tolist(), object_ids, bool(arrays["confidence_as_text"]))
+
+class AnnotationView:
+    """
+    A read-only list of per-frame annotation lists, built from a store as frames are read.
+
+    Attributes:
+        store (AnnotationStore): The store holding the annotations.
+        rows (np.ndarray): The sorted rows of the store included in the view, or None for every row.
+    """
+
+    def __init__(self, store, rows=None):
+        self.store = store
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.store)
+
+    def __getitem__(self, frame_index):
+        if frame_index < 0:
+            frame_index += len(self.store)
+        if not 0 <= frame_index < len(self.store):
+            raise IndexError(f"Frame {frame_index} is out of range for {len(self.store)} frames")
+        rows = self.store.frame_rows(frame_index)
+        if self.rows is not None:
+            start, stop = np.searchsorted(self.rows, (rows.start, rows.stop))
+            rows = self.rows[start:stop].tolist()
+        return self.store.frame_annotations(frame_index, rows)
+
+    def __iter__(self):
+        for frame_index in range(len(self.store)):
+            yield self[frame_index]
+
+def _inverted_index(codes, code_count):
+    # Sorted rows of each code
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(code_count + 1))
+    return {code: order[bounds[code]:bounds[code + 1]].astype(np.int64) for code in range(code_count)}
+
+def _move_row(index, old_code, new_code, row):
+    # Arrays are replaced rather than changed, so views holding them keep their rows
+    rows = index[old_code]
+    index[old_code] = np.delete(rows, np.searchsorted(rows, row))
+    rows = index[new_code]
+    index[new_code] = np.insert(rows, np.searchsorted(rows, row), row)
+
+def _move_rows(index, old_codes, new_code, rows):
+    # Bulk _move_row, each old code's array is rebuilt once
+    for old_code in np.unique(old_codes).tolist():
+        index[old_code] = np.setdiff1d(index[old_code], rows[old_codes == old_code], assume_unique=True)
+    index[new_code] = np.union1d(index[new_code], rows)
+
+def _intern(values):
+    # Distinct values in order of first appearance, and the code of each value
+    lookup = {}
+    codes = np.array([lookup.setdefault(value, len(lookup)) for value in values], dtype=np.int32)
+    return list(lookup), codes
+
+def find_annotations(directory, stem):
+    """
+    Find the annotation file of a video, in whichever format it was saved.
+
+    Args:
+        directory (str): The directory holding annotation files.
+        stem (str): The file name of the video without its extension.
+
+    Returns:
+        Path: The most recently saved annotation file of the video, or its JSON path if there is none.
+    """
+    candidates = [os.path.join(directory, stem + extension) for extension in ANNOTATION_EXTENSIONS]
+    existing = [path for path in candidates if os.path.exists(path)]
+    return max(existing, key=os.path.getmtime) if existing else candidates[0]
+
+def load_annotations(file_path):
+    """
+    Load the annotations of a video from a JSON or .npz file.
+
+    Args:
+        file_path (str): The path of the annotation file.
+
+    Returns:
+        AnnotationStore: The annotations.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    if str(file_path).endswith(".npz"):
+        return AnnotationStore.load(file_path)
+    with open(file_path, "r") as json_file:
+        return AnnotationStore.from_frames(json.load(json_file))
+
+def save_annotations(annotations, file_path):
+    """
+    Save the annotations of a video, as .npz if the path ends with .npz and as JSON otherwise.
+
+    Args:
+        annotations (AnnotationStore or list): The annotations, as a store or as the list of
+            annotation dictionaries of each frame.
+        file_path (str): The path of the annotation file.
+    """
+    if str(file_path).endswith(".npz"):
+        store = annotations if isinstance(annotations, AnnotationStore) else AnnotationStore.from_frames(annotations)
+        store.save(file_path)
+    else:
+        frames_annotations = annotations.to_frames() if isinstance(annotations, AnnotationStore) else annotations
+        # Written beside the file and renamed over it, so it is never left half written
+        temporary_path = str(file_path) + ".tmp"
+        with open(temporary_path, "w") as json_file:
+            json.dump(frames_annotations, json_file, indent=4)
+        os.replace(temporary_path, file_path)
@@ -0,0 +1,408 @@
+"""
+Module Name: Annotation_stream.py
+
+Description:
+    This module writes the annotations of a video to a JSON file one frame at a time, as
+    they are produced, instead of dumping the whole list once the video is finished. Each
+    frame's annotations take one line, prefixed with the "[" that opens the array for the
+    first frame and with a "," for the others, and the closing "]" is written last:
+
+        [[{...}, {...}]
+        ,[{...}]
+        ]
+
+    A closed file is a regular JSON annotation file. Every line is flushed as soon as it
+    is written, so a frame is committed once its line ends with a newline. If the writing
+    process stops early, the file can be resumed: the lines after the last committed frame
+    are cut off and writing continues from the next frame. Only files in this layout can be
+    resumed; an annotation file saved in another layout is never cut off.
+
+    A resumed tracking run starts with a new tracker, so its object IDs are continued from
+    the committed frames: objects of its first frame that match an object of the last
+    committed frame, by class and box position, take over its ID, and the others are
+    numbered after the largest committed ID.
+
+    An annotation file ending with .npz is streamed the same way to a JSON file beside it
+    (the file name followed by ".part"), which is converted to the compact .npz format of
+    Annotation_store when the writer is closed and then removed. An interrupted run leaves
+    the ".part" file, from which it can be resumed.
+
+    Each annotation file can have an index sidecar (the file name followed by ".idx")
+    holding the byte range of every frame, which the writer saves when it closes a file
+    and LazyAnnotations builds for any other JSON annotation file the first time it is
+    opened. With it, the annotations of a frame are read by seeking straight to them, so
+    opening a long annotation file does not wait for the whole file to be parsed.
+
+Usage:
+    Open an AnnotationWriter, write() the annotations of each frame and close() it, or use
+    it as a context manager, which leaves the file open for resuming if an error occurs.
+    See ObjectTracking.media_capture_to_file() for a resumable analysis of a whole video.
+    Index a LazyAnnotations like the list of per-frame annotations, or use open_annotations()
+    to read a JSON or .npz annotation file without loading it all first.
+
+Dependencies:
+    - json
+    - os
+    - NumPy
+    - Box_geometry: custom
+    - Association: custom
+    - Annotation_store: custom
+
+Author: team 120
+Date: 17/10/2026
+"""
+
+import sys
+import os
+#Used for testing:
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import json
+from collections import OrderedDict
+import numpy as np
+from Box_geometry import iou_matrix, centroid_distance_matrix, class_match_matrix, association_gate
+from Association import association_cost, associate
+from Annotation_store import AnnotationStore, AnnotationView, load_annotations, save_annotations
+
+PART_SUFFIX = ".part" # Added to a .npz path for the JSON file its annotations are streamed to
+
+class AnnotationWriter:
+    """
+    Appends the annotations of each frame of a video to a JSON file, converted to .npz on close if asked for.
+
+    Attributes:
+        file_path (str): The path of the annotation file, JSON or .npz.
+        stream_path (str): The path of the JSON file written frame by frame, `file_path` unless 
+            it is a .npz file.
+        frame_count (int): The number of frames committed to the file.
+        last_frame (list): The annotations of the last committed frame.
+        max_object_id (int): The largest integer object ID committed, -1 if there is none.
+    """
+
+    def __init__(self, file_path, resume=False):
+        """
+        Open the file for writing.
+
+        Args:
+            file_path (str): The path of the annotation file, written as .npz if it ends with .npz 
+                and as JSON otherwise.
+            resume (bool): Whether to keep the frames already committed to an existing file
+                and continue after them, instead of starting a new file.
+
+        Raises:
+            ValueError: If `resume` is set and the existing file is not in the layout written
+                by an AnnotationWriter, such as an indented JSON file or a finished .npz file. 
+                It is left unchanged.
+        """
+        self.file_path = file_path
+        self.stream_path = str(file_path) + PART_SUFFIX if str(file_path).endswith(".npz") else file_path
+        self.frame_count = 0
+        self.last_frame = []
+        self.max_object_id = -1
+        self.frame_ranges = [] # (start, end) byte range of each committed frame
+
+        if resume and self.stream_path != file_path and os.path.exists(file_path):
+            raise ValueError(f"{file_path} is already written and cannot be resumed")
+        if resume and os.path.exists(self.stream_path):
+            committed_size = self._read_committed()
+            self.file = open(self.stream_path, "r+b")
+            self.file.truncate(committed_size)
+            self.file.seek(committed_size)
+            print(f"[AnnotationWriter] Resuming {self.stream_path} after {self.frame_count} frames")
+        else:
+            self.file = open(self.stream_path, "wb")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            # Leave the array open so that the file can be resumed
+            self.file.close()
+
+    def write(self, frame_annotations):
+        """
+        Commit the annotations of the next frame.
+
+        Args:
+            frame_annotations (list): The annotation dictionaries of the frame.
+        """
+        line = json.dumps(frame_annotations, separators=(",", ":")).encode()
+        start = self.file.tell() + 1 # After the "[" or ","
+        self.file.write(("[" if self.frame_count == 0 else ",").encode() + line + b"\n")
+        self.file.flush()
+        self._committed(frame_annotations, start, start + len(line))
+
+    def close(self):
+        """
+        Close the JSON array and the file, and convert it if the annotation file is a .npz file.
+        """
+        if self.frame_count == 0:
+            self.file.write(b"[")
+        self.file.write(b"]\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        if self.stream_path == self.file_path:
+            save_frame_index(self.file_path, self.frame_ranges)
+        else:
+            save_annotations(load_annotations(self.stream_path), self.file_path)
+            os.remove(self.stream_path)
+
+    def _committed(self, frame_annotations, start, end):
+        self.frame_ranges.append((start, end))
+        self.frame_count += 1
+        self.last_frame = frame_annotations
+        for annotation in frame_annotations:
+            try:
+                self.max_object_id = max(self.max_object_id, int(annotation["objectID"]))
+            except ValueError:
+                pass
+
+    def _read_committed(self):
+        # Size of the committed lines of an existing file, which must have been written by an AnnotationWriter
+        committed_size = 0
+        with open(self.stream_path, "rb") as annotation_file:
+            for line in annotation_file:
+                if not line.endswith(b"\n") or line[:1] != (b"[" if self.frame_count == 0 else b","):
+                    break
+                try:
+                    frame_annotations = json.loads(line[1:])
+                except ValueError:
+                    break
+                if not isinstance(frame_annotations, list):
+                    break
+                self._committed(frame_annotations, committed_size + 1, committed_size + len(line) - 1)
+                committed_size += len(line)
+            annotation_file.seek(committed_size)
+            rest = annotation_file.read()
+        # After the committed lines, only a line cut short or the end of a closed file can follow
+        closing = b"[]\n" if committed_size == 0 else b"]\n"
+        if b"\n" in rest and rest != closing:
+            raise ValueError(f"{self.stream_path} was not written by an AnnotationWriter and cannot be resumed")
+        return committed_size
+
+class LazyAnnotations:
+    """
+    A read-only list of the per-frame annotations of a JSON file, read from disk as frames are requested.
+
+    Frames are read and parsed in chunks of consecutive frames, the most recently used
+    of which are kept in memory.
+
+    Attributes:
+        json_path (str): The path of the JSON annotation file.
+        frame_ranges (np.ndarray): An (F, 2) array of the byte range of each frame in the file.
+        chunk_frames (int): The number of consecutive frames read at a time.
+        cached_chunks (int): The number of chunks kept in memory.
+    """
+
+    def __init__(self, json_path, chunk_frames=64, cached_chunks=16):
+        """
+        Open an annotation file, building its index sidecar if it has none or it is out of date.
+
+        Args:
+            json_path (str): The path of the JSON annotation file.
+            chunk_frames (int): The number of consecutive frames read at a time.
+            cached_chunks (int): The number of chunks kept in memory.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        self.json_path = json_path
+        self.frame_ranges = load_frame_index(json_path)
+        if self.frame_ranges is None:
+            self.frame_ranges = index_frames(json_path)
+            save_frame_index(json_path, self.frame_ranges)
+        self.chunk_frames = chunk_frames
+        self.cached_chunks = cached_chunks
+        self.chunks = OrderedDict() # Chunk index -> parsed frames, least recently used first
+
+    def __len__(self):
+        return len(self.frame_ranges)
+
+    def __getitem__(self, frame_index):
+        if frame_index < 0:
+            frame_index += len(self)
+        if not 0 <= frame_index < len(self):
+            raise IndexError(f"Frame {frame_index} is out of range for {len(self)} frames")
+        chunk, offset = divmod(frame_index, self.chunk_frames)
+        if chunk in self.chunks:
+            self.chunks.move_to_end(chunk)
+        else:
+            self.chunks[chunk] = self._read_chunk(chunk)
+            if len(self.chunks) > self.cached_chunks:
+                self.chunks.popitem(last=False)
+        return self.chunks[chunk][offset]
+
+    def __iter__(self):
+        for frame_index in range(len(self)):
+            yield self[frame_index]
+
+    def _read_chunk(self, chunk):
+        ranges = self.frame_ranges[chunk * self.chunk_frames:(chunk + 1) * self.chunk_frames]
+        base = int(ranges[0, 0])
+        with open(self.json_path, "rb") as json_file:
+            json_file.seek(base)
+            data = json_file.read(int(ranges[-1, 1]) - base)
+        return [json.loads(data[start - base:end - base]) for start, end in ranges.tolist()]
+
+def index_path(json_path):
+    return str(json_path) + ".idx"
+
+def save_frame_index(json_path, frame_ranges):
+    """
+    Save the byte range of each frame of an annotation file to its index sidecar.
+
+    The size and modification time of the annotation file are saved with the ranges, so
+    that an index is not used once the file has changed.
+
+    Args:
+        json_path (str): The path of the JSON annotation file.
+        frame_ranges (list): The (start, end) byte range of each frame in the file.
+    """
+    stat = os.stat(json_path)
+    temporary_path = index_path(json_path) + ".tmp"
+    with open(temporary_path, "wb") as index_file:
+        np.savez(index_file, frame_ranges=np.array(frame_ranges, dtype=np.int64).reshape(-1, 2),
+                 size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+    os.replace(temporary_path, index_path(json_path))
+
+def load_frame_index(json_path):
+    """
+    Load the byte range of each frame of an annotation file from its index sidecar.
+
+    Args:
+        json_path (str): The path of the JSON annotation file.
+
+    Returns:
+        np.ndarray: An (F, 2) array of the byte range of each frame, or None if there is no 
+                    index or the annotation file changed since it was saved.
+
+    Raises:
+        FileNotFoundError: If the annotation file does not exist.
+    """
+    stat = os.stat(json_path)
+    try:
+        with np.load(index_path(json_path)) as index:
+            if int(index["size"]) == stat.st_size and int(index["mtime_ns"]) == stat.st_mtime_ns:
+                return index["frame_ranges"]
+    except (OSError, KeyError, ValueError):
+        pass
+    return None
+
+def index_frames(json_path, chunk_size=16 * 2**20):
+    """
+    Find the byte range of each frame of a JSON annotation file, whatever its layout.
+
+    The file is scanned in chunks with vectorised NumPy operations. Only the quotes and
+    brackets of each chunk are kept, and the scan tracks whether each of them is inside a
+    string and how deeply nested it is. Each frame is an array directly inside the top-level
+    array, so it starts at a "[" that reaches depth 2 and ends at the "]" that returns to depth 1.
+
+    Args:
+        json_path (str): The path of the JSON annotation file.
+        chunk_size (int): The number of bytes scanned at a time.
+
+    Returns:
+        np.ndarray: An (F, 2) array of the (start, end) byte range of each frame.
+    """
+    structural = np.zeros(256, dtype=bool)
+    structural[[ord(char) for char in '"[]{}']] = True
+    starts, ends = [], []
+    depth = 0 # Nesting depth before the chunk
+    in_string = False # Whether the chunk starts inside a string
+    backslashes = 0 # Backslashes ending the previous chunk
+    position = 0
+    with open(json_path, "rb") as json_file:
+        while True:
+            data = np.frombuffer(json_file.read(chunk_size), dtype=np.uint8)
+            if not len(data):
+                break
+            indexes = np.flatnonzero(structural[data])
+            chars = data[indexes]
+            quotes = chars == ord('"')
+            # A quote preceded by an odd number of backslashes is part of a string
+            previous = np.where(indexes > 0, data[indexes - 1], ord("\\") if backslashes else 0)
+            for quote in np.flatnonzero(quotes & (previous == ord("\\"))).tolist():
+                index = int(indexes[quote])
+                count = 0
+                while index - count - 1 >= 0 and data[index - count - 1] == ord("\\"):
+                    count += 1
+                if index - count == 0:
+                    count += backslashes
+                if count % 2:
+                    quotes[quote] = False
+            outside = (np.cumsum(quotes) + in_string) % 2 == 0
+            opening = ((chars == ord("[")) | (chars == ord("{"))) & outside
+            closing = ((chars == ord("]")) | (chars == ord("}"))) & outside
+            depths = depth + np.cumsum(opening.astype(np.int32) - closing)
+
+            starts.extend((indexes[opening & (depths == 2) & (chars == ord("["))] + position).tolist())
+            ends.extend((indexes[closing & (depths == 1) & (chars == ord("]"))] + position + 1).tolist())
+
+            if len(chars):
+                depth = int(depths[-1])
+                in_string = not outside[-1]
+            trailing = 0
+            while trailing < len(data) and data[-1 - trailing] == ord("\\"):
+                trailing += 1
+            backslashes = trailing + (backslashes if trailing == len(data) else 0)
+            position += len(data)
+    return np.column_stack((starts, ends)).astype(np.int64).reshape(-1, 2)
+
+def open_annotations(file_path):
+    """
+    Open the annotations of a video for reading, without loading a JSON file all at once.
+
+    Args:
+        file_path (str): The path of a JSON or .npz annotation file.
+
+    Returns:
+        LazyAnnotations or AnnotationView: The annotations of each frame, indexed like a list.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    if str(file_path).endswith(".npz"):
+        return AnnotationView(AnnotationStore.load(file_path))
+    return LazyAnnotations(file_path)
+
+def continue_ids(previous_annotations, next_annotations, association="hungarian", max_distance=20, min_overlap=60):
+    """
+    Map the object IDs of a new tracking run onto those of the frame before it.
+
+    The objects of the first frame of the new run are matched to those of the previous frame
+    with the tracker's class, distance and overlap gate. Colours are not compared, as the
+    annotations only hold the display colour of each class.
+
+    Args:
+        previous_annotations (list): The annotations of the last frame of the earlier run.
+        next_annotations (list): The annotations of the first frame of the new run.
+        association (str): The engine used to match the objects.
+        max_distance (float): The centroid distance below which boxes are close enough.
+        min_overlap (float): The overlap percentage above which boxes are close enough.
+
+    Returns:
+        dict: Maps the object IDs of the matched objects of `next_annotations` to the IDs they take over.
+    """
+    if not previous_annotations or not next_annotations:
+        return {}
+    previous_boxes = _boxes(previous_annotations)
+    next_boxes = _boxes(next_annotations)
+    overlap = iou_matrix(previous_boxes, next_boxes)
+    distance = centroid_distance_matrix(_centres(previous_boxes), _centres(next_boxes))
+    no_colour = np.zeros_like(overlap)
+    same_class = class_match_matrix([annotation["class"] for annotation in previous_annotations],
+                                    [annotation["class"] for annotation in next_annotations])
+    gate = association_gate(same_class, distance, overlap, no_colour, max_distance, min_overlap)
+    pairs = associate(association_cost(overlap, distance, no_colour, max_distance), gate, association)
+    return {next_annotations[col]["objectID"]: previous_annotations[row]["objectID"] for row, col in pairs}
+
+def _boxes(annotations):
+    return np.array([[annotation["bounding_box"][coord] for coord in ("x1", "y1", "x2", "y2")]
+                     for annotation in annotations], dtype=float).reshape(-1, 4)
+
+def _centres(boxes):
+    return np.column_stack(((boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2))
@@ -17,10 +17,14 @@ Dependencies:
     - cv2 (OpenCV): For video processing and frame manipulation.
     - PIL (Pillow): For image handling.
     - threading: For managing concurrent video playback.
-    - json: For loading and saving annotation data.
     - Frame_processing: custom
     - ObjectTracking: custom
+    - Pipeline: custom
+    - Detection_cache: custom
     - ObjectManager: custom
+    - Annotation_store: custom
+    - Annotation_stream: custom
+    - Annotation_journal: custom
 
 Author: team 120
 Date: 19/09/2024
@@ -34,11 +38,15 @@ sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 import cv2
 from PIL import Image
 import threading
-import json
 from pathlib import Path
 from Frame_processing import Frame_Processing
 import ObjectTracking     
-from ObjectManager import ObjManager      
+import Pipeline
+from Detection_cache import DetectionCache
+from ObjectManager import ObjManager
+from Annotation_store import find_annotations
+from Annotation_stream import AnnotationWriter, open_annotations
+from Annotation_journal import compact_journal, load_journaled
 
 class MediaPlayer(Frame_Processing):
     """
@@ -49,12 +57,15 @@ class MediaPlayer(Frame_Processing):
 
     Attributes:
         current_frame_index (int): Index of the currently processed frame.
-        current_frames (list): A list to store frames from the currently loaded video.
+        current_frames (list): The frames of the currently loaded video, a list while it is previewed or, 
+                               once analysed or opened in the editor, a FrameServer decoding them on request.
         frame_annotations (list): A list to store annotations corresponding to the frames.
         isAnalising (bool): Flag indicating whether the media is currently being analyzed.
         loadVideo (threading.Condition): Condition variable for thread synchronization when loading videos.
         filteredAnno (list): A list to store filtered annotations.
-        json_path (str): Path to the JSON file containing annotations.
+        json_path (str): Path to the JSON or .npz file containing annotations.
+        detection_cache (DetectionCache): Detections of analysed videos, reused when a video is analysed again.
+        objMan (ObjManager): The manager editing the annotations of the opened video, created by the first filter.
 
     Methods:
         __init__(): Initializes a MediaPlayer instance and sets up attributes.
@@ -69,6 +80,8 @@ class MediaPlayer(Frame_Processing):
         self.loadVideo = threading.Condition()
         self.filteredAnno = []
         self.json_path = ""
+        self.objMan = None
+        self.detection_cache = DetectionCache()
     
     def manage_media(self):
         """
@@ -85,6 +98,7 @@ class MediaPlayer(Frame_Processing):
         self.select_media()
         
         if self.media_path:
+            self.release_frames()
             if self.media_path.lower().endswith(('.jpg', '.jpeg', '.png')):
                 self.current_frame = Image.open(self.media_path)
                 self.display_frame(self.current_frame)
@@ -96,6 +110,7 @@ class MediaPlayer(Frame_Processing):
                     
                     self.pause_button.grid(row=0, column=2, padx=10, pady=10, sticky='w')
             self.YOLO_button.grid(row=0, column=5, padx=10, pady=10, sticky='e')
+            self.compact_button.grid(row=0, column=4, padx=10, pady=10, sticky='e')
     
     def start_YOLO(self):
         self.YOLO_thread = threading.Thread(target=self.run_YOLO)
@@ -176,7 +191,7 @@ class MediaPlayer(Frame_Processing):
 
         if self.replay:
             self.replay_button.grid_forget()
-            self.play_processed_video(self.current_frames)
+            self.play_processed_video(self.rendered_frames())
             self.replay = False
             
     def run_YOLO(self):
@@ -184,9 +199,12 @@ class MediaPlayer(Frame_Processing):
         Run the YOLO object detection on the selected media file.
 
         This method pauses the current playback if it's running, updates the UI to indicate 
-        that processing is underway, and invokes the YOLO object detection. It processes the 
-        frames and retrieves annotations, then resumes playback of the processed frames. 
-        Additionally, it saves the annotations to a JSON file.
+        that processing is underway, and invokes the YOLO object detection. Processed frames 
+        are played back as soon as they are tracked while the rest of the video is analysed. 
+        The annotations of each frame are written to a JSON file as soon as it is tracked, and 
+        converted to .npz once the video is finished if the compact format is ticked. Neither the 
+        frames nor the annotations are kept: for replay, frames are decoded again through a 
+        FrameServer and annotations are read back from the file.
 
         Preconditions:
             - The `media_path` must be a valid path to a media file.
@@ -200,33 +218,56 @@ class MediaPlayer(Frame_Processing):
         self.view.update_idletasks()
         self.after(30)
         
-        filename = Path(file_path).stem + ".json"
+        filename = Path(file_path).stem + (".npz" if self.compact_format.get() else ".json")
         
         print("[App] Running YOLO")
-        processed_frames, annotations = ObjectTracking.media_capture(file_path)
+        self.release_frames()
         
         if self.is_paused:  #Pause whatever is playing 
             self.toggle_pause()
 
-        self.current_frames = processed_frames
-        self.YOLO_button.config(text="Let's YOLO")
-        self.play_processed_video(self.current_frames)
-
         json_path = Path("./App/JSON_files") / filename
-        # Save annotations to a JSON file
-        with json_path.open(mode='w') as json_file:
-            json.dump(annotations, json_file, indent=4)
+        # Each frame is written as soon as it is tracked, so an interrupted run keeps its frames
+        with AnnotationWriter(json_path) as writer:
+            # Frames are shown as soon as they are tracked while detection keeps running
+            self.play_processed_video(self.stream_YOLO(file_path, writer))
+        self.set_overlay(file_path, open_annotations(json_path))
+        self.YOLO_button.config(text="Let's YOLO")
         
         self.YOLO_button.forget()
+        self.compact_button.grid_forget()
+
+    def stream_YOLO(self, file_path, writer):
+        """
+        Yield tracked frames from `Pipeline.media_capture_pipeline` for playback, annotated as they are shown.
+
+        Decoding, inference, tracking and drawing run on their own threads, so the
+        player receives frames while the next ones are still being analysed. If the 
+        video was analysed before, its cached detections are reused instead of running 
+        the model. The annotations of each frame are written by `writer` and the player 
+        receives an annotated copy of the frame; neither is kept.
+
+        Args:
+            file_path (str): The path to the video file to be processed.
+            writer (AnnotationWriter): Where the annotations of each frame are written as it is tracked.
+
+        Yields:
+            np.ndarray: The next annotated frame.
+        """
+        tracked_frames = Pipeline.media_capture_pipeline(file_path, detection_cache=self.detection_cache, draw=False)
+        for _, frame, frame_annotations in tracked_frames:
+            writer.write(frame_annotations)
+            yield self.render_frame(frame, frame_annotations)
             
     def open_existing(self):
         """
         Open an existing media file and load associated annotations.
 
         This method allows the user to select a media file and attempts to load 
-        its corresponding annotation data from a JSON file. It redraws boxes based 
-        on the loaded annotations and updates the UI for playback controls if 
-        the media is a video file.
+        its corresponding annotation data from a JSON or .npz file. A JSON file is not parsed 
+        all at once, only the frames being displayed are read from it through the index of 
+        its frames. The loaded annotations are drawn over each frame as it is displayed, and 
+        the UI for playback controls is updated if the media is a video file.
 
         Preconditions:
             - The corresponding JSON file must exist for the selected media.
@@ -235,28 +276,29 @@ class MediaPlayer(Frame_Processing):
         media_path = self.media_path
         print(f"[App] media_path{media_path}")
         if self.media_path:
-            filename = Path(media_path).stem + ".json"
-            self.json_path = Path("./App/JSON_files") / filename
-            # Load annotation data from JSON file
+            self.json_path = Path(find_annotations("./App/JSON_files", Path(media_path).stem))
+            # Edits saved to the journal are written into the file, where the lazy reader sees them
+            compact_journal(self.json_path)
+            # Load annotation data from the JSON or .npz file
             try:
-                with self.json_path.open(mode='r') as file:
-                    self.frames_annotations = json.load(file)
+                self.frames_annotations = open_annotations(self.json_path)
+                self.objMan = None # Loaded in full when the annotations are first filtered
 
-                self.redraw_boxes(media_path,self.frames_annotations)
+                self.set_overlay(media_path,self.frames_annotations)
 
                 if media_path.lower().endswith(('.mp4', '.avi', '.mov')):
                     self.prev_frame_button.grid(row=0, column=4, padx=10, pady=10, sticky='w')
                     self.play_all.grid(row=0, column=3, padx=10, pady=10, sticky='w')
                     self.next_frame_button.grid(row=0, column=5, padx=10, pady=10, sticky='w')
 
-                self.display_frame(self.current_frames[0])
+                self.show_frame(0)
                 self.sort_annotations(self.frames_annotations[0])
 
             except FileNotFoundError:
                 print("[App] No annotations found")
     
     def play(self):
-        self.play_processed_video(self.current_frames) 
+        self.play_processed_video(self.rendered_frames()) 
     
     def filter(self):
         """
@@ -267,13 +309,13 @@ class MediaPlayer(Frame_Processing):
         It also manages UI elements for editing if a specific object is selected.
 
         Preconditions:
-            - The `frames_annotations` must be initialized and contain valid data.
-            - The `get_selected`, `objMan`, and `redraw_boxes` methods must be properly defined.
+            - `open_existing` must have found the annotations of the media.
+            - The `get_selected` and `set_overlay` methods must be properly defined.
         """
         print("[App] filter() called...")
         selected_classes, selected_objects = self.get_selected()
         print(selected_classes,selected_objects)  
-        self.objMan = ObjManager(self.frames_annotations)
+        self.load_manager()
         self.objMan.clear()
         filteredBoxes=[]
         
@@ -305,10 +347,22 @@ class MediaPlayer(Frame_Processing):
                 print(f"[App] Frame {self.current_frame_index} filtered:")
             else:
                 self.remove_edit_UI()
-        self.redraw_boxes(self.media_path,filteredBoxes)
-        self.display_frame(self.current_frames[self.current_frame_index])
+        self.set_overlay(self.media_path,filteredBoxes)
+        self.show_frame(self.current_frame_index)
         self.sort_annotations(self.frames_annotations[self.current_frame_index])
     
+    def load_manager(self):
+        """
+        Load the annotations of the opened media into an ObjManager for filtering and editing.
+
+        Preconditions:
+            - `open_existing` must have found the annotations of the media.
+        """
+        if self.objMan is None:
+            self.objMan = ObjManager(load_journaled(self.json_path), self.json_path)
+            # Built from the manager's store as frames are read, so it shows every edit
+            self.frames_annotations = self.objMan.data
+
     def editBox_GiveIndexes(self):
         print('[App] frame ID',self.current_frame_index)
         print('[App] object ID whose box is changing',self.filteredAnno[self.current_frame_index][0]["objectID"])
@@ -318,8 +372,8 @@ class MediaPlayer(Frame_Processing):
         return indexF, indexB
     
     def editRedisplayFrame(self):
-        self.redraw_boxes(self.media_path,self.filteredAnno)
-        self.display_frame(self.current_frames[self.current_frame_index])
+        # filteredAnno is a view of objMan's store and already shows the edit, only the frame needs drawing again
+        self.mark_dirty(self.current_frame_index)
     
     def editSaveEdits(self):
         print("[App] Saving changes")
@@ -338,6 +392,7 @@ class MediaPlayer(Frame_Processing):
         self.class_button.grid_remove()
         self.id_entry.grid_remove()
         self.id_button.grid_remove()
+        self.undo_button.grid_remove()
         # Optionally hide the Save Changes button itself
         self.save_changes_button.grid_remove()
         self.objMan.writeChanges(self.json_path)
@@ -410,6 +465,11 @@ class MediaPlayer(Frame_Processing):
         self.objMan.editBoundingBoxShape(indexF, indexB, "y2", -5)
         self.editRedisplayFrame()
         return
+    def editUndo(self):
+        print(f"[App] undoing last edit")
+        for indexF in self.objMan.undo():
+            self.mark_dirty(indexF)
+        return
             
     def move_forward(self):
         """
@@ -423,12 +483,12 @@ class MediaPlayer(Frame_Processing):
             None
 
         Preconditions:
-            - The `current_frames` list must be populated with frames.
+            - `current_frames` must give access to the frames of the video.
             - The `frames_annotations` list must be properly initialized.
         """
         if self.current_frame_index < len(self.current_frames) - 1:
             self.current_frame_index += 1
-            self.display_frame(self.current_frames[self.current_frame_index])
+            self.show_frame(self.current_frame_index)
             self.sort_annotations(self.frames_annotations[self.current_frame_index])
             
             if self.entries != []:
@@ -446,12 +506,12 @@ class MediaPlayer(Frame_Processing):
         displays their coordinates. If the beginning of the frames is reached, it prints a message.
 
         Preconditions:
-            - The `current_frames` list must be populated with frames.
+            - `current_frames` must give access to the frames of the video.
             - The `frames_annotations` list must be properly initialized.
         """
         if self.current_frame_index > 0 and self.current_frame_index < len(self.current_frames) - 1:
             self.current_frame_index -= 1
-            self.display_frame(self.current_frames[self.current_frame_index])
+            self.show_frame(self.current_frame_index)
             self.sort_annotations(self.frames_annotations[self.current_frame_index])
             
             if self.entries != []:
@@ -0,0 +1,126 @@
+"""
+Module Name: Association.py
+
+Description:
+    This module matches tracked objects to the detections of a new frame. It turns the
+    overlap, distance and colour difference matrices of a frame into a cost matrix and
+    solves it as a one-to-one assignment, so that every tracked object takes at most one
+    detection and every detection continues at most one tracked object.
+
+    Two engines are available: "hungarian" solves the assignment optimally with SciPy's
+    linear_sum_assignment, and "greedy" repeatedly takes the cheapest remaining pair.
+    The greedy engine is also used whenever SciPy is not installed.
+
+Usage:
+    Build the cost matrix with association_cost() and the gating mask with
+    Box_geometry.association_gate(), then call associate() with the name of an engine
+    to obtain the list of matched (row, column) pairs.
+
+Dependencies:
+    - NumPy
+    - SciPy (optional): For the optimal assignment.
+
+Author: team 120
+Date: 17/10/2026
+"""
+
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    linear_sum_assignment = None
+
+def association_cost(overlap, distance, delta_e, max_distance=20, max_delta_e=10):
+    """
+    Combine overlap, centroid distance and colour difference into a matching cost.
+
+    Each term is scaled to roughly [0, 1] so that none of them dominates: a pair of
+    identical boxes with identical colours costs 0.
+
+    Args:
+        overlap (np.ndarray): The (M, N) overlap percentage matrix.
+        distance (np.ndarray): The (M, N) centroid distance matrix.
+        delta_e (np.ndarray): The (M, N) colour difference matrix.
+        max_distance (float): The distance at which the distance term reaches 1.
+        max_delta_e (float): The colour difference at which the colour term reaches 1.
+
+    Returns:
+        np.ndarray: The (M, N) cost matrix, lower is a better match.
+
+    Raises:
+        ValueError: If `max_distance` or `max_delta_e` is not positive.
+    """
+    if max_distance <= 0 or max_delta_e <= 0:
+        raise ValueError(f"max_distance and max_delta_e must be positive, got {max_distance} and {max_delta_e}")
+    return (1 - overlap / 100) + np.minimum(distance / max_distance, 1) + delta_e / max_delta_e
+
+def greedy_assignment(cost, gate):
+    """
+    Match rows to columns by repeatedly taking the cheapest pair that passes the gate.
+
+    Args:
+        cost (np.ndarray): The (M, N) cost matrix.
+        gate (np.ndarray): The (M, N) boolean mask of pairs allowed to match.
+
+    Returns:
+        list: The matched (row, column) pairs, each row and column used at most once.
+    """
+    rows, cols = np.nonzero(gate)
+    order = np.argsort(cost[rows, cols], kind="stable")
+
+    used_rows = set()
+    used_cols = set()
+    matches = []
+    for row, col in zip(rows[order].tolist(), cols[order].tolist()):
+        if row not in used_rows and col not in used_cols:
+            used_rows.add(row)
+            used_cols.add(col)
+            matches.append((row, col))
+    return sorted(matches)
+
+def hungarian_assignment(cost, gate):
+    """
+    Match rows to columns with the minimum total cost using linear sum assignment.
+
+    Pairs outside the gate are given a cost larger than any set of allowed pairs, so the
+    solver first maximises the number of allowed matches and then minimises their cost.
+    Falls back to `greedy_assignment` when SciPy is not installed.
+
+    Args:
+        cost (np.ndarray): The (M, N) cost matrix.
+        gate (np.ndarray): The (M, N) boolean mask of pairs allowed to match.
+
+    Returns:
+        list: The matched (row, column) pairs, each row and column used at most once.
+    """
+    if linear_sum_assignment is None:
+        return greedy_assignment(cost, gate)
+
+    infeasible = np.abs(cost[gate]).sum() + 1
+    rows, cols = linear_sum_assignment(np.where(gate, cost, infeasible))
+    return [(row, col) for row, col in zip(rows.tolist(), cols.tolist()) if gate[row, col]]
+
+ASSOCIATION_METHODS = {
+    "hungarian": hungarian_assignment,
+    "greedy": greedy_assignment,
+}
+
+def associate(cost, gate, method="hungarian"):
+    """
+    Match rows to columns one-to-one with the chosen association engine.
+
+    Args:
+        cost (np.ndarray): The (M, N) cost matrix.
+        gate (np.ndarray): The (M, N) boolean mask of pairs allowed to match.
+        method (str): The name of the engine in `ASSOCIATION_METHODS`.
+
+    Returns:
+        list: The matched (row, column) pairs sorted by row.
+
+    Preconditions:
+        - `method` must be a key of `ASSOCIATION_METHODS`.
+    """
+    if not gate.any():
+        return []
+    return ASSOCIATION_METHODS[method](cost, gate)
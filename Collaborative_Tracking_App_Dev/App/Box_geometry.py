@@ -0,0 +1,144 @@
+"""
+Module Name: Box_geometry.py
+
+Description:
+    This module compares bounding boxes in bulk. It computes the overlap (IoU) and
+    centroid distance between every pair of two sets of boxes with NumPy broadcasting,
+    and combines them with class and colour differences into the gating mask that
+    decides which tracked objects may be matched to which detections.
+
+Usage:
+    Stack boxes into arrays of shape (M, 4) and (N, 4) and pass them to iou_matrix(),
+    centres into arrays of shape (M, 2) and (N, 2) for centroid_distance_matrix(),
+    then combine the results with association_gate(). The *_pairs() variants compare
+    matching rows only, for when the candidate pairs are already known.
+
+Dependencies:
+    - NumPy
+
+Author: team 120
+Date: 17/10/2026
+"""
+
+import numpy as np
+
+def iou_matrix(boxes1, boxes2):
+    """
+    Compute the overlap percentage (IoU) between every pair of two sets of boxes.
+
+    Args:
+        boxes1 (np.ndarray): An array of shape (M, 4) with boxes in the format (x1, y1, x2, y2).
+        boxes2 (np.ndarray): An array of shape (N, 4) with boxes in the format (x1, y1, x2, y2).
+
+    Returns:
+        np.ndarray: An array of shape (M, N) where entry (i, j) is the percentage of
+                    overlap between `boxes1[i]` and `boxes2[j]`, or 0.0 if they do not overlap.
+
+    Preconditions:
+        - (x1, y1) must be the top-left corner and (x2, y2) the bottom-right corner of each box.
+    """
+    boxes1 = np.asarray(boxes1).reshape(-1, 4)
+    boxes2 = np.asarray(boxes2).reshape(-1, 4)
+    return _iou(boxes1[:, None, :], boxes2[None, :, :])
+
+def iou_pairs(boxes1, boxes2):
+    """
+    Compute the overlap percentage (IoU) between matching rows of two sets of boxes.
+
+    Args:
+        boxes1 (np.ndarray): An array of shape (K, 4) with boxes in the format (x1, y1, x2, y2).
+        boxes2 (np.ndarray): An array of shape (K, 4) with boxes in the format (x1, y1, x2, y2).
+
+    Returns:
+        np.ndarray: An array of shape (K,) where entry k is the percentage of overlap
+                    between `boxes1[k]` and `boxes2[k]`.
+    """
+    return _iou(np.asarray(boxes1).reshape(-1, 4), np.asarray(boxes2).reshape(-1, 4))
+
+def _iou(boxes1, boxes2):
+    # Determine the coordinates of the intersection rectangles
+    x_left = np.maximum(boxes1[..., 0], boxes2[..., 0])
+    y_top = np.maximum(boxes1[..., 1], boxes2[..., 1])
+    x_right = np.minimum(boxes1[..., 2], boxes2[..., 2])
+    y_bottom = np.minimum(boxes1[..., 3], boxes2[..., 3])
+
+    overlaps = (x_left < x_right) & (y_top < y_bottom)
+    intersection_area = np.where(overlaps, (x_right - x_left) * (y_bottom - y_top), 0)
+
+    area_boxes1 = (boxes1[..., 2] - boxes1[..., 0]) * (boxes1[..., 3] - boxes1[..., 1])
+    area_boxes2 = (boxes2[..., 2] - boxes2[..., 0]) * (boxes2[..., 3] - boxes2[..., 1])
+    union_area = area_boxes1 + area_boxes2 - intersection_area
+
+    overlap_percentage = np.zeros(overlaps.shape)
+    np.divide(intersection_area, union_area, out=overlap_percentage, where=overlaps)
+    return overlap_percentage * 100
+
+def centroid_distance_matrix(centres1, centres2):
+    """
+    Compute the Euclidean distance between every pair of two sets of box centres.
+
+    Args:
+        centres1 (np.ndarray): An array of shape (M, 2) with centres in the format (cx, cy).
+        centres2 (np.ndarray): An array of shape (N, 2) with centres in the format (cx, cy).
+
+    Returns:
+        np.ndarray: An array of shape (M, N) where entry (i, j) is the distance
+                    between `centres1[i]` and `centres2[j]`.
+    """
+    centres1 = np.asarray(centres1).reshape(-1, 2)
+    centres2 = np.asarray(centres2).reshape(-1, 2)
+    return centroid_distance_pairs(centres1[:, None, :], centres2[None, :, :])
+
+def centroid_distance_pairs(centres1, centres2):
+    """
+    Compute the Euclidean distance between matching rows of two sets of box centres.
+
+    Args:
+        centres1 (np.ndarray): An array of shape (K, 2) with centres in the format (cx, cy).
+        centres2 (np.ndarray): An array of shape (K, 2) with centres in the format (cx, cy).
+
+    Returns:
+        np.ndarray: An array of shape (K,) where entry k is the distance between
+                    `centres1[k]` and `centres2[k]`.
+    """
+    centres1 = np.asarray(centres1)
+    centres2 = np.asarray(centres2)
+    return np.hypot(centres1[..., 0] - centres2[..., 0], centres1[..., 1] - centres2[..., 1])
+
+def class_match_matrix(classes1, classes2):
+    """
+    Compare every pair of two lists of class names.
+
+    Args:
+        classes1 (list): The class names of the M first boxes.
+        classes2 (list): The class names of the N second boxes.
+
+    Returns:
+        np.ndarray: A boolean array of shape (M, N) that is True where the classes are equal.
+    """
+    same_class = np.array(classes1, dtype=object)[:, None] == np.array(classes2, dtype=object)[None, :]
+    return same_class.reshape(len(classes1), len(classes2))
+
+def association_gate(same_class, distance, overlap, delta_e, max_distance=20, min_overlap=60, max_delta_e=10):
+    """
+    Build the mask of pairs that are allowed to be matched to each other.
+
+    A pair passes the gate when both boxes have the same class, they are either
+    closer than `max_distance` pixels or overlap by more than `min_overlap` percent,
+    and their colour difference is at most `max_delta_e`.
+
+    The inputs may be (M, N) matrices or (K,) arrays of candidate pairs.
+
+    Args:
+        same_class (np.ndarray): Whether the classes of the boxes are equal, see `class_match_matrix`.
+        distance (np.ndarray): The centroid distances.
+        overlap (np.ndarray): The overlap percentages.
+        delta_e (np.ndarray): The colour differences.
+        max_distance (float): The centroid distance below which boxes are close enough.
+        min_overlap (float): The overlap percentage above which boxes are close enough.
+        max_delta_e (float): The largest colour difference allowed for a match.
+
+    Returns:
+        np.ndarray: A boolean array of the same shape that is True where the pair passes the gate.
+    """
+    return same_class & ((distance < max_distance) | (overlap > min_overlap)) & (delta_e <= max_delta_e)
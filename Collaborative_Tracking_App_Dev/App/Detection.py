@@ -0,0 +1,86 @@
+"""
+Module Name: Detection.py
+
+Description:
+    This module defines the compact record used for a single detected object while
+    tracking. A Detection keeps the parsed YOLO output of one bounding box in fixed
+    slots together with an integer detection ID (its index within the frame), so the
+    tracker can refer to detections by index instead of hashing tuples of their values.
+
+Usage:
+    Detections are created by ObjectTracking.parse_results(). Use detection_arrays()
+    to stack the boxes, centres, Lab colours and classes of a list of detections into
+    NumPy arrays for the vectorised association step.
+
+Dependencies:
+    - NumPy
+
+Author: team 120
+Date: 17/10/2026
+"""
+
+import numpy as np
+
+class Detection:
+    """
+    A single detected object in a frame.
+
+    Attributes:
+        detection_id (int): The index of the detection within its frame.
+        x1, y1, x2, y2 (int): The bounding box corners.
+        cx, cy (int): The centre of the bounding box.
+        class_name (str): The detected class.
+        lab (tuple): The (L, a, b) colour of the object.
+        B, G, R (float): The display colour of the class.
+        confidence (float): The confidence of the detection, rounded to 2 decimals.
+        object_id (int): The tracking ID assigned to the object, None until tracked.
+        interpolated (bool): Whether the box was estimated from neighbouring frames instead of detected.
+    """
+    __slots__ = ("detection_id", "x1", "y1", "x2", "y2", "cx", "cy", "class_name",
+                 "lab", "B", "G", "R", "confidence", "object_id", "interpolated")
+
+    def __init__(self, detection_id, x1, y1, x2, y2, cx, cy, class_name, lab, B, G, R, confidence, object_id=None,
+                 interpolated=False):
+        self.detection_id = detection_id
+        self.x1 = x1
+        self.y1 = y1
+        self.x2 = x2
+        self.y2 = y2
+        self.cx = cx
+        self.cy = cy
+        self.class_name = class_name
+        self.lab = lab
+        self.B = B
+        self.G = G
+        self.R = R
+        self.confidence = confidence
+        self.object_id = object_id
+        self.interpolated = interpolated
+
+    @property
+    def box(self):
+        return (self.x1, self.y1, self.x2, self.y2)
+
+    @property
+    def centre(self):
+        return (self.cx, self.cy)
+
+def detection_arrays(detections):
+    """
+    Stack the geometry, colour and class of a list of detections into arrays.
+
+    Args:
+        detections (list): A list of Detection objects.
+
+    Returns:
+        tuple: A tuple containing:
+            - boxes (np.ndarray): An (N, 4) array of bounding boxes.
+            - centres (np.ndarray): An (N, 2) array of box centres.
+            - labs (np.ndarray): An (N, 3) array of Lab colours.
+            - classes (np.ndarray): An (N,) object array of class names.
+    """
+    boxes = np.array([detection.box for detection in detections]).reshape(-1, 4)
+    centres = np.array([detection.centre for detection in detections]).reshape(-1, 2)
+    labs = np.array([detection.lab for detection in detections], dtype=float).reshape(-1, 3)
+    classes = np.array([str(detection.class_name) for detection in detections], dtype=object)
+    return boxes, centres, labs, classes
@@ -0,0 +1,172 @@
+"""
+Module Name: Detection_cache.py
+
+Description:
+    This module stores the raw YOLO detections of a whole video on disk so that the video
+    can be tracked again, for example with different tracking settings, without running
+    the model again. Detections are saved in a compressed columnar NumPy (.npz) file: one
+    array per field holding the detections of every frame back to back, and an array of
+    frame offsets marking where each frame's detections start.
+
+    A cache entry is keyed by a SHA-256 hash of the video's content together with the
+    model weights path and confidence threshold, so that editing or replacing the video,
+    or changing the model, never reuses stale detections.
+
+Usage:
+    Create a DetectionCache with a directory, compute the key of a video with key(),
+    then load() its detections, or run the model and save() them on a miss.
+
+Dependencies:
+    - hashlib: For hashing the video content.
+    - NumPy: For the columnar file format.
+
+Author: team 120
+Date: 17/10/2026
+"""
+
+import hashlib
+import os
+import numpy as np
+
+CACHE_VERSION = 1 # Change when the stored format changes, so that old entries are ignored
+
+def video_hash(file_path, chunk_size=1 << 20):
+    """
+    Hash the content of a video file.
+
+    Args:
+        file_path (str): The path to the video file.
+        chunk_size (int): The number of bytes read at a time.
+
+    Returns:
+        str: The hexadecimal SHA-256 digest of the file.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as video_file:
+        for chunk in iter(lambda: video_file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def pack_detections(frames_detections):
+    """
+    Convert per-frame `detect_frame` results into columnar arrays.
+
+    Args:
+        frames_detections (list): The (class_ids, confidences, bboxes, average_colours)
+            tuple of each frame.
+
+    Returns:
+        dict: The arrays "frame_offsets", "class_ids", "confidences", "boxes" and "colours".
+    """
+    counts = [len(class_ids) for class_ids, _, _, _ in frames_detections]
+    frame_offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=frame_offsets[1:])
+
+    def column(index, dtype, width):
+        values = [value for detections in frames_detections for value in detections[index]]
+        return np.array(values, dtype=dtype).reshape(-1, width)
+
+    return {
+        "frame_offsets": frame_offsets,
+        "class_ids": column(0, np.int32, 1).ravel(),
+        "confidences": column(1, np.float32, 1).ravel(),
+        "boxes": column(2, np.int32, 4),
+        "colours": column(3, np.float64, 4),
+    }
+
+def unpack_detections(arrays):
+    """
+    Convert columnar arrays back into per-frame `detect_frame` results.
+
+    Args:
+        arrays (dict): The arrays produced by `pack_detections`.
+
+    Returns:
+        list: The (class_ids, confidences, bboxes, average_colours) tuple of each frame,
+              in the same format as `YOLO_model.detect_frame`.
+    """
+    offsets = arrays["frame_offsets"]
+    class_ids = arrays["class_ids"].tolist()
+    confidences = arrays["confidences"][:, None]
+    boxes = arrays["boxes"]
+    colours = [tuple(colour) for colour in arrays["colours"].tolist()]
+
+    return [(class_ids[start:end], list(confidences[start:end]), list(boxes[start:end]), colours[start:end])
+            for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+
+class DetectionCache:
+    """
+    A directory of cached per-frame detections, one file per (video, model, threshold).
+
+    Attributes:
+        directory (str): The directory holding the cache files.
+        hashes (dict): Maps (path, size, modification time) of a video to its content hash,
+            so that a video is hashed once per session.
+    """
+
+    def __init__(self, directory="./App/Detection_cache"):
+        """
+        Initialize a cache in a directory, which is created when the first entry is saved.
+
+        Args:
+            directory (str): The directory holding the cache files.
+        """
+        self.directory = directory
+        self.hashes = {}
+
+    def key(self, file_path, model_path, conf):
+        """
+        Compute the cache key of a video analysed by a model.
+
+        Args:
+            file_path (str): The path to the video file.
+            model_path (str): The path to the model weights.
+            conf (float): The confidence threshold of the model.
+
+        Returns:
+            str: The hexadecimal key of the cache entry.
+        """
+        stat = os.stat(file_path)
+        identity = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+        if identity not in self.hashes:
+            self.hashes[identity] = video_hash(file_path)
+        description = f"{CACHE_VERSION}|{self.hashes[identity]}|{model_path}|{conf}"
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    def load(self, key):
+        """
+        Load the cached detections of a key.
+
+        Args:
+            key (str): The key returned by `key`.
+
+        Returns:
+            list: The per-frame detections, see `unpack_detections`, or None if the key is not cached.
+        """
+        try:
+            with np.load(self.path(key)) as arrays:
+                print(f"[DetectionCache] Loaded detections from {self.path(key)}")
+                return unpack_detections(arrays)
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def save(self, key, frames_detections):
+        """
+        Save the detections of every frame of a video.
+
+        The file is written under a temporary name and then renamed, so that an
+        interrupted save never leaves a truncated entry behind.
+
+        Args:
+            key (str): The key returned by `key`.
+            frames_detections (list): The `detect_frame` results of every frame, in order.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        temporary_path = self.path(key) + ".tmp"
+        with open(temporary_path, "wb") as cache_file:
+            np.savez_compressed(cache_file, **pack_detections(frames_detections))
+        os.replace(temporary_path, self.path(key))
+        print(f"[DetectionCache] Saved detections to {self.path(key)}")
@@ -7,6 +7,10 @@ Description:
     graphical user interface (GUI) built with Tkinter. Users can select media files,
     view images or video, and visualize annotationson frames.
 
+    Decoded frames are kept as they are: annotations are drawn on a copy of a frame only
+    when it is displayed, so changing the annotations never requires decoding or
+    redrawing the rest of the video.
+
 Usage:
     To run the application, instantiate the `Frame_Processing` class and call its methods
     for media selection and frame display.
@@ -16,6 +20,7 @@ Dependencies:
     - cv2 (OpenCV): For image and video processing.
     - PIL (Pillow): For image handling and conversion to formats compatible with Tkinter.
     - UI_components: A custom module that provides UI components for the application.
+    - Frame_server: custom
 
 Author: team 120
 Date: 19/09/2024
@@ -31,10 +36,15 @@ from tkinter import filedialog
 import cv2
 from PIL import Image, ImageTk
 import UI_components
+from Frame_server import FrameServer
 
 class Frame_Processing(UI_components.UI_Media_Components):
     def __init__(self):
         super().__init__()
+        self.frames_path = None # Media file the frames in current_frames were decoded from
+        self.overlay_annotations = [] # Annotations drawn over current_frames when displayed
+        self.dirty_frames = set() # Frames whose annotations changed since they were drawn
+        self.redraw_scheduled = False
     
     def display_frame(self, frame):
         """
@@ -89,11 +99,12 @@ class Frame_Processing(UI_components.UI_Media_Components):
         Play a sequence of processed video frames on a canvas.
 
         Args:
-            frames (list): A list of frames (images) to be displayed, which should be in a format 
-                        compatible with the `frame_processing` method.
+            frames (iterable): A list or generator of frames (images) to be displayed, which should be 
+                        in a format compatible with the `frame_processing` method. Generators are
+                        played as they produce frames.
 
         Preconditions:
-            - The `frames` list must contain valid image frames that can be processed.
+            - The `frames` iterable must contain valid image frames that can be processed.
             - The canvas must be properly initialized and ready for image rendering.
 
         Note:
@@ -181,40 +192,119 @@ class Frame_Processing(UI_components.UI_Media_Components):
                 cv2.rectangle(frame, (x1, y1), (x2, y2), (B, G, R), 2)
                 cv2.putText(frame, f"{class_name} - {str(ID)} - {confidence}", (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 1, (B, G, R), 2) 
         
-    def redraw_boxes(self,media_path,annotations):
+    def render_frame(self, frame, annotations):
+        """
+        Draw annotations on a copy of a frame, leaving the frame itself untouched.
+
+        Args:
+            frame (numpy.ndarray): The decoded frame.
+            annotations (list): The annotation dictionaries of the frame, see `process_annotations`.
+
+        Returns:
+            numpy.ndarray: The annotated copy, or `frame` itself if there is nothing to draw.
+        """
+        if not annotations:
+            return frame
+        frame = frame.copy()
+        self.process_annotations(frame, annotations)
+        return frame
+
+    def frame_overlay(self, index):
+        # Annotations of a frame, frames past the end of the annotations have none
+        return self.overlay_annotations[index] if index < len(self.overlay_annotations) else []
+
+    def show_frame(self, index):
+        """
+        Display a frame of `current_frames` with its annotations drawn over it.
+
+        Args:
+            index (int): The index of the frame.
+
+        Preconditions:
+            - `index` must be a valid index in `current_frames`.
+        """
+        self.display_frame(self.render_frame(self.current_frames[index], self.frame_overlay(index)))
+
+    def mark_dirty(self, index):
         """
-        Read frames from a media file and redraw bounding boxes based on annotations.
+        Mark a frame whose annotations were edited so that it is drawn again.
 
-        This method captures video frames from the specified media file, processes
-        each frame to draw annotations (bounding boxes, circles, and text), and
-        stores the processed frames for later use.
+        The redraw is scheduled for when Tkinter is next idle, so a burst of edits, such as
+        repeated clicks on a move button, results in a single redraw per display refresh. 
+        Only the displayed frame is drawn again, others are drawn when they are displayed.
+
+        Args:
+            index (int): The index of the edited frame.
+        """
+        self.dirty_frames.add(index)
+        if not self.redraw_scheduled:
+            self.redraw_scheduled = True
+            self.after_idle(self.redraw_dirty)
+
+    def redraw_dirty(self):
+        """
+        Draw the displayed frame again if it was marked dirty, and clear the dirty frames.
+        """
+        self.redraw_scheduled = False
+        dirty_frames, self.dirty_frames = self.dirty_frames, set()
+        if self.current_frame_index in dirty_frames:
+            self.show_frame(self.current_frame_index)
+
+    def rendered_frames(self):
+        """
+        Yield the frames of `current_frames` with their annotations drawn, one at a time as they are played.
+
+        Yields:
+            numpy.ndarray: The next annotated frame.
+        """
+        for index, frame in enumerate(self.current_frames):
+            yield self.render_frame(frame, self.frame_overlay(index))
+
+    def set_overlay(self, media_path, annotations):
+        """
+        Set the annotations drawn over the frames of a media file.
+
+        The frames are decoded once per media file and kept unannotated, so changing the 
+        annotations, for instance after a filter or an edit, only replaces the list: boxes 
+        are drawn when a frame is displayed.
 
         Args:
             media_path (str): The file path to the media (video) file.
             annotations (list): A list of annotation lists, where each inner list contains
                                 annotation dictionaries for a corresponding frame.
 
-        Returns:
-            None
-
         Preconditions:
             - The `media_path` must be a valid path to a video file accessible by OpenCV.
             - The `annotations` list must have the same length as the number of frames in the video.
         """
-        media_capture = cv2.VideoCapture(media_path)
-        self.current_frames=[]
-        current_frame_index=0
-
-        while media_capture.isOpened():
-            ret, frame = media_capture.read()
-            if not ret:
-                break
-                    
-            if current_frame_index  < len(annotations):
-                self.process_annotations(frame, annotations[current_frame_index])
-                self.current_frames.append(frame)
-            current_frame_index += 1
-        media_capture.release()
+        if self.frames_path != media_path:
+            self.load_frames(media_path, len(annotations))
+        self.overlay_annotations = annotations
+
+    def load_frames(self, media_path, frame_count=None):
+        """
+        Give access to the frames of a media file through `current_frames`, without drawing on them.
+
+        `current_frames` becomes a FrameServer, which decodes frames as they are requested 
+        and keeps a bounded cache of them, so the video is never held in memory as a whole.
+
+        Args:
+            media_path (str): The file path to the media (video) file.
+            frame_count (int): The largest number of frames to give access to, or None for all of them.
+        """
+        self.release_frames()
+        self.current_frames = FrameServer(media_path, frame_count)
+        self.frames_path = media_path
+
+    def release_frames(self):
+        """
+        Forget the frames and annotations of the current media file, closing its FrameServer if it has one.
+        """
+        if isinstance(self.current_frames, FrameServer):
+            self.current_frames.close()
+        self.current_frames = []
+        self.frames_path = None
+        self.overlay_annotations = []
     
     def get_coords(self,filteredBoxes):
         """
@@ -0,0 +1,186 @@
+"""
+Module Name: Frame_server.py
+
+Description:
+    This module gives random access to the frames of a video without decoding the whole
+    video into memory. Frames are decoded on request and kept in a least recently used
+    (LRU) cache bounded by a memory budget, so stepping back and forth around a frame is
+    served from memory. After each request, a background thread decodes the frames after
+    the requested one so that the next step forward is usually a cache hit. Frames before
+    it are not prefetched, as reaching them needs a seek that would hold the decoder for as
+    long as it takes; stepping back is served by the frames kept in the cache.
+
+    Compressed video can only be decoded starting from a keyframe, so seeking with
+    cv2.CAP_PROP_POS_FRAMES makes the decoder go back to the keyframe before the target
+    and decode every frame in between. A frame a short distance ahead of the decoder is
+    therefore read forward instead of sought, and the frames decoded on the way are cached.
+    If a seek lands before the requested frame, as some containers only seek to keyframes,
+    the server reads forward from where it landed.
+
+Usage:
+    Create a FrameServer with the path to a video and index it like a list of frames:
+
+    frames = FrameServer("Media/Short_Video_1080p_Test.mp4")
+    frame = frames[120]
+    frames.close()
+
+Dependencies:
+    - threading: For the prefetching thread.
+    - collections: For the ordered dictionary used as the LRU cache.
+    - cv2 (OpenCV): For decoding the video.
+
+Author: team 120
+Date: 17/10/2026
+"""
+
+import threading
+from collections import OrderedDict
+import cv2
+
+DEFAULT_MEMORY_BUDGET = 512 * 2**20 # Bytes, about 80 frames of 1080p video
+
+class FrameServer:
+    """
+    Decodes the frames of a video on request and caches them within a memory budget.
+
+    Attributes:
+        media_path (str): The path to the video file.
+        frame_count (int): The number of frames that can be requested.
+        memory_budget (int): The largest number of bytes of decoded frames kept in the cache.
+        prefetch (int): The number of frames decoded ahead of a requested frame.
+        read_ahead (int): The largest distance ahead of the decoder that is read forward instead of sought.
+            Setting it near the keyframe interval of the video avoids decoding the same frames twice.
+    """
+
+    def __init__(self, media_path, frame_count=None, memory_budget=DEFAULT_MEMORY_BUDGET, prefetch=8, read_ahead=30):
+        """
+        Open a video and start the prefetching thread.
+
+        Args:
+            media_path (str): The path to the video file.
+            frame_count (int): The number of frames that can be requested, by default every
+                frame reported by the video container.
+            memory_budget (int): The largest number of bytes of decoded frames kept in the cache.
+            prefetch (int): The number of frames decoded ahead of a requested frame.
+            read_ahead (int): The largest distance ahead of the decoder read forward instead of sought.
+
+        Preconditions:
+            - The video file must be in a format supported by OpenCV.
+        """
+        self.media_path = media_path
+        self.capture = cv2.VideoCapture(media_path)
+        container_count = int(self.capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.frame_count = container_count if frame_count is None else min(frame_count, container_count)
+        self.memory_budget = memory_budget
+        self.prefetch = prefetch
+        self.read_ahead = read_ahead
+
+        self.cache = OrderedDict() # Frame index -> frame, least recently used first
+        self.cached_bytes = 0
+        self.position = 0 # Index of the frame the decoder reads next
+        self.lock = threading.Lock() # Guards the capture and the cache
+        self.wanted = None # Index around which the prefetching thread decodes
+        self.requests = 0 # Requests waiting for the lock, the prefetching thread steps aside for them
+        self.requests_lock = threading.Lock() # Guards the count of requests, taken before the lock
+        self.wake = threading.Condition(self.lock)
+        self.closed = False
+        self.prefetch_thread = threading.Thread(target=self._prefetch_loop, daemon=True)
+        self.prefetch_thread.start()
+
+    def __len__(self):
+        return self.frame_count
+
+    def __iter__(self):
+        for index in range(self.frame_count):
+            yield self[index]
+
+    def __getitem__(self, index):
+        """
+        Get a decoded frame, from the cache if possible.
+
+        Args:
+            index (int): The index of the frame, negative indexes count from the end.
+
+        Returns:
+            np.ndarray: The frame in BGR format.
+
+        Raises:
+            IndexError: If the index is out of range or the frame cannot be decoded.
+        """
+        if index < 0:
+            index += self.frame_count
+        if not 0 <= index < self.frame_count:
+            raise IndexError(f"Frame {index} is out of range for a video of {self.frame_count} frames")
+
+        with self.requests_lock:
+            self.requests += 1
+        with self.lock:
+            with self.requests_lock:
+                self.requests -= 1
+            frame = self._get(index)
+            self.wanted = index
+            self.wake.notify()
+        if frame is None:
+            raise IndexError(f"Frame {index} of {self.media_path} could not be decoded")
+        return frame
+
+    def close(self):
+        """
+        Stop the prefetching thread and release the video.
+        """
+        with self.lock:
+            self.closed = True
+            self.wake.notify()
+        self.prefetch_thread.join()
+        with self.lock:
+            self.capture.release()
+            self.cache.clear()
+            self.cached_bytes = 0
+
+    def _get(self, index):
+        # Must be called with the lock held
+        if index in self.cache:
+            self.cache.move_to_end(index)
+            return self.cache[index]
+
+        if not 0 <= index - self.position <= self.read_ahead:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, index)
+            # Some containers only seek to the keyframe before the target
+            self.position = min(int(self.capture.get(cv2.CAP_PROP_POS_FRAMES)), index)
+
+        frame = None
+        while self.position <= index:
+            ret, frame = self.capture.read()
+            if not ret:
+                return None
+            self._store(self.position, frame)
+            self.position += 1
+        return frame
+
+    def _store(self, index, frame):
+        if index in self.cache:
+            self.cache.move_to_end(index)
+            return
+        self.cache[index] = frame
+        self.cached_bytes += frame.nbytes
+        while self.cached_bytes > self.memory_budget and len(self.cache) > 1:
+            _, evicted = self.cache.popitem(last=False)
+            self.cached_bytes -= evicted.nbytes
+
+    def _prefetch_loop(self):
+        while True:
+            with self.lock:
+                while self.wanted is None and not self.closed:
+                    self.wake.wait()
+                if self.closed:
+                    return
+                centre, self.wanted = self.wanted, None
+
+            for index in range(centre + 1, min(centre + self.prefetch + 1, self.frame_count)):
+                if self.requests:
+                    break # A newer request moves the prefetching window
+                with self.lock:
+                    if self.closed or self.wanted is not None:
+                        break
+                    if index not in self.cache:
+                        self._get(index)
@@ -0,0 +1,120 @@
+"""
+Module Name: Interpolation.py
+
+Description:
+    This module fills in the frames that were not sent to the YOLO model when detection
+    only runs on every K-th frame (the detection stride). The boxes of a skipped frame are
+    estimated from the tracked objects of the detected frames (keyframes) around it:
+
+    - "offline": the boxes are linearly interpolated between the keyframe before and the
+      keyframe after, which requires holding back the skipped frames until the next
+      keyframe has been tracked.
+    - "live": the boxes are predicted from the keyframe before, assuming each object keeps
+      the velocity it had between the last two keyframes, so frames are never held back.
+
+    Estimated detections are marked as interpolated so that they can be told apart from
+    detected ones in the annotations.
+
+Usage:
+    Pass the output of ObjectTracking.track_detections(), where skipped frames carry None
+    instead of detections, to fill_skipped_frames().
+
+Dependencies:
+    - NumPy
+    - Detection: custom
+
+Author: team 120
+Date: 17/10/2026
+"""
+
+import numpy as np
+from Detection import Detection
+
+INTERPOLATION_MODES = ("offline", "live")
+
+def blend_detections(start, end, fraction):
+    """
+    Move the objects found in two keyframes along the line between their two boxes.
+
+    A `fraction` of 0 gives the boxes of `start` and 1 the boxes of `end`; values above 1
+    continue the motion past `end`. Only objects tracked in both keyframes are returned,
+    with the class, colour and confidence they had in `start`.
+
+    Args:
+        start (list): The tracked Detection objects of the earlier keyframe.
+        end (list): The tracked Detection objects of the later keyframe.
+        fraction (float): How far along the motion from `start` to `end` the boxes are placed.
+
+    Returns:
+        list: The estimated Detection objects, marked as interpolated.
+    """
+    end_boxes = {detection.object_id: detection.box for detection in end}
+    pairs = [(detection, end_boxes[detection.object_id]) for detection in start
+             if detection.object_id in end_boxes]
+    if not pairs:
+        return []
+
+    start_boxes = np.array([detection.box for detection, _ in pairs], dtype=float)
+    boxes = start_boxes + (np.array([box for _, box in pairs], dtype=float) - start_boxes) * fraction
+    return [_moved(detection, box, detection_id)
+            for detection_id, ((detection, _), box) in enumerate(zip(pairs, np.rint(boxes).astype(int).tolist()))]
+
+def _moved(detection, box, detection_id):
+    x1, y1, x2, y2 = box
+    return Detection(detection_id, x1, y1, x2, y2, int((x1 + x2) / 2), int((y1 + y2) / 2),
+                     detection.class_name, detection.lab, detection.B, detection.G, detection.R,
+                     detection.confidence, detection.object_id, interpolated=True)
+
+def fill_skipped_frames(tracked_frames, mode="offline"):
+    """
+    Replace the missing detections of skipped frames with estimated ones.
+
+    Args:
+        tracked_frames (iterable): (frame, detections) pairs in video order, where
+            detections is None for a frame that was not sent to the model.
+        mode (str): "offline" to interpolate between keyframes or "live" to predict
+            from past keyframes only (see `INTERPOLATION_MODES`).
+
+    Yields:
+        tuple: A tuple containing:
+            - frame (np.ndarray): The frame, unchanged.
+            - detections (list): The tracked or estimated Detection objects of the frame.
+
+    Preconditions:
+        - The first frame must be a keyframe.
+    """
+    if mode not in INTERPOLATION_MODES:
+        raise ValueError(f"Unknown interpolation mode '{mode}', expected one of {INTERPOLATION_MODES}")
+
+    previous = [] # Detections of the keyframe before the last one
+    last = None # Detections of the last keyframe
+    gap = 1 # Frames between the last two keyframes
+    skipped = [] # Frames since the last keyframe
+
+    for frame, detections in tracked_frames:
+        if detections is not None:
+            if mode == "offline":
+                steps = len(skipped) + 1
+                for step, skipped_frame in enumerate(skipped, start=1):
+                    yield skipped_frame, blend_detections(last, detections, step / steps)
+            previous, last = last or [], detections
+            gap = len(skipped) + 1
+            skipped = []
+            yield frame, detections
+
+        elif mode == "live":
+            skipped.append(frame)
+            yield frame, _predict(previous, last, gap, len(skipped))
+        else:
+            skipped.append(frame)
+
+    # No keyframe follows the last skipped frames, so their boxes are predicted instead
+    if mode == "offline":
+        for step, skipped_frame in enumerate(skipped, start=1):
+            yield skipped_frame, _predict(previous, last, gap, step)
+
+def _predict(previous, last, gap, step):
+    # Objects seen in both keyframes keep moving, the others stay where they were last seen
+    moving = {detection.object_id: detection.box for detection in blend_detections(previous, last, 1 + step / gap)}
+    return [_moved(detection, moving.get(detection.object_id, detection.box), detection_id)
+            for detection_id, detection in enumerate(last)]
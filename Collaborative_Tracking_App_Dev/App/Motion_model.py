@@ -0,0 +1,168 @@
+"""
+Module Name: Motion_model.py
+
+Description:
+    This module predicts where tracked objects will be in the next frame. Each tracked
+    object has a constant-velocity Kalman filter over the centre, width and height of its
+    bounding box and their velocities. The states of all tracked objects are stacked into
+    NumPy arrays so that every object is predicted, and every matched object updated, with
+    a single batch of matrix operations per frame.
+
+    Gating a detection against the predicted box instead of the last seen box lets an
+    object that moves faster than the distance gate keep its ID, rather than being
+    treated as disappeared and then searched for among the disappeared objects.
+
+Usage:
+    Create a KalmanTracks, add() objects when they start being tracked, call predict()
+    once per frame before matching, read the predicted boxes with boxes(), then update()
+    the matched objects with their detected boxes and remove() those that disappeared.
+
+Dependencies:
+    - NumPy
+
+Author: team 120
+Date: 17/10/2026
+"""
+
+import numpy as np
+
+MOTION_MODELS = ("kalman", "static") # "static" gates against the last seen box
+
+STATE_SIZE = 8 # cx, cy, w, h and their velocities
+MEASUREMENT_SIZE = 4 # cx, cy, w, h
+
+# The state moves by its velocity at every frame
+TRANSITION = np.eye(STATE_SIZE)
+TRANSITION[:MEASUREMENT_SIZE, MEASUREMENT_SIZE:] = np.eye(MEASUREMENT_SIZE)
+# Only the box is measured, not its velocity
+OBSERVATION = np.eye(MEASUREMENT_SIZE, STATE_SIZE)
+
+def boxes_to_measurements(boxes):
+    # (x1, y1, x2, y2) boxes to (cx, cy, w, h)
+    boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+    return np.column_stack(((boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2,
+                            boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1]))
+
+def measurements_to_boxes(measurements):
+    # (cx, cy, w, h) to (x1, y1, x2, y2) boxes
+    cx, cy, w, h = np.asarray(measurements, dtype=float).reshape(-1, 4).T
+    return np.column_stack((cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2))
+
+class KalmanTracks:
+    """
+    Constant-velocity Kalman filters for a set of tracked objects, stored as stacked arrays.
+
+    Attributes:
+        states (np.ndarray): An (N, 8) array of the state of each object.
+        covariances (np.ndarray): An (N, 8, 8) array of the state covariance of each object.
+        rows (dict): Maps object IDs to their row in `states` and `covariances`.
+    """
+
+    def __init__(self, position_std=1.0, velocity_std=0.5, measurement_std=2.0, initial_velocity_std=10.0):
+        """
+        Initialize an empty set of filters.
+
+        Args:
+            position_std (float): The process noise of the box, in pixels per frame.
+            velocity_std (float): The process noise of the velocity, in pixels per frame per frame.
+            measurement_std (float): The noise of a detected box, in pixels.
+            initial_velocity_std (float): The uncertainty of the velocity of a new object, in pixels per frame.
+        """
+        self.process_noise = np.diag([position_std**2] * MEASUREMENT_SIZE + [velocity_std**2] * MEASUREMENT_SIZE)
+        self.measurement_noise = np.eye(MEASUREMENT_SIZE) * measurement_std**2
+        self.initial_covariance = np.diag([measurement_std**2] * MEASUREMENT_SIZE +
+                                          [initial_velocity_std**2] * MEASUREMENT_SIZE)
+        self.states = np.zeros((0, STATE_SIZE))
+        self.covariances = np.zeros((0, STATE_SIZE, STATE_SIZE))
+        self.rows = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, object_id):
+        return object_id in self.rows
+
+    def add(self, object_ids, boxes, previous_boxes=None, frames=None):
+        """
+        Start filters for new objects at their detected boxes.
+
+        New objects start at rest. If an earlier box of each object is known, they start 
+        with the velocity that moved them from that box to the detected one instead.
+
+        Args:
+            object_ids (list): The IDs of the objects, none of which may already be tracked.
+            boxes (np.ndarray): An (N, 4) array of their boxes in the format (x1, y1, x2, y2).
+            previous_boxes (np.ndarray): An (N, 4) array of earlier boxes of the objects, or None.
+            frames (np.ndarray): The number of frames between `previous_boxes` and `boxes`, counted
+                in calls to `predict`, that is only the frames sent to the model.
+        """
+        if not len(object_ids):
+            return
+        states = np.zeros((len(object_ids), STATE_SIZE))
+        states[:, :MEASUREMENT_SIZE] = boxes_to_measurements(boxes)
+        if previous_boxes is not None:
+            displacement = states[:, :MEASUREMENT_SIZE] - boxes_to_measurements(previous_boxes)
+            states[:, MEASUREMENT_SIZE:] = displacement / np.asarray(frames, dtype=float).reshape(-1, 1)
+        for offset, object_id in enumerate(object_ids):
+            self.rows[object_id] = len(self.states) + offset
+        self.states = np.concatenate((self.states, states))
+        self.covariances = np.concatenate((self.covariances, np.repeat(self.initial_covariance[None], len(object_ids), axis=0)))
+
+    def remove(self, object_ids):
+        """
+        Stop the filters of objects that are no longer tracked.
+
+        Args:
+            object_ids (list): The IDs of the objects.
+        """
+        if not len(object_ids):
+            return
+        keep = np.ones(len(self.states), dtype=bool)
+        keep[[self.rows.pop(object_id) for object_id in object_ids]] = False
+        self.states = self.states[keep]
+        self.covariances = self.covariances[keep]
+        # Rows after a removed one move up
+        new_rows = np.cumsum(keep) - 1
+        self.rows = {object_id: int(new_rows[row]) for object_id, row in self.rows.items()}
+
+    def predict(self):
+        """
+        Advance every object by one frame.
+        """
+        self.states = self.states @ TRANSITION.T
+        self.covariances = TRANSITION @ self.covariances @ TRANSITION.T + self.process_noise
+
+    def update(self, object_ids, boxes):
+        """
+        Correct the filters of objects with their detected boxes.
+
+        Args:
+            object_ids (list): The IDs of the matched objects.
+            boxes (np.ndarray): An (N, 4) array of their detected boxes in the format (x1, y1, x2, y2).
+        """
+        if not len(object_ids):
+            return
+        rows = np.array([self.rows[object_id] for object_id in object_ids])
+        states = self.states[rows]
+        covariances = self.covariances[rows]
+
+        innovation = boxes_to_measurements(boxes) - states @ OBSERVATION.T
+        innovation_covariance = OBSERVATION @ covariances @ OBSERVATION.T + self.measurement_noise
+        # Kalman gain K = P H^T S^-1, solved as S K^T = H P since P and S are symmetric
+        gain = np.linalg.solve(innovation_covariance, OBSERVATION @ covariances).transpose(0, 2, 1)
+
+        self.states[rows] = states + np.einsum("nij,nj->ni", gain, innovation)
+        self.covariances[rows] = covariances - gain @ OBSERVATION @ covariances
+
+    def boxes(self, object_ids):
+        """
+        Read the current boxes of objects.
+
+        Args:
+            object_ids (list): The IDs of the objects.
+
+        Returns:
+            np.ndarray: An (N, 4) array of their boxes in the format (x1, y1, x2, y2).
+        """
+        rows = np.array([self.rows[object_id] for object_id in object_ids], dtype=int)
+        return measurements_to_boxes(self.states[rows, :MEASUREMENT_SIZE])
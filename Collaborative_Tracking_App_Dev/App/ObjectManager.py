@@ -5,20 +5,47 @@ Description:
     This module provides the ObjManager class, which is designed to filter 
     and edit object annotations in a series of frames. It allows users to 
     modify bounding boxes: their shapes, positions, class labels, and 
-    object IDs. It can save the modified annotations to a JSON file.
+    object IDs. It can save the modified annotations to a JSON or .npz file.
+
+    Saving to the file the annotations were loaded from appends the edits made since
+    the last save to the file's journal (see Annotation_journal), rather than writing
+    every annotation again. Once the journal holds `compact_every` edits, the next save
+    writes the whole file and removes it. Each edit also records the edits that revert it,
+    so the edits made since the manager was created can be undone in reverse order.
+
+    Range edits change every box of an object within a range of frames, or the whole
+    video, at once: relabelling, re-IDing, moving or scaling them, and merging or
+    splitting object IDs. The object's rows come from the store's object index and each
+    edit is a single bulk update of the store, saved as one journal entry per field.
+
+    The annotations are held in a columnar AnnotationStore, whose indexes by
+    class and object ID give the boxes of a filter or of an object in a frame
+    without scanning the others. Annotation dictionaries are only built when a
+    frame of `data` or of a filter result is read, or when saving.
 
 Usage:
     To use the ObjManager, instantiate it with a reference array of annotations 
     and utilize its methods for editing and saving data.
 
 Dependencies:
-    - json
+    - NumPy
+    - Annotation_store: custom
+    - Annotation_journal: custom
 
 Author: team 120
 Date: 19/09/2024
 """
 
-import json
+import sys
+import os
+#Used for testing:
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import numpy as np
+from Annotation_store import AnnotationStore, AnnotationView, BOX_COORDS, save_annotations
+from Annotation_journal import AnnotationJournal, apply_entries
+
+COMPACT_EVERY = 1000 # Journaled edits after which a save writes the whole annotation file
 
 class ObjManager():
     """
@@ -29,27 +56,44 @@ class ObjManager():
     to specific boxes at designated frames, and changes can be flushed to a JSON file.
 
     Attributes:
-        data (list): A reference array containing the annotations for objects.
-        changedAnnotations (list): A list to keep track of any modified annotations.
+        store (AnnotationStore): The columns holding the annotations.
+        data (AnnotationView): The annotations of every frame, built from `store` as they are read.
+        changedAnnotations (AnnotationView): The result of the last filter.
         OGIDs (list): A list of original IDs for tracking purposes.
+        file_path (str): The annotation file holding the annotations as of the last save, if any.
+        journal (AnnotationJournal): The journal of the edits saved to `file_path` since it was last written in full.
+        pending (list): The edits made since the last save, in the journal's format.
+        history (list): For each edit, the journal entries that revert it, the latest last.
+        compact_every (int): The number of journaled edits after which a save writes the whole file.
 
     Methods:
         __init__(arrRef): Initializes the ObjManager with a reference array.
     """
 
-    def __init__(self, arrRef):
+    def __init__(self, arrRef, file_path=None):
         """
         Initialize the ObjManager with a reference array of annotations.
 
+        The annotations are copied into an AnnotationStore, edits are made to the store 
+        and are not reflected in `arrRef`.
+
         Args:
-            arrRef (list): The initial list of annotations to manage.
+            arrRef (list or AnnotationStore): The initial list of annotations to manage, or a store holding them.
+            file_path (str): The annotation file `arrRef` was loaded from, with its journal applied
+                (see Annotation_journal.load_journaled), so that saving to it only appends the edits.
 
         Preconditions:
             - The input `arrRef` must be a list of annotations in the expected format.
         """
-        self.data  = arrRef
+        self.store = arrRef if isinstance(arrRef, AnnotationStore) else AnnotationStore.from_frames(arrRef)
+        self.data = AnnotationView(self.store)
         self.changedAnnotations=[]
         self.OGIDs = []
+        self.file_path = file_path
+        self.journal = AnnotationJournal(file_path) if file_path else None
+        self.pending = []
+        self.history = []
+        self.compact_every = COMPACT_EVERY
         print("[ObjectManager] O.M. created")
 
     def clear(self):
@@ -63,13 +107,13 @@ class ObjManager():
             indexF (int): The index of the frame containing the bounding box to be edited.
             indexB (int): The index of the bounding box within the specified frame.
             coord (str): The coordinate to change ('x1', 'y1', 'x2', 'y2').
-            change_amount (int or float): The amount to adjust the specified coordinate.
+            change_amount (int or float): The amount to adjust the specified coordinate, rounded to whole pixels.
 
         Preconditions:
             - The specified indices must be valid for the `data` structure.
             - The `coord` argument must be one of 'x1', 'y1', 'x2', or 'y2'.
         """
-        self.data[indexF][indexB]["bounding_box"][coord] += change_amount
+        self._shift(indexF, indexB, (coord,), change_amount)
         print(f"[ObjectManager] edit: F{indexF} B{indexB}  {coord} += {change_amount}")
 
     def editMoveBoundingBoxVerticle(self,indexF,indexB, move_amount):
@@ -79,15 +123,12 @@ class ObjManager():
         Args:
             indexF (int): The index of the frame containing the bounding box to be edited.
             indexB (int): The index of the bounding box within the specified frame.
-            move_amount (int or float): The amount to move the bounding box vertically.
+            move_amount (int or float): The amount to move the bounding box vertically, rounded to whole pixels.
 
         Preconditions:
             - The specified indices must be valid for the `data` structure.
         """
-        y1 = self.data[indexF][indexB]["bounding_box"]["y1"]
-        y2 = self.data[indexF][indexB]["bounding_box"]["y2"]
-        self.data[indexF][indexB]["bounding_box"]["y1"] = y1 + move_amount
-        self.data[indexF][indexB]["bounding_box"]["y2"] = y2 + move_amount
+        self._shift(indexF, indexB, ("y1", "y2"), move_amount)
         print(f"[ObjectManager] edit: {indexF};{indexB}   yshifted by  {move_amount}")
 
     def editMoveBoundingBoxHorizontal(self,indexF,indexB, move_amount):
@@ -97,15 +138,12 @@ class ObjManager():
         Args:
             indexF (int): The index of the frame containing the bounding box to be edited.
             indexB (int): The index of the bounding box within the specified frame.
-            move_amount (int or float): The amount to move the bounding box horizontally.
+            move_amount (int or float): The amount to move the bounding box horizontally, rounded to whole pixels.
 
         Preconditions:
             - The specified indices must be valid for the `data` structure.
         """
-        x1 = self.data[indexF][indexB]["bounding_box"]["x1"]
-        x2 = self.data[indexF][indexB]["bounding_box"]["x2"]
-        self.data[indexF][indexB]["bounding_box"]["x1"] = x1 + move_amount
-        self.data[indexF][indexB]["bounding_box"]["x2"] = x2 + move_amount
+        self._shift(indexF, indexB, ("x1", "x2"), move_amount)
         print(f"[ObjectManager] edit: {indexF};{indexB}   xshifted by  {move_amount}")
 
     def editLabel(self,indexF,indexB,new_val):
@@ -121,7 +159,8 @@ class ObjManager():
             - The specified indices must be valid for the `data` structure.
             - The `new_val` should be a valid string representing the class label.
         """
-        self.data[indexF][indexB]["class"] = new_val
+        old_val = self.store.classes[self.store.class_codes[self.store.row(indexF, indexB)]]
+        self._set(indexF, indexB, "class", new_val, old_val)
         print(f"[ObjectManager] edit: {indexF};{indexB}   label   {new_val}")
 
     def editID(self, indexF, indexB, new_val):
@@ -137,52 +176,190 @@ class ObjManager():
             - The specified indices must be valid for the `data` structure.
             - The `new_val` should be a valid identifier (int or string) for the object.
         """
-        self.data[indexF][indexB]["objectID"] = new_val
+        old_val = self.store.object_ids[self.store.object_codes[self.store.row(indexF, indexB)]]
+        self._set(indexF, indexB, "objectID", new_val, old_val)
         print(f"[ObjectManager] edit: {indexF};{indexB}   ID   {new_val}")
 
+    def editRangeLabel(self, objID, new_val, startF=None, endF=None):
+        """
+        Relabel every box of an object within a range of frames.
+
+        Args:
+            objID (int or str): The object ID of the boxes.
+            new_val (str): The new class label.
+            startF (int): The first frame of the range, by default the first frame.
+            endF (int): The last frame of the range, included, by default the last frame.
+        """
+        startF, endF = self._frame_range(startF, endF)
+        rows = self._range_rows(objID, startF, endF)
+        self._edit_rows(rows, "class", new_val)
+        print(f"[ObjectManager] range edit: {objID} F{startF}-{endF}   label   {new_val}   ({len(rows)} boxes)")
+
+    def editRangeID(self, objID, new_val, startF=None, endF=None):
+        """
+        Change the object ID of every box of an object within a range of frames.
+
+        Args:
+            objID (int or str): The object ID of the boxes.
+            new_val (int or str): The new object ID.
+            startF (int): The first frame of the range, by default the first frame.
+            endF (int): The last frame of the range, included, by default the last frame.
+        """
+        startF, endF = self._frame_range(startF, endF)
+        rows = self._range_rows(objID, startF, endF)
+        self._edit_rows(rows, "objectID", new_val)
+        print(f"[ObjectManager] range edit: {objID} F{startF}-{endF}   ID   {new_val}   ({len(rows)} boxes)")
+
+    def editRangeMove(self, objID, x_amount, y_amount, startF=None, endF=None):
+        """
+        Move every box of an object within a range of frames.
+
+        Args:
+            objID (int or str): The object ID of the boxes.
+            x_amount (int or float): The amount to move the boxes horizontally, rounded to whole pixels.
+            y_amount (int or float): The amount to move the boxes vertically, rounded to whole pixels.
+            startF (int): The first frame of the range, by default the first frame.
+            endF (int): The last frame of the range, included, by default the last frame.
+        """
+        startF, endF = self._frame_range(startF, endF)
+        rows = self._range_rows(objID, startF, endF).tolist()
+        x_amount, y_amount = _pixels(x_amount), _pixels(y_amount)
+        entries = [{"rows": rows, "field": coord, "delta": amount}
+                   for coord, amount in (("x1", x_amount), ("y1", y_amount), ("x2", x_amount), ("y2", y_amount))
+                   if amount and rows]
+        self._edit(entries, [dict(entry, delta=-entry["delta"]) for entry in entries])
+        print(f"[ObjectManager] range edit: {objID} F{startF}-{endF}   shifted by  ({x_amount}, {y_amount})   ({len(rows)} boxes)")
+
+    def editRangeScale(self, objID, factor, startF=None, endF=None):
+        """
+        Scale every box of an object within a range of frames about its centre.
+
+        Args:
+            objID (int or str): The object ID of the boxes.
+            factor (float): The factor applied to the width and height of the boxes.
+            startF (int): The first frame of the range, by default the first frame.
+            endF (int): The last frame of the range, included, by default the last frame.
+        """
+        startF, endF = self._frame_range(startF, endF)
+        rows = self._range_rows(objID, startF, endF)
+        boxes = self.store.boxes[rows].astype(float)
+        centres = (boxes[:, :2] + boxes[:, 2:]) / 2
+        scaled = np.rint(np.hstack((centres - (centres - boxes[:, :2]) * factor,
+                                    centres + (boxes[:, 2:] - centres) * factor))).astype(int)
+        entries, reverting_entries = [], []
+        for column, coord in enumerate(BOX_COORDS):
+            if len(rows):
+                entries.append({"rows": rows.tolist(), "field": coord, "values": scaled[:, column].tolist()})
+                reverting_entries.append(dict(entries[-1], values=self.store.boxes[rows, column].tolist()))
+        self._edit(entries, reverting_entries)
+        print(f"[ObjectManager] range edit: {objID} F{startF}-{endF}   scaled by  {factor}   ({len(rows)} boxes)")
+
+    def mergeObjectIDs(self, keepID, mergedID, startF=None, endF=None):
+        """
+        Merge two objects by giving the boxes of one the object ID of the other.
+
+        Args:
+            keepID (int or str): The object ID kept.
+            mergedID (int or str): The object ID whose boxes take `keepID`.
+            startF (int): The first frame of the range, by default the first frame.
+            endF (int): The last frame of the range, included, by default the last frame.
+        """
+        startF, endF = self._frame_range(startF, endF)
+        rows = self._range_rows(mergedID, startF, endF)
+        # Frames in which both objects have a box end up with two boxes of the same ID
+        shared = np.intersect1d(self.store.row_frames(rows), self.store.row_frames(self._range_rows(keepID, startF, endF)))
+        self._edit_rows(rows, "objectID", keepID)
+        print(f"[ObjectManager] merged {mergedID} into {keepID} F{startF}-{endF}   ({len(rows)} boxes, {len(shared)} frames with both)")
+
+    def splitObjectID(self, objID, startF, new_val=None, endF=None):
+        """
+        Split an object in two by giving its boxes from a frame onwards a new object ID.
+
+        Args:
+            objID (int or str): The object ID to split.
+            startF (int): The first frame whose box takes the new ID.
+            new_val (int or str): The new object ID, by default one more than the largest integer ID.
+            endF (int): The last frame whose box takes the new ID, included, by default the last frame.
+
+        Returns:
+            int or str: The new object ID.
+        """
+        if new_val is None:
+            new_val = max((object_id for object_id in self.store.object_ids if isinstance(object_id, int)), default=-1) + 1
+        startF, endF = self._frame_range(startF, endF)
+        rows = self._range_rows(objID, startF, endF)
+        self._edit_rows(rows, "objectID", new_val)
+        print(f"[ObjectManager] split {objID} at F{startF}-{endF} into {new_val}   ({len(rows)} boxes)")
+        return new_val
+
+    def undo(self):
+        """
+        Revert the latest edit that has not been undone yet.
+
+        The reverting edits are saved like any other, so an edit that was already saved
+        is reverted in the file by the next save.
+
+        Returns:
+            list: The indexes of the frames whose annotations changed, empty if there was nothing to undo.
+        """
+        if not self.history:
+            print("[ObjectManager] nothing to undo")
+            return []
+        entries = self.history.pop()
+        apply_entries(self.store, entries)
+        self.pending.extend(entries)
+        frames = self._frames(entries)
+        print(f"[ObjectManager] undo: {len(entries)} changes in {len(frames)} frames")
+        return frames
+
     def writeChanges(self, file_path):
         """
-        Write the current data to a JSON file.
+        Save the current data to a JSON file, or to a compact .npz file if the path ends with .npz.
+
+        If `file_path` holds the annotations as of the last save, only the edits made since
+        are appended to its journal. Otherwise, or once the journal has `compact_every` edits,
+        the whole file is written, replacing it atomically, and its journal is removed.
 
         Args:
-            file_path (str): The path to the JSON file where the data will be saved.
+            file_path (str): The path to the file where the data will be saved.
 
         Preconditions:
             - The `file_path` must be a valid writable path.
             - The `data` structure must be properly populated with the annotations.
         """
-        with open(file_path, 'w') as json_file:
-            json.dump(self.data, json_file, indent=4)
-        print(f"[ObjectManager] overwritten {file_path}")
+        if (self.journal is not None and str(file_path) == str(self.file_path) and os.path.exists(file_path)
+                and self.journal.entry_count + len(self.pending) < self.compact_every):
+            self.journal.append(self.pending)
+            print(f"[ObjectManager] journaled {len(self.pending)} edits to {file_path}")
+        else:
+            save_annotations(self.store, file_path)
+            self.file_path = file_path
+            self.journal = AnnotationJournal(file_path)
+            self.journal.clear()
+            print(f"[ObjectManager] overwritten {file_path}")
+        self.pending = []
 
     def filterClass(self,filter_value): 
         """
         Filter bounding boxes by class label.
 
-        This method creates a new array of bounding boxes from the current data,
-        retaining only those that match the specified class label. The resulting 
-        array may contain empty entries for boxes that do not match the filter, 
-        allowing for preservation of indices for future edits.
+        This method selects the rows of the store that match the specified class label
+        from its index. The resulting view has an entry for every frame,
+        empty where no box matches, allowing for preservation of indices for future edits.
+        Its boxes are built when a frame is read, so they reflect later edits.
 
         Args:
             filter_value (str): The class label to filter by.
 
         Returns:
-            list: A list of filtered bounding boxes, with empty entries where 
+            AnnotationView: The filtered bounding boxes of each frame, with empty entries where 
                 the class did not match.
 
         Preconditions:
             - The `filter_value` must be a valid class label present in the data.
         """
         print("[Objectmanager] filterClass() running")
-        arrFiltered = []
-        
-        for frame in self.data:
-            for box in frame:
-                if box["class"] == filter_value:
-                    arrFiltered.append(box)
-            self.changedAnnotations.append(arrFiltered)
-            arrFiltered = []
+        self.changedAnnotations = AnnotationView(self.store, self.store.class_rows(filter_value))
         print(f"[ObjectManager] filtered frame for '{filter_value}' ")
         return self.changedAnnotations
     
@@ -190,31 +367,64 @@ class ObjManager():
         """
         Filter bounding boxes by object ID.
 
-        This method creates a new array of bounding boxes from the current data,
-        retaining only those that match the specified object ID. The resulting 
-        array may contain empty entries for boxes that do not match the filter, 
-        allowing for preservation of indices for future edits.
+        This method selects the rows of the store that match the specified object ID
+        from its index. The resulting view has an entry for every frame,
+        empty where no box matches, allowing for preservation of indices for future edits.
+        Its boxes are built when a frame is read, so they reflect later edits.
 
         Args:
             filter_value (int or str): The object ID to filter by.
 
         Returns:
-            list: A list of filtered bounding boxes, with empty entries where 
+            AnnotationView: The filtered bounding boxes of each frame, with empty entries where 
                 the object ID did not match.
 
         Preconditions:
             - The `filter_value` must be a valid object ID present in the data.
         """
-        arrFiltered = []
-        for frame in self.data:
-            for box in frame:
-                if box["objectID"] == filter_value:
-                    arrFiltered.append(box)
-            self.changedAnnotations.append(arrFiltered)
-            arrFiltered = []
+        self.changedAnnotations = AnnotationView(self.store, self.store.object_rows(filter_value))
         print(f"[ObjectManager] filtered frames for '{filter_value}' ")
         return self.changedAnnotations
 
+    def _shift(self, indexF, indexB, coords, amount):
+        amount = _pixels(amount)
+        entries = [{"frame": indexF, "box": indexB, "field": coord, "delta": amount} for coord in coords]
+        self._edit(entries, [dict(entry, delta=-amount) for entry in entries])
+
+    def _set(self, indexF, indexB, field, value, old_value):
+        entry = {"frame": indexF, "box": indexB, "field": field}
+        self._edit([dict(entry, value=value)], [dict(entry, value=old_value)])
+
+    def _frame_range(self, startF, endF):
+        return (0 if startF is None else startF), (len(self.store) - 1 if endF is None else endF)
+
+    def _range_rows(self, objID, startF, endF):
+        return self.store.rows_in_frames(self.store.object_rows(objID), startF, endF)
+
+    def _edit_rows(self, rows, field, value):
+        # Set the class or object ID of rows, reverted by setting each row back to its value
+        if not len(rows):
+            return
+        names, codes = (self.store.classes, self.store.class_codes) if field == "class" else (self.store.object_ids, self.store.object_codes)
+        old_values = [names[code] for code in codes[rows].tolist()]
+        entry = {"rows": rows.tolist(), "field": field}
+        reverting_entry = dict(entry, value=old_values[0]) if len(set(old_values)) == 1 else dict(entry, values=old_values)
+        self._edit([dict(entry, value=value)], [reverting_entry])
+
+    def _edit(self, entries, reverting_entries):
+        # Apply an edit, queue it for the next save and keep the entries that revert it
+        if not entries:
+            return
+        apply_entries(self.store, entries)
+        self.pending.extend(entries)
+        self.history.append(reverting_entries[::-1])
+
+    def _frames(self, entries):
+        rows = [row for entry in entries for row in entry.get("rows", [])]
+        frames = {entry["frame"] for entry in entries if "frame" in entry}
+        frames.update(np.searchsorted(self.store.frame_offsets, rows, side="right").astype(int) - 1)
+        return sorted(int(frame) for frame in frames)
+
     def getBox(box):
         bbox = box["bounding_box"]
         x1, y1 = bbox["x1"], bbox["y1"]
@@ -222,17 +432,14 @@ class ObjManager():
         return [x1,x2,y1,y2]
 
     def getOGIDs(self):
-        for frame in self.data:
-            for annotation in frame:
-                ID = annotation["objectID"]
-                self.OGIDs.append(ID)
+        self.OGIDs.extend(self.store.object_ids[code] for code in self.store.object_codes.tolist())
 
     def getObjIndexInFrame(self,indexF, objID):
         """
         Retrieve the index of a bounding box by its object ID in a specific frame.
 
-        This method searches for a bounding box with the specified object ID
-        within a given frame and returns its index. If the object ID is not found,
+        This method looks the object ID up in the store's object index and
+        returns the index of its box within the given frame. If the object ID is not found,
         it returns -1.
 
         Args:
@@ -246,8 +453,9 @@ class ObjManager():
         Preconditions:
             - The specified indexF must be valid for the `data` structure.
         """
-        indexB = 0
-        for box in self.data[indexF]:
-            if box["objectID"] == objID: return indexB
-            else: indexB +=1
-        return -1
\ No newline at end of file
+        return self.store.find_object(indexF, objID)
+
+
+def _pixels(amount):
+    # Boxes hold integer pixel coordinates, so shifts are rounded to whole pixels
+    return int(round(amount))
@@ -6,15 +6,29 @@ Description:
     It captures video frames, feeds them to the YOLO instance to detects items and
     and annotates each frame with bounding boxes, class names, and color information,
     then calculates tracking parameters across frames to track objects in a video.
+    The tracking itself lives in Tracker, which needs neither the video nor the model.
 
 Usage:
     To run the application, invoke the media_capture() function with the path to a video file.
+    Use media_capture_stream() instead to receive each annotated frame as soon as it is tracked.
+    Pass a stride above 1 to run the YOLO model on every stride-th frame only and estimate
+    the boxes of the frames in between (see Interpolation).
+    Pass a Detection_cache.DetectionCache to reuse the detections of an earlier run on the
+    same video and model, so that only tracking runs again.
+    Use media_capture_to_file() to write the annotations of a long video to disk as they
+    are produced, and to resume an interrupted run from its last committed frame, or run
+    this module with a video path to do so:
+
+    python App/ObjectTracking.py Media/Short_Video_1080p_Test.mp4
 
 Dependencies:
     - OpenCV
-    - NumPy
     - YOLO (YOLO_API)
-    - colormath
+    - Tracker: custom
+    - Box_geometry: custom
+    - Interpolation: custom
+    - Detection_cache: custom
+    - Annotation_stream: custom
 
 Author: team 120
 Date: 19/09/2024
@@ -27,54 +41,16 @@ sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
 import cv2
 from YOLO.YOLO_API import YOLO_model
-from colormath.color_objects import sRGBColor, LabColor
-from colormath.color_conversions import convert_color
+from Box_geometry import iou_matrix
+from Interpolation import fill_skipped_frames
+import Tracker
+from Tracker import TrackingParams, parse_results, frame_annotations, lab_converter
+from Annotation_stream import AnnotationWriter, continue_ids
 import math
 
 # Instantialize the YOLO model
 model = YOLO_model()
 
-def parse_results(class_id, score, box, average_colour, class_labels, class_colours):
-    """
-    Parse the results from YOLO model.
-
-    This function extracts and processes bounding box and class information from 
-    the detection results. It computes the center coordinates of the bounding box, 
-    retrieves the class name and its associated color, and converts the average color 
-    from sRGB to Lab color space.
-
-    Args:
-        class_id (int): The index of the detected class.
-        score (list or array): The confidence score for the detection.
-        box (tuple): A tuple containing the bounding box coordinates (x1, y1, x2, y2).
-        average_colour (tuple): A tuple representing the average color (R, G, B).
-        class_labels (list): A list of class names corresponding to class IDs.
-        class_colours (list): A list of colors corresponding to class IDs.
-
-    Returns:
-        list: A list containing the bounding box coordinates, center coordinates, 
-              class name, Lab color representation, RGB color values, confidence score, 
-              and a placeholder string.
-
-    Preconditions:
-        - `class_id` must be a valid index in `class_labels` and `class_colours`.
-        - `box` must contain four numeric values representing the bounding box corners.
-        - `average_colour` must contain three numeric values representing RGB color.
-    """
-    confidence=round(score[0],2)
-    class_name=class_labels[class_id]
-    (x1, y1, x2, y2) = box
-    cx = int((x1 + x2) / 2)
-    cy = int((y1 + y2) / 2)
-
-    class_colour=class_colours[class_id]
-    B, G, R = class_colour[0], class_colour[1], class_colour[2]
-
-    srgb = sRGBColor(average_colour[0]/255.0, average_colour[1]/255.0, average_colour[2]/255.0)
-    lab = convert_color(srgb, LabColor)
-
-    return [x1, y1, x2, y2, cx, cy, class_name, lab, B, G, R, confidence, "placeholder"]
-
 def delta_e_cie2000(lab1, lab2):
     """
     Popular algorithm to compare two LAB colours
@@ -167,6 +143,7 @@ def calculate_overlap_area(box1, box2):
     This function computes the Intersection over Union (IoU) percentage
     between two boxes defined by their corner coordinates. It returns the 
     percentage of the overlap area relative to the total area of the boxes.
+    It is a scalar wrapper around `Box_geometry.iou_matrix`.
 
     Args:
         box1 (tuple): A tuple containing the coordinates of the first box 
@@ -183,37 +160,96 @@ def calculate_overlap_area(box1, box2):
           where (x1, y1) are the coordinates of the top-left corner and 
           (x2, y2) are the coordinates of the bottom-right corner.
     """
-    x1_1, y1_1, x2_1, y2_1 = box1
-    x1_2, y1_2, x2_2, y2_2 = box2
-
-    # Determine the coordinates of the intersection rectangle
-    x_left = max(x1_1, x1_2)
-    y_top = max(y1_1, y1_2)
-    x_right = min(x2_1, x2_2)
-    y_bottom = min(y2_1, y2_2)
+    return float(iou_matrix([box1], [box2])[0, 0])
 
-    # Check if there is no overlap
-    if x_left >= x_right or y_top >= y_bottom:
-        return 0.0  # No overlap
+def detect_frames(cap, batch_size=1, max_frames=None, stride=1):
+    """
+    Read frames from a video capture and run the YOLO model on them in batches.
 
-    # Calculate the intersection area
-    overlap_width = x_right - x_left
-    overlap_height = y_bottom - y_top
-    intersection_area = overlap_width * overlap_height
+    Up to `batch_size` frames are decoded and sent through the model in a single 
+    call, then handed out one at a time in their original order. With a `stride` 
+    above 1, only every stride-th frame (a keyframe) is sent to the model; the 
+    frames in between are handed out without detections.
 
-    # Calculate the area of both boxes
-    area_box1 = (x2_1 - x1_1) * (y2_1 - y1_1)
-    area_box2 = (x2_2 - x1_2) * (y2_2 - y1_2)
+    Args:
+        cap (cv2.VideoCapture): The opened video capture to read frames from.
+        batch_size (int): The number of keyframes per model call.
+        max_frames (int): The largest number of frames to read, or None to read to the end.
+        stride (int): The number of frames from one keyframe to the next.
 
-    # Calculate the union area
-    union_area = area_box1 + area_box2 - intersection_area
+    Yields:
+        tuple: A tuple containing:
+            - frame (np.ndarray): The decoded frame.
+            - detections (tuple): The `detect_frame` results for the frame, or None 
+              if the frame is not a keyframe.
 
-    # Calculate the percentage of overlap (IoU)
-    overlap_percentage = (intersection_area / union_area) * 100
+    Preconditions:
+        - `batch_size` and `stride` must be at least 1.
+    """
+    frame_index = 0
+    while True:
+        frames = []
+        keyframes = []
+        while len(keyframes) < batch_size and frame_index != max_frames:
+            ret, frame = cap.read() # Read a frame from the video cap
+            if not ret:
+                break
+            is_keyframe = frame_index % stride == 0
+            frames.append((frame, is_keyframe))
+            if is_keyframe:
+                keyframes.append(frame)
+            frame_index += 1
+
+        results = iter(model.detect_batch(keyframes) if keyframes else ())
+        for frame, is_keyframe in frames:
+            yield frame, next(results) if is_keyframe else None
+        if len(keyframes) < batch_size:
+            return
+
+def cached_detect_frames(cap, file_path, batch_size=1, stride=1, detection_cache=None, start_frame=0):
+    """
+    Read frames from a video capture with their detections, reusing cached detections when possible.
 
-    return overlap_percentage
+    If `detection_cache` holds the detections of this video for the current model and 
+    confidence threshold, the frames are only decoded and paired with them. Otherwise the 
+    YOLO model runs as in `detect_frames`, and once every frame has been detected the 
+    results are saved to the cache. Runs with a stride above 1 skip frames, and runs 
+    starting after the first frame miss some, so they reuse a cache entry but never create one.
 
-def media_capture(file_path):
+    Args:
+        cap (cv2.VideoCapture): The opened video capture to read frames from.
+        file_path (str): The path of the video opened by `cap`.
+        batch_size (int): The number of keyframes per model call.
+        stride (int): The number of frames from one keyframe to the next.
+        detection_cache (DetectionCache): The cache to use, or None to always run the model.
+        start_frame (int): The index of the frame `cap` is positioned at.
+
+    Yields:
+        tuple: (frame, detections) pairs, see `detect_frames`.
+    """
+    if detection_cache is None:
+        yield from detect_frames(cap, batch_size, stride=stride)
+        return
+
+    key = detection_cache.key(file_path, model.model_path, model.conf)
+    cached = detection_cache.load(key)
+    if cached is not None:
+        for frame_index, detections in enumerate(cached[start_frame:]):
+            ret, frame = cap.read() # Read a frame from the video cap
+            if not ret:
+                break
+            yield frame, detections if frame_index % stride == 0 else None
+        return
+
+    recorded = []
+    for frame, detections in detect_frames(cap, batch_size, stride=stride):
+        recorded.append(detections)
+        yield frame, detections
+    if stride == 1 and start_frame == 0:
+        detection_cache.save(key, recorded)
+
+def media_capture(file_path, batch_size=1, association="hungarian", reid_ttl=300, reid_max_size=1000,
+                  stride=1, interpolation="offline", motion="kalman", detection_cache=None):
     """
     Captures video frames and annotates detected objects using a YOLO model.
 
@@ -224,148 +260,219 @@ def media_capture(file_path):
 
     Args:
         file_path (str): The path to the video file to be processed.
+        batch_size (int): The number of frames sent to the YOLO model per call.
+        association (str): The engine used to match tracked objects to detections, 
+            "hungarian" or "greedy" (see `Association.ASSOCIATION_METHODS`).
+        reid_ttl (int): The number of frames a disappeared object can still be 
+            re-identified, or None to keep it forever.
+        reid_max_size (int): The largest number of disappeared objects kept for 
+            re-identification, or None for no limit.
+        stride (int): Run the YOLO model on every stride-th frame only.
+        interpolation (str): How the boxes of the frames in between are estimated, 
+            "offline" or "live" (see `Interpolation.fill_skipped_frames`).
+        motion (str): How tracked objects are expected to move, "kalman" or "static" 
+            (see `track_detections`).
+        detection_cache (DetectionCache): Where the detections of the video are reused 
+            from or saved to, or None to always run the YOLO model.
 
     Returns:
         tuple: A tuple containing:
             - processed_frames (list): A list of frames with annotations applied.
             - annotations (list): A list of annotations for each detected object in each frame.
 
+    Preconditions:
+        - The input video file must be in a format supported by OpenCV.
+        - The YOLO model must be initialized and accessible via the global `model` variable.
+    """
+    annotations=[] # Array that will keep annotations to dump to file
+    processed_frames=[] # Array that will keep annotated frames
+
+    tracked_frames = media_capture_stream(file_path, batch_size, association, reid_ttl, reid_max_size, stride, 
+                                          interpolation, motion, detection_cache)
+    for _, frame, json_frame_annotations in tracked_frames:
+        annotations.append(json_frame_annotations)
+        processed_frames.append(frame)
+    return processed_frames, annotations
+
+def media_capture_stream(file_path, batch_size=1, association="hungarian", reid_ttl=300, reid_max_size=1000,
+                         stride=1, interpolation="offline", motion="kalman", detection_cache=None, start_frame=0):
+    """
+    Stream annotated video frames one at a time as they are tracked.
+
+    This generator runs the same detection and tracking as `media_capture`, but 
+    yields each frame as soon as it has been annotated instead of collecting the 
+    whole video first. Only the tracking state is kept between frames, so memory 
+    stays constant regardless of the video length.
+
+    Args:
+        file_path (str): The path to the video file to be processed.
+        batch_size (int): The number of frames sent to the YOLO model per call. 
+            Larger batches make better use of vectorised inference on the CPU.
+        association (str): The engine used to match tracked objects to detections, 
+            "hungarian" or "greedy" (see `Association.ASSOCIATION_METHODS`).
+        reid_ttl (int): The number of frames a disappeared object can still be 
+            re-identified, or None to keep it forever.
+        reid_max_size (int): The largest number of disappeared objects kept for 
+            re-identification, or None for no limit.
+        stride (int): Run the YOLO model on every stride-th frame only. The detected 
+            objects move up to `stride` times further between keyframes, so the distance 
+            gate of the tracker is widened accordingly.
+        interpolation (str): How the boxes of the frames in between are estimated, 
+            "offline" to interpolate between keyframes or "live" to extrapolate from past 
+            keyframes without holding frames back.
+        motion (str): How tracked objects are expected to move, "kalman" or "static" 
+            (see `track_detections`).
+        detection_cache (DetectionCache): Where the detections of the video are reused 
+            from or saved to, or None to always run the YOLO model (see `cached_detect_frames`).
+        start_frame (int): The index of the first frame to analyse. Tracking starts afresh 
+            at this frame.
+
+    Yields:
+        tuple: A tuple containing:
+            - frame_index (int): The index of the frame in the video, starting at `start_frame`.
+            - frame (np.ndarray): The frame with annotations applied.
+            - frame_annotations (list): The annotation dictionaries for the frame.
+
     Preconditions:
         - The input video file must be in a format supported by OpenCV.
         - The YOLO model must be initialized and accessible via the global `model` variable.
     """
     cap = cv2.VideoCapture(file_path) # Captures a video
-    count = 0 # Keeps track of number of objects
+    if start_frame:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+    detected_frames = cached_detect_frames(cap, file_path, batch_size, stride, detection_cache, start_frame)
+    tracked_frames = track_detections(detected_frames, association, reid_ttl, 
+                                      reid_max_size, max_distance=20 * stride, motion=motion)
+    if stride > 1:
+        tracked_frames = fill_skipped_frames(tracked_frames, interpolation)
+
+    for frame_index, (frame, detections) in enumerate(tracked_frames, start=start_frame):
+        json_frame_annotations = frame_annotations(detections)
+        draw_annotations(frame, json_frame_annotations)
+        yield frame_index, frame, json_frame_annotations
+    cap.release()
+
+def media_capture_to_file(file_path, annotation_path, resume=False, batch_size=1, association="hungarian",
+                          reid_ttl=300, reid_max_size=1000, stride=1, interpolation="offline", motion="kalman",
+                          detection_cache=None):
+    """
+    Analyse a video and write the annotations of each frame to a JSON file as soon as it is tracked.
 
-    class_labels = model.get_classes() # Class names
-    class_colours = model.get_colours() # Class colours
+    Neither the frames nor the annotations are kept, so memory stays constant regardless of 
+    the video length. If a run is interrupted, running it again with `resume` keeps the frames 
+    already written and analyses the video from the next frame; the object IDs of the resumed 
+    run continue those of the written frames (see `Annotation_stream.continue_ids`).
 
-    annotations=[] # Array that will keep annotations to dump to file
-    processed_frames=[] # Array that will keep annotated frames
-    
-    tracking_objects = {}
-    track_id = 0
+    Args:
+        file_path (str): The path to the video file to be processed.
+        annotation_path (str): The path of the JSON file the annotations are written to, or of a 
+            .npz file, which they are converted to once the video is finished.
+        resume (bool): Whether to continue after the frames already written to `annotation_path`.
+        batch_size (int): The number of frames sent to the YOLO model per call.
+        association (str): The engine used to match tracked objects to detections.
+        reid_ttl (int): The number of frames a disappeared object can still be re-identified.
+        reid_max_size (int): The largest number of disappeared objects kept for re-identification.
+        stride (int): Run the YOLO model on every stride-th frame only.
+        interpolation (str): How the boxes of the frames in between are estimated.
+        motion (str): How tracked objects are expected to move.
+        detection_cache (DetectionCache): Where the detections of the video are reused from 
+            or saved to, or None to always run the YOLO model.
 
-    disappeared_objects = {}
+    Returns:
+        int: The number of frames in the annotation file.
 
-    while True:
-        json_frame_annotations=[] # Array that keeps track of the json annotations of the current frame
-        dict_frame_annotations={} # Dictionary to keep info of each frame
-        ret, frame = cap.read() # Read a frame from the video cap
-        count += 1 
-        if not ret:
-            break
-
-        # Point to current frame
-        bbox_cur_frame = []
-
-        # Results from the YOLO model for the frame
-        (class_ids, scores, boxes, average_colours) = model.detect_frame(frame)
-
-        for (class_id, score, box, average_colour) in zip(class_ids, scores, boxes, average_colours):
-            object_details = parse_results(class_id, score, box, average_colour, class_labels, class_colours)
-            
-            bbox_cur_frame.append(tuple(object_details[:8]))
-            dict_frame_annotations[tuple(object_details[:8])] = object_details
-
-        # Only at the beginning we compare previous and current frame
-        if count == 1:
-            for pt in bbox_cur_frame:
-                tracking_objects[track_id]=pt
-                dict_frame_annotations[pt][12] = track_id 
-                track_id += 1
+    Raises:
+        ValueError: If `resume` is set and `annotation_path` exists but was not written by 
+            this function (see `Annotation_stream.AnnotationWriter`).
 
-        else:
-            tracking_objects_copy = tracking_objects.copy()
-            bbox_cur_frame_copy = bbox_cur_frame.copy()
-
-            for object_id, pt2 in tracking_objects_copy.items():
-                object_exists = False
-                for pt in bbox_cur_frame_copy:
-                    box1 = (pt[0],pt[1],pt[2],pt[3])
-                    box2 = (pt2[0],pt2[1],pt2[2],pt2[3])
-
-                    cx_1 = int(pt[4])
-                    cy_1 = int(pt[5])
-                    cx_2 = int(pt2[4])
-                    cy_2 = int(pt2[5])
-
-                    class1 = str(pt[6])
-                    class2 = str(pt2[6])
-
-                    LAB_1 = pt[7]
-                    LAB_2 = pt2[7]
-
-                    overlap =  calculate_overlap_area(box1, box2)
-                    distance = math.hypot(cx_2 - cx_1, cy_2 - cy_1) 
-                    delta_e = delta_e_cie2000(LAB_1,LAB_2)
-
-                    if (class1==class2) and (distance < 20 or overlap > 60) and delta_e <= 10:
-                        tracking_objects[object_id] = pt
-                        object_exists = True
-                        dict_frame_annotations[pt][12] = object_id
-                        if pt in bbox_cur_frame:
-                            bbox_cur_frame.remove(pt)
-                        continue
-                
-                if not object_exists:
-                    disappeared_objects[object_id] = pt2
-                    tracking_objects.pop(object_id)
-
-            # Check for objects that may have reappeared
-            for object_id, pt2 in list(disappeared_objects.items()):
-                for pt in bbox_cur_frame.copy():
-                    class1 = str(pt[6])
-                    class2 = str(pt2[6])
-
-                    LAB_1 = pt[7]
-                    LAB_2 = pt2[7]
-
-                    delta_e = delta_e_cie2000(LAB_1,LAB_2)
-
-                    if class1==class2 and delta_e < 5:  # If the object reappears close to its last position
-                        tracking_objects[object_id] = pt  # Reassign the same object_id
-                        dict_frame_annotations[pt][12] = object_id
-                        if pt in bbox_cur_frame:
-                            bbox_cur_frame.remove(pt)  # Remove from unmatched objects
-                        del disappeared_objects[object_id]  # Remove from disappeared list
-                        break
-
-            # Add new IDs found
-            for pt in bbox_cur_frame:
-                tracking_objects[track_id] = pt
-                dict_frame_annotations[pt][12] = track_id
-                track_id += 1
-
-        for an in dict_frame_annotations.values():
-            x1, y1, x2, y2, cx, cy, B, G, R = map(int, (an[0], an[1], an[2], an[3], an[4], an[5], an[8], an[9], an[10]))
-            class_name = str(an[6])
-            confidence = str(an[11])
-            IDstr = str(an[12])
-
-            cv2.circle(frame, (cx, cy), 5, (0, 0, 255), -1)
-            cv2.putText(frame, IDstr, (cx, cy - 7), 0, 1, (0, 0, 255), 2)
-            cv2.rectangle(frame, (x1, y1), (x2, y2), (B, G, R), 2)
-            cv2.putText(frame, f"{class_name} - {IDstr} - {confidence}", (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 1, (B, G, R), 2)
-            annotation = {
-                "class": class_name,
-                "confidence": confidence,
-                "objectID": IDstr,
-                "colours": {
-                    "B":B,
-                    "G":G,
-                    "R":R,
-                },
-
-                "bounding_box": {
-                    "x1": x1,
-                    "y1": y1,
-                    "x2": x2,
-                    "y2": y2,
-                },
-            }
-            json_frame_annotations.append(annotation)
+    Preconditions:
+        - The input video file must be in a format supported by OpenCV.
+    """
+    with AnnotationWriter(annotation_path, resume) as writer:
+        start_frame = writer.frame_count
+        previous_annotations = writer.last_frame
+        next_id = writer.max_object_id + 1
+        ids = None # Object IDs of a resumed run mapped to those written, set on its first frame
+
+        for _, _, json_frame_annotations in media_capture_stream(file_path, batch_size, association, reid_ttl,
+                                                                 reid_max_size, stride, interpolation, motion,
+                                                                 detection_cache, start_frame):
+            if start_frame:
+                if ids is None:
+                    ids = continue_ids(previous_annotations, json_frame_annotations, association)
+                for annotation in json_frame_annotations:
+                    if annotation["objectID"] not in ids:
+                        ids[annotation["objectID"]] = str(next_id)
+                        next_id += 1
+                    annotation["objectID"] = ids[annotation["objectID"]]
+            writer.write(json_frame_annotations)
+        return writer.frame_count
+
+def track_detections(detected_frames, association="hungarian", reid_ttl=300, reid_max_size=1000, max_distance=20,
+                     motion="kalman"):
+    """
+    Track detected objects across frames with the classes of the YOLO model.
 
-        annotations.append(json_frame_annotations)
-        processed_frames.append(frame)
-    return processed_frames, annotations
\ No newline at end of file
+    This runs `Tracker.track_detections` with the class names and colours of the global 
+    `model` and the default thresholds, except for the settings given here.
+
+    Args:
+        detected_frames (iterable): (frame, detections) pairs, where detections are the 
+            `detect_frame` results of the frame, or None if it was not sent to the model.
+        association (str): The engine used to match tracked objects to detections, 
+            "hungarian" or "greedy" (see `Association.ASSOCIATION_METHODS`).
+        reid_ttl (int): The number of frames a disappeared object can still be 
+            re-identified, or None to keep it forever.
+        reid_max_size (int): The largest number of disappeared objects kept for 
+            re-identification, or None for no limit.
+        max_distance (float): The centroid distance, in pixels, below which a tracked 
+            object and a detection are close enough to match.
+        motion (str): How tracked objects are expected to move, "kalman" or "static" 
+            (see `Tracker.TrackingParams`).
+
+    Yields:
+        tuple: (frame, detections) pairs, see `Tracker.track_detections`.
+
+    Preconditions:
+        - The YOLO model must be initialized and accessible via the global `model` variable.
+    """
+    params = TrackingParams(association=association, max_distance=max_distance, reid_ttl=reid_ttl, 
+                            reid_max_size=reid_max_size, motion=motion)
+    return Tracker.track_detections(detected_frames, model.get_classes(), model.get_colours(), params)
+
+def draw_annotations(frame, annotations):
+    """
+    Draw the bounding boxes, centres, IDs, classes and confidences of a frame's annotations.
+
+    Args:
+        frame (np.ndarray): The frame to draw on, modified in place.
+        annotations (list): The annotation dictionaries of the frame.
+    """
+    for annotation in annotations:
+        bbox = annotation["bounding_box"]
+        colours = annotation["colours"]
+        x1, y1, x2, y2 = bbox["x1"], bbox["y1"], bbox["x2"], bbox["y2"]
+        B, G, R = colours["B"], colours["G"], colours["R"]
+        cx = int((x1 + x2) / 2)
+        cy = int((y1 + y2) / 2)
+        class_name = annotation["class"]
+        confidence = annotation["confidence"]
+        IDstr = annotation["objectID"]
+
+        cv2.circle(frame, (cx, cy), 5, (0, 0, 255), -1)
+        cv2.putText(frame, IDstr, (cx, cy - 7), 0, 1, (0, 0, 255), 2)
+        cv2.rectangle(frame, (x1, y1), (x2, y2), (B, G, R), 2)
+        cv2.putText(frame, f"{class_name} - {IDstr} - {confidence}", (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 1, (B, G, R), 2)
+
+if __name__ == "__main__":
+    # Writes the annotations where the app looks for them, resuming an interrupted run
+    video_path = sys.argv[1]
+    json_path = os.path.join(os.path.abspath(os.path.dirname(__file__)), "JSON_files",
+                             os.path.splitext(os.path.basename(video_path))[0] + ".json")
+    try:
+        frames = media_capture_to_file(video_path, json_path, resume=True)
+    except ValueError as error:
+        # An annotation file saved by the app, which may hold edits, is never overwritten
+        print(f"[ObjectTracking] {error}; move it away to analyse the video again")
+        sys.exit(1)
+    print(f"[ObjectTracking] {frames} frames of annotations saved to {json_path}")
@@ -0,0 +1,296 @@
+"""
+Module Name: Pipeline.py
+
+Description:
+    This module runs video analysis as a staged pipeline so that decoding, inference,
+    tracking and drawing overlap instead of running one after another. Each stage runs
+    on its own thread and hands frames to the next stage through a bounded queue, which
+    applies backpressure: a fast stage blocks once the queue ahead of it is full.
+    OpenCV and torch release the GIL while they work, so decoding and drawing proceed
+    while the model runs. Tracking is a single stage and sees the frames in video order.
+
+        decode -> inference -> tracking -> drawing -> caller
+
+Usage:
+    Iterate over media_capture_pipeline() exactly like ObjectTracking.media_capture_stream().
+    Run this module with a video path to benchmark the frames per second of each stage:
+
+    python App/Pipeline.py Media/Short_Video_1080p_Test.mp4 [batch_size]
+
+Dependencies:
+    - threading / queue: For the stages and the queues between them.
+    - cv2 (OpenCV): For decoding the video.
+    - ObjectTracking: custom
+    - Interpolation: custom
+    - Detection_cache (optional): custom
+
+Author: team 120
+Date: 17/10/2026
+"""
+
+import sys
+import os
+#Used for testing:
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import queue
+import threading
+import time
+import cv2
+import ObjectTracking
+from Interpolation import fill_skipped_frames
+
+STAGES = ("decode", "inference", "tracking", "drawing")
+
+class StageStats:
+    """
+    Counts the frames a pipeline stage handled and the time it spent working on them.
+
+    Attributes:
+        name (str): The name of the stage.
+        frames (int): The number of frames the stage has finished.
+        busy_time (float): The seconds spent working, excluding time waiting on queues.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.frames = 0
+        self.busy_time = 0.0
+        self.started = None
+
+    def start(self):
+        self.started = time.perf_counter()
+
+    def stop(self, frames=1):
+        # Frames handed out together after one piece of work, such as the frames skipped by a
+        # stride, which are filled in once the next keyframe is tracked, add no more time
+        if self.started is not None:
+            self.busy_time += time.perf_counter() - self.started
+            self.started = None
+        self.frames += frames
+
+    def fps(self):
+        return self.frames / self.busy_time if self.busy_time > 0 else 0.0
+
+class _StageError:
+    """Carries an exception raised in a stage down to the caller."""
+    def __init__(self, error):
+        self.error = error
+
+class _Interrupted(Exception):
+    """Raised in a stage when an upstream stage failed or the pipeline is stopping."""
+
+_DONE = object() # Marks the end of a stage's output
+
+def _put(output, item, stop):
+    # Blocks while the queue is full, unless the pipeline is being shut down
+    while not stop.is_set():
+        try:
+            output.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _drain(source, output, stop):
+    # Yields items until the upstream stage is done, forwarding upstream errors
+    while not stop.is_set():
+        try:
+            item = source.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if item is _DONE:
+            return
+        if isinstance(item, _StageError):
+            _put(output, item, stop)
+            raise _Interrupted()
+        yield item
+    raise _Interrupted()
+
+def _run_stage(work, output, stop):
+    try:
+        work()
+    except _Interrupted:
+        pass
+    except BaseException as error:
+        _put(output, _StageError(error), stop)
+    finally:
+        _put(output, _DONE, stop)
+
+def media_capture_pipeline(file_path, batch_size=1, queue_size=8, association="hungarian",
+                           reid_ttl=300, reid_max_size=1000, stats=None, detection_cache=None, draw=True,
+                           stride=1, interpolation="offline", motion="kalman"):
+    """
+    Stream annotated video frames from a pipeline of decode, inference, tracking and drawing threads.
+
+    This yields the same frames and annotations as `ObjectTracking.media_capture_stream`,
+    in the same order, while the stages run concurrently.
+
+    Args:
+        file_path (str): The path to the video file to be processed.
+        batch_size (int): The number of frames sent to the YOLO model per call.
+        queue_size (int): The number of frames each queue between two stages can hold.
+        association (str): The engine used to match tracked objects to detections.
+        reid_ttl (int): The number of frames a disappeared object can still be re-identified.
+        reid_max_size (int): The largest number of disappeared objects kept for re-identification.
+        stats (dict): If given, filled with a StageStats object for each stage name in `STAGES`.
+        detection_cache (DetectionCache): Where the detections of the video are reused from 
+            or saved to, or None to always run the YOLO model. On a cache hit the inference 
+            stage hands out the cached detections instead of running the model.
+        draw (bool): Whether the drawing stage draws the annotations onto the frames. When False 
+            the frames are yielded as they were decoded, for callers that draw them on display.
+        stride (int): Run the YOLO model on every stride-th frame only, see 
+            `ObjectTracking.media_capture_stream`. The inference stage counts keyframes only.
+        interpolation (str): How the boxes of the frames in between are estimated, "offline" 
+            or "live". Offline interpolation holds frames back in the tracking stage until the 
+            next keyframe is tracked.
+        motion (str): How tracked objects are expected to move, "kalman" or "static".
+
+    Yields:
+        tuple: A tuple containing:
+            - frame_index (int): The index of the frame in the video, starting at 0.
+            - frame (np.ndarray): The frame with annotations applied, unless `draw` is False.
+            - frame_annotations (list): The annotation dictionaries for the frame.
+
+    Preconditions:
+        - The input video file must be in a format supported by OpenCV.
+    """
+    if stats is None:
+        stats = {}
+    stats.update({name: StageStats(name) for name in STAGES})
+
+    stop = threading.Event()
+    decoded, detected, tracked, drawn = (queue.Queue(maxsize=queue_size) for _ in STAGES)
+
+    def decode():
+        cap = cv2.VideoCapture(file_path) # Captures a video
+        try:
+            while not stop.is_set():
+                stats["decode"].start()
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                stats["decode"].stop()
+                _put(decoded, frame, stop)
+        finally:
+            cap.release()
+
+    def inference():
+        frames = _drain(decoded, detected, stop)
+        if detection_cache is not None:
+            model = ObjectTracking.model
+            key = detection_cache.key(file_path, model.model_path, model.conf)
+            cached = detection_cache.load(key)
+            if cached is not None:
+                for frame_index, (frame, detections) in enumerate(zip(frames, cached)):
+                    is_keyframe = frame_index % stride == 0
+                    if is_keyframe:
+                        stats["inference"].start()
+                        stats["inference"].stop()
+                    _put(detected, (frame, detections if is_keyframe else None), stop)
+                return
+            recorded = []
+
+        frame_index = 0
+        done = False
+        while not done:
+            # The frames up to the batch's last keyframe, handed out in order once it is detected
+            pending = []
+            batch = []
+            for frame in frames:
+                pending.append(frame)
+                if frame_index % stride == 0:
+                    batch.append(frame)
+                frame_index += 1
+                if len(batch) == batch_size:
+                    break
+            else:
+                done = True
+            keyframe_detections = iter(())
+            if batch:
+                stats["inference"].start()
+                results = ObjectTracking.model.detect_batch(batch)
+                stats["inference"].stop(len(batch))
+                if detection_cache is not None:
+                    recorded.extend(results)
+                keyframe_detections = iter(results)
+            for index, frame in enumerate(pending, start=frame_index - len(pending)):
+                _put(detected, (frame, next(keyframe_detections) if index % stride == 0 else None), stop)
+
+        # Only reached once every frame has been detected, strided runs miss some
+        if detection_cache is not None and stride == 1:
+            detection_cache.save(key, recorded)
+
+    def timed_detections():
+        for item in _drain(detected, tracked, stop):
+            stats["tracking"].start()
+            yield item
+
+    def tracking():
+        # Objects move up to `stride` times further between keyframes, so the distance gate is widened
+        tracked_frames = ObjectTracking.track_detections(timed_detections(), association, reid_ttl, reid_max_size,
+                                                         max_distance=20 * stride, motion=motion)
+        if stride > 1:
+            tracked_frames = fill_skipped_frames(tracked_frames, interpolation)
+        for item in tracked_frames:
+            stats["tracking"].stop()
+            _put(tracked, item, stop)
+
+    def drawing():
+        for frame_index, (frame, detections) in enumerate(_drain(tracked, drawn, stop)):
+            stats["drawing"].start()
+            json_frame_annotations = ObjectTracking.frame_annotations(detections)
+            if draw:
+                ObjectTracking.draw_annotations(frame, json_frame_annotations)
+            stats["drawing"].stop()
+            _put(drawn, (frame_index, frame, json_frame_annotations), stop)
+
+    threads = [
+        threading.Thread(target=_run_stage, args=(work, output, stop), daemon=True)
+        for work, output in ((decode, decoded), (inference, detected), (tracking, tracked), (drawing, drawn))
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            item = drawn.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _StageError):
+                raise item.error
+            yield item
+    finally:
+        # Unblocks every stage if the caller stops early or an error occurred
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+def benchmark(file_path, batch_size=1, queue_size=8):
+    """
+    Run the pipeline over a video and report the frames per second of each stage.
+
+    A stage's rate only counts the time it spends working, so the slowest stage bounds
+    the overall rate, which is reported last.
+
+    Args:
+        file_path (str): The path to the video file to be processed.
+        batch_size (int): The number of frames sent to the YOLO model per call.
+        queue_size (int): The number of frames each queue between two stages can hold.
+
+    Returns:
+        dict: The frames per second of each stage and of the whole pipeline ("overall").
+    """
+    stats = {}
+    start = time.perf_counter()
+    frames = sum(1 for _ in media_capture_pipeline(file_path, batch_size, queue_size, stats=stats))
+    elapsed = time.perf_counter() - start
+
+    results = {name: stats[name].fps() for name in STAGES}
+    results["overall"] = frames / elapsed if elapsed > 0 else 0.0
+    for name, fps in results.items():
+        print(f"[Pipeline] {name:<10} {fps:8.1f} fps")
+    return results
+
+if __name__ == "__main__":
+    benchmark(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 1)
@@ -0,0 +1,152 @@
+"""
+Module Name: Reidentification.py
+
+Description:
+    This module keeps the objects that have disappeared from the video so that they can
+    be recognised when they reappear. Entries are indexed by class and by a quantised
+    lightness (L*) bucket of their Lab colour, so that a reappearing detection is only
+    compared with disappeared objects of the same class and a similar colour.
+
+    Lightness is the colour channel that CIEDE2000 bounds tightly: the lightness term
+    alone already exceeds the threshold once |dL| > threshold * 1.75, so the neighbouring
+    buckets that are searched always contain every object that could pass the threshold.
+
+    The store is bounded: entries older than a time-to-live (in frames) are dropped, and
+    once the maximum size is reached the least recently disappeared object is evicted.
+
+Usage:
+    Create a ReidentificationStore, add() objects as they disappear, call expire() once
+    per frame and use candidates() to find which objects a detection could be.
+
+Dependencies:
+    - collections
+
+Author: team 120
+Date: 17/10/2026
+"""
+
+import math
+from collections import OrderedDict
+
+# Largest value of the CIEDE2000 lightness weighting SL, reached at L* = 0 and L* = 100
+MAX_LIGHTNESS_WEIGHT = 1 + 0.015 * 50**2 / math.sqrt(20 + 50**2)
+
+class ReidentificationStore:
+    """
+    A bounded store of disappeared objects indexed by class and lightness bucket.
+
+    Attributes:
+        ttl (int): The number of frames an object is kept after disappearing, or None to keep it forever.
+        max_size (int): The largest number of objects kept, or None for no limit.
+        bucket_size (float): The width of a lightness bucket in L* units.
+        entries (OrderedDict): Maps object IDs to (details, class_name, bucket, frame_index, sequence),
+            ordered from the least to the most recently disappeared.
+        index (dict): Maps (class_name, bucket) to the set of object IDs in that bucket.
+    """
+
+    def __init__(self, ttl=300, max_size=1000, bucket_size=10, max_delta_e=5):
+        """
+        Initialize an empty store.
+
+        Args:
+            ttl (int): The number of frames an object is kept after disappearing, or None to keep it forever.
+            max_size (int): The largest number of objects kept, or None for no limit.
+            bucket_size (float): The width of a lightness bucket in L* units.
+            max_delta_e (float): The CIEDE2000 threshold used to recognise a reappearing object,
+                which decides how many neighbouring buckets are searched.
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self.bucket_size = bucket_size
+        self.bucket_radius = math.ceil(max_delta_e * MAX_LIGHTNESS_WEIGHT / bucket_size)
+        self.entries = OrderedDict()
+        self.index = {}
+        self.added = 0 # Number of objects ever added, orders the candidates
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, object_id):
+        return object_id in self.entries
+
+    def _bucket(self, lightness):
+        return int(lightness // self.bucket_size)
+
+    def add(self, object_id, details, class_name, lightness, frame_index):
+        """
+        Store an object that disappeared, evicting the oldest object if the store is full.
+
+        Args:
+            object_id (int): The ID of the object.
+            details (tuple): The last known details of the object.
+            class_name (str): The class of the object.
+            lightness (float): The L* value of the object's Lab colour.
+            frame_index (int): The frame in which the object disappeared.
+        """
+        if object_id in self.entries:
+            self.remove(object_id)
+
+        bucket = self._bucket(lightness)
+        self.entries[object_id] = (details, class_name, bucket, frame_index, self.added)
+        self.added += 1
+        self.index.setdefault((class_name, bucket), set()).add(object_id)
+
+        if self.max_size is not None:
+            while len(self.entries) > self.max_size:
+                self.remove(next(iter(self.entries)))
+
+    def remove(self, object_id):
+        """
+        Remove an object from the store.
+
+        Args:
+            object_id (int): The ID of the object.
+
+        Returns:
+            tuple: The details the object was stored with.
+
+        Preconditions:
+            - `object_id` must be in the store.
+        """
+        details, class_name, bucket, _, _ = self.entries.pop(object_id)
+        ids = self.index[(class_name, bucket)]
+        ids.discard(object_id)
+        if not ids:
+            del self.index[(class_name, bucket)]
+        return details
+
+    def expire(self, frame_index):
+        """
+        Drop every object that disappeared more than `ttl` frames before `frame_index`.
+
+        Args:
+            frame_index (int): The current frame.
+        """
+        if self.ttl is None:
+            return
+        # Entries are ordered by the frame they disappeared in, so only the front can expire
+        while self.entries:
+            object_id, (_, _, _, disappeared_at, _) = next(iter(self.entries.items()))
+            if frame_index - disappeared_at <= self.ttl:
+                break
+            self.remove(object_id)
+
+    def candidates(self, queries):
+        """
+        Find the objects that could match any of a set of detections.
+
+        Args:
+            queries (list): (class_name, lightness) pairs describing the detections.
+
+        Returns:
+            list: The (object_id, details) pairs of the candidate objects, ordered from the
+                  least to the most recently disappeared.
+        """
+        found = set()
+        for class_name, lightness in queries:
+            bucket = self._bucket(lightness)
+            for neighbour in range(bucket - self.bucket_radius, bucket + self.bucket_radius + 1):
+                found.update(self.index.get((class_name, neighbour), ()))
+
+        ranked = sorted(found, key=lambda object_id: self.entries[object_id][4])
+        return [(object_id, self.entries[object_id][0]) for object_id in ranked]
@@ -0,0 +1,71 @@
+"""
+Module Name: Shard_worker.py
+
+Description:
+    This module holds the code run by the worker processes of Sharding. A worker started
+    with the "spawn" start method is a fresh interpreter, which finds the functions it is
+    given to run by importing their module by name. Like every App module, this one is
+    imported by its top-level name, and it does not load the YOLO model when imported, so
+    importing it in the main process costs nothing. Each worker's initializer puts the App directory
+    on sys.path and loads ObjectTracking, and with it the worker's own model.
+
+Usage:
+    Pass init_worker as the initializer of a process pool, with the App directory and the
+    class colours of the main process's model, and map analyse_segment over the segments.
+    See Sharding.media_capture_sharded().
+
+Dependencies:
+    - cv2 (OpenCV): For reading the video.
+    - ObjectTracking: custom, loaded in each worker
+
+Author: team 120
+Date: 17/10/2026
+"""
+
+import sys
+import cv2
+
+ObjectTracking = None # The worker's ObjectTracking module, loaded by init_worker
+
+def init_worker(app_directory, class_colours):
+    """
+    Load the YOLO model of a worker process.
+
+    Args:
+        app_directory (str): The App directory, from which ObjectTracking and its siblings are imported.
+        class_colours (np.ndarray): The class colours of the main process's model. Every worker
+            loads its own model, but all of them must draw classes in the same colours.
+    """
+    global ObjectTracking
+    if app_directory not in sys.path:
+        sys.path.insert(0, app_directory)
+    import ObjectTracking as object_tracking
+    ObjectTracking = object_tracking
+    ObjectTracking.model.colours = class_colours
+
+def analyse_segment(segment, file_path, batch_size=1, association="hungarian", reid_ttl=300, reid_max_size=1000):
+    """
+    Detect and track the objects of one segment of a video.
+
+    Args:
+        segment (tuple): The (start, length) of the segment, see `Sharding.split_segments`.
+        file_path (str): The path to the video file.
+        batch_size (int): The number of frames sent to the YOLO model per call.
+        association (str): The engine used to match tracked objects to detections.
+        reid_ttl (int): The number of frames a disappeared object can still be re-identified.
+        reid_max_size (int): The largest number of disappeared objects kept for re-identification.
+
+    Returns:
+        list: The tracked Detection objects of each frame of the segment, with IDs local to the segment.
+
+    Preconditions:
+        - `init_worker` must have run in the process.
+    """
+    start, length = segment
+    cap = cv2.VideoCapture(file_path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    detected_frames = ObjectTracking.detect_frames(cap, batch_size, max_frames=length)
+    segment_detections = [detections for _, detections in
+                          ObjectTracking.track_detections(detected_frames, association, reid_ttl, reid_max_size)]
+    cap.release()
+    return segment_detections
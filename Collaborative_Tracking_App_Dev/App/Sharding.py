@@ -0,0 +1,220 @@
+"""
+Module Name: Sharding.py
+
+Description:
+    This module analyses a long video in parallel. The video is split into consecutive
+    time segments, and each segment is detected and tracked by a worker process with its
+    own YOLO model. The object IDs of each segment are local to it, so the segments are
+    then stitched together: the objects seen just before a segment boundary are matched to
+    the objects seen just after it with the same class, distance, overlap and colour rules
+    used by the tracker, and take over their IDs. Every other object is given a new ID, so
+    that the result reads like a single tracking run.
+
+    An object missing on both sides of a boundary is re-identified by class and colour, as
+    the tracker does within a segment, if it was missing for fewer than `reid_ttl` frames.
+    Stitching only sees the objects on each side of a boundary, not the tracker's state,
+    so a few objects can still be matched differently than in a single run.
+
+Usage:
+    Call media_capture_sharded() with the path to a video file to obtain the annotations
+    of every frame in the same format as ObjectTracking.media_capture(). Frames are not
+    kept, as this mode is meant for batch analysis of long footage.
+    Run this module to write the annotations where the app looks for them:
+
+    python App/Sharding.py Media/Short_Video_1080p_Test.mp4 [workers]
+
+Dependencies:
+    - concurrent.futures / multiprocessing: For the worker processes.
+    - cv2 (OpenCV): For reading the video.
+    - json: For saving the annotations when run as a script.
+    - NumPy
+    - ObjectTracking: custom
+    - Shard_worker: custom
+    - Colour_processing: custom
+    - Box_geometry: custom
+    - Association: custom
+    - Detection: custom
+
+Author: team 120
+Date: 17/10/2026
+"""
+
+import sys
+import os
+#Used for testing:
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import math
+import json
+from pathlib import Path
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import cv2
+import numpy as np
+import ObjectTracking
+import Shard_worker
+from Colour_processing import delta_e_cie2000_matrix
+from Box_geometry import iou_matrix, centroid_distance_matrix, class_match_matrix, association_gate
+from Association import association_cost, associate
+from Detection import detection_arrays
+
+def frame_count(file_path):
+    """
+    Count the frames of a video.
+
+    Args:
+        file_path (str): The path to the video file.
+
+    Returns:
+        int: The number of frames reported by the video container.
+    """
+    cap = cv2.VideoCapture(file_path)
+    count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return count
+
+def split_segments(total_frames, segment_count):
+    """
+    Split a video into consecutive segments of nearly equal length.
+
+    The last segment has no end so that it reads up to the real end of the video,
+    even if the container reported a wrong frame count.
+
+    Args:
+        total_frames (int): The number of frames of the video.
+        segment_count (int): The number of segments wanted.
+
+    Returns:
+        list: (start, length) pairs, where `length` is None for the last segment.
+    """
+    length = max(1, math.ceil(total_frames / max(1, segment_count)))
+    starts = list(range(0, max(total_frames, 1), length))
+    return [(start, length) for start in starts[:-1]] + [(starts[-1], None)]
+
+def _boundary_objects(frames):
+    # The first Detection of every object ID met while walking through `frames`, and the
+    # number of frames walked before it
+    objects = {}
+    for offset, detections in enumerate(frames):
+        for detection in detections:
+            objects.setdefault(detection.object_id, (detection, offset))
+    return [detection for detection, _ in objects.values()], np.array([offset for _, offset in objects.values()], dtype=int)
+
+def stitch_segments(segments, association="hungarian", window=10, reid_ttl=300):
+    """
+    Give the objects of consecutive segments IDs that are unique across the whole video.
+
+    The IDs of the first segment are kept. At every later boundary, the last sighting of each 
+    object before it is matched to the first sighting of each object after it. First, sightings 
+    within `window` frames of the boundary are matched if they pass the gate used between 
+    consecutive frames. The objects left over are then matched if their sightings are fewer than 
+    `reid_ttl` frames apart and pass the rule used to re-identify a disappeared object (same class 
+    and a colour difference below 5). This gives back their ID to objects that leave before a 
+    boundary and return after it, as the tracker of a single run does. Matched objects take over 
+    the earlier ID, and the remaining objects are numbered after the largest ID given so far, in 
+    the order in which they first appear.
+
+    Args:
+        segments (list): The tracked detections of each segment, see `Shard_worker.analyse_segment`.
+            Their object IDs are replaced in place.
+        association (str): The engine used to match objects across a boundary.
+        window (int): The number of frames on each side of a boundary within which objects
+            can be matched by position.
+        reid_ttl (int): The number of frames an object can be missing and still be re-identified 
+            across a boundary, or None for no limit.
+
+    Returns:
+        list: The tracked Detection objects of every frame of the video.
+    """
+    stitched = []
+    next_id = 0
+    for segment in segments:
+        if not segment:
+            continue
+
+        ids = {}
+        if stitched:
+            # Last sighting of each object before the boundary, first sighting after it
+            search = len(stitched) + len(segment) if reid_ttl is None else reid_ttl
+            before, before_offsets = _boundary_objects(reversed(stitched[-search:]))
+            after, after_offsets = _boundary_objects(segment[:search])
+            before_boxes, before_centres, before_labs, before_classes = detection_arrays(before)
+            after_boxes, after_centres, after_labs, after_classes = detection_arrays(after)
+
+            overlap = iou_matrix(before_boxes, after_boxes)
+            distance = centroid_distance_matrix(before_centres, after_centres)
+            delta_e = delta_e_cie2000_matrix(before_labs, after_labs)
+            same_class = class_match_matrix(before_classes, after_classes)
+            cost = association_cost(overlap, distance, delta_e)
+            near = (before_offsets[:, None] < window) & (after_offsets[None, :] < window)
+            recent = before_offsets[:, None] + after_offsets[None, :] < search
+
+            # As in the tracker, objects seen on both sides are matched first, and only the
+            # objects left over are re-identified
+            pairs = associate(cost, association_gate(same_class, distance, overlap, delta_e) & near, association)
+            reid_gate = same_class & (delta_e < 5) & recent
+            for row, col in pairs:
+                reid_gate[row, :] = False
+                reid_gate[:, col] = False
+            pairs += associate(cost, reid_gate, association)
+
+            for row, col in pairs:
+                ids[after[col].object_id] = before[row].object_id
+
+        for detections in segment:
+            for detection in detections:
+                if detection.object_id not in ids:
+                    ids[detection.object_id] = next_id
+                    next_id += 1
+                detection.object_id = ids[detection.object_id]
+            stitched.append(detections)
+    return stitched
+
+def media_capture_sharded(file_path, workers=None, segment_count=None, batch_size=1, association="hungarian",
+                          reid_ttl=300, reid_max_size=1000, start_method="spawn"):
+    """
+    Detect and track the objects of a video with a pool of worker processes.
+
+    Args:
+        file_path (str): The path to the video file to be processed.
+        workers (int): The number of worker processes, by default the number of CPU cores.
+        segment_count (int): The number of segments the video is split into, by default `workers`.
+        batch_size (int): The number of frames sent to the YOLO model per call.
+        association (str): The engine used to match tracked objects to detections,
+            "hungarian" or "greedy" (see `Association.ASSOCIATION_METHODS`).
+        reid_ttl (int): The number of frames a disappeared object can still be re-identified.
+        reid_max_size (int): The largest number of disappeared objects kept for re-identification.
+        start_method (str): The multiprocessing start method of the workers. "spawn" gives
+            every worker a fresh interpreter that loads its own model.
+
+    Returns:
+        list: The annotations of each frame, in the same format as `ObjectTracking.media_capture`.
+
+    Preconditions:
+        - The input video file must be in a format supported by OpenCV.
+        - When using the "spawn" start method, the calling script must guard its entry
+          point with `if __name__ == "__main__":`.
+    """
+    workers = workers or os.cpu_count() or 1
+    segments = split_segments(frame_count(file_path), segment_count or workers)
+    print(f"[Sharding] Analysing {len(segments)} segments with {workers} workers")
+
+    # The workers run functions of Shard_worker, which they can import by its top-level name
+    analyse = partial(Shard_worker.analyse_segment, file_path=file_path, batch_size=batch_size, association=association,
+                      reid_ttl=reid_ttl, reid_max_size=reid_max_size)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(start_method),
+                             initializer=Shard_worker.init_worker,
+                             initargs=(os.path.abspath(os.path.dirname(__file__)), ObjectTracking.model.get_colours())) as pool:
+        segment_detections = list(pool.map(analyse, segments))
+
+    return [ObjectTracking.frame_annotations(detections)
+            for detections in stitch_segments(segment_detections, association, reid_ttl=reid_ttl)]
+
+if __name__ == "__main__":
+    video_path = sys.argv[1]
+    annotations = media_capture_sharded(video_path, int(sys.argv[2]) if len(sys.argv) > 2 else None)
+    json_path = Path(os.path.abspath(os.path.dirname(__file__))) / "JSON_files" / (Path(video_path).stem + ".json")
+    with json_path.open(mode='w') as json_file:
+        json.dump(annotations, json_file, indent=4)
+    print(f"[Sharding] Annotations saved to {json_path}")
@@ -0,0 +1,88 @@
+"""
+Module Name: Spatial_index.py
+
+Description:
+    This module provides a uniform grid over the detections of a frame so that each
+    tracked object is only compared with the detections near it. Every detection is
+    registered in all grid cells its bounding box covers; a query looks at the cells
+    covered by the tracked box grown by a margin. Any detection whose centre lies within
+    the margin of the tracked centre, or whose box overlaps the tracked box, is therefore
+    returned, which is everything the tracker's distance / overlap gate can accept.
+
+Usage:
+    Build a GridIndex from the boxes of the current detections and call
+    candidate_pairs() with the boxes of the tracked objects and the distance threshold.
+
+Dependencies:
+    - NumPy
+
+Author: team 120
+Date: 17/10/2026
+"""
+
+import numpy as np
+
+class GridIndex:
+    """
+    A uniform grid of cells mapping each cell to the boxes that cover it.
+
+    Attributes:
+        cell_size (int): The width and height of a grid cell in pixels.
+        cells (dict): Maps a (column, row) cell to the list of box indices covering it.
+    """
+
+    def __init__(self, boxes, cell_size=64):
+        """
+        Build the grid from a set of boxes.
+
+        Args:
+            boxes (np.ndarray): An array of shape (N, 4) with boxes in the format (x1, y1, x2, y2).
+            cell_size (int): The width and height of a grid cell in pixels.
+        """
+        self.cell_size = cell_size
+        self.cells = {}
+        for index, box in enumerate(np.asarray(boxes).reshape(-1, 4).tolist()):
+            for cell in self._covered_cells(box):
+                self.cells.setdefault(cell, []).append(index)
+
+    def _covered_cells(self, box):
+        x1, y1, x2, y2 = (int(coord // self.cell_size) for coord in box)
+        return ((col, row) for col in range(x1, x2 + 1) for row in range(y1, y2 + 1))
+
+    def query(self, box, margin=0):
+        """
+        Find the boxes sharing a grid cell with a box grown by a margin.
+
+        Args:
+            box (tuple): The query box in the format (x1, y1, x2, y2).
+            margin (float): The number of pixels to grow the query box by on every side.
+
+        Returns:
+            list: The sorted indices of the candidate boxes.
+        """
+        x1, y1, x2, y2 = box
+        candidates = set()
+        for cell in self._covered_cells((x1 - margin, y1 - margin, x2 + margin, y2 + margin)):
+            candidates.update(self.cells.get(cell, ()))
+        return sorted(candidates)
+
+    def candidate_pairs(self, query_boxes, margin=0):
+        """
+        Find the candidate (query box, indexed box) pairs for a set of query boxes.
+
+        Args:
+            query_boxes (np.ndarray): An array of shape (M, 4) with boxes in the format (x1, y1, x2, y2).
+            margin (float): The number of pixels to grow each query box by on every side.
+
+        Returns:
+            tuple: A tuple containing:
+                - rows (np.ndarray): The index of the query box of each pair.
+                - cols (np.ndarray): The index of the indexed box of each pair.
+        """
+        rows = []
+        cols = []
+        for row, box in enumerate(np.asarray(query_boxes).reshape(-1, 4).tolist()):
+            candidates = self.query(box, margin)
+            rows.extend([row] * len(candidates))
+            cols.extend(candidates)
+        return np.array(rows, dtype=int), np.array(cols, dtype=int)
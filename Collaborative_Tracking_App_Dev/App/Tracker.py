@@ -0,0 +1,364 @@
+"""
+Module Name: Tracker.py
+
+Description:
+    This module holds the tracking logic on its own, without any video decoding, model
+    or drawing: it turns per-frame detections into tracked objects with stable IDs.
+    Detections are matched to the tracked objects of the previous frame, then to objects
+    that disappeared earlier, and the remaining detections are given new IDs.
+
+    All thresholds of the tracker are gathered in TrackingParams, so that a set of
+    cached detections can be re-tracked with different settings, or the tracker
+    benchmarked, without touching the video or the YOLO model.
+
+Usage:
+    Call track() with the detections of every frame, in the format returned by
+    YOLO_model.detect_frame() or loaded from a Detection_cache.DetectionCache, to obtain
+    the annotations of every frame:
+
+    annotations = track(detections_per_frame, TrackingParams(max_distance=30), class_labels)
+
+Dependencies:
+    - NumPy
+    - Colour_processing: custom
+    - Detection: custom
+    - Box_geometry: custom
+    - Association: custom
+    - Spatial_index: custom
+    - Reidentification: custom
+    - Motion_model: custom
+    - Interpolation: custom
+
+Author: team 120
+Date: 17/10/2026
+"""
+
+import sys
+import os
+#Used for testing:
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from Colour_processing import LabConverter, delta_e_cie2000_matrix, delta_e_cie2000_pairs
+from Detection import Detection, detection_arrays
+from Box_geometry import iou_pairs, centroid_distance_pairs, class_match_matrix, association_gate
+from Spatial_index import GridIndex
+from Reidentification import ReidentificationStore
+from Association import association_cost, associate
+from Motion_model import KalmanTracks, MOTION_MODELS
+from Interpolation import fill_skipped_frames
+import numpy as np
+
+# Cached sRGB to Lab conversion shared by all frames
+lab_converter = LabConverter()
+
+class TrackingParams:
+    """
+    The settings of the tracker.
+
+    Attributes:
+        association (str): The engine used to match tracked objects to detections, 
+            "hungarian" or "greedy" (see `Association.ASSOCIATION_METHODS`).
+        max_distance (float): The centroid distance, in pixels, below which a tracked 
+            object and a detection are close enough to match.
+        min_overlap (float): The overlap percentage above which a tracked object and a 
+            detection are close enough to match.
+        max_delta_e (float): The largest colour difference between a tracked object and 
+            the detection it continues in.
+        reappear_delta_e (float): The colour difference below which a disappeared object 
+            is recognised in a new detection of the same class.
+        reid_ttl (int): The number of frames a disappeared object can still be 
+            re-identified, or None to keep it forever.
+        reid_max_size (int): The largest number of disappeared objects kept for 
+            re-identification, or None for no limit.
+        motion (str): "kalman" to compare detections with the box each tracked object is 
+            predicted to have from its velocity (see `Motion_model.KalmanTracks`), or 
+            "static" to compare them with the box it was last seen in.
+    """
+
+    def __init__(self, association="hungarian", max_distance=20, min_overlap=60, max_delta_e=10,
+                 reappear_delta_e=5, reid_ttl=300, reid_max_size=1000, motion="kalman"):
+        self.association = association
+        self.max_distance = max_distance
+        self.min_overlap = min_overlap
+        self.max_delta_e = max_delta_e
+        self.reappear_delta_e = reappear_delta_e
+        self.reid_ttl = reid_ttl
+        self.reid_max_size = reid_max_size
+        self.motion = motion
+
+def parse_results(class_id, score, box, average_colour, class_labels, class_colours, lab=None, detection_id=0):
+    """
+    Parse the results from YOLO model.
+
+    This function extracts and processes bounding box and class information from 
+    the detection results. It computes the center coordinates of the bounding box, 
+    retrieves the class name and its associated color, and converts the average color 
+    from sRGB to Lab color space unless the Lab color has already been computed.
+
+    Args:
+        class_id (int): The index of the detected class.
+        score (list or array): The confidence score for the detection.
+        box (tuple): A tuple containing the bounding box coordinates (x1, y1, x2, y2).
+        average_colour (tuple): A tuple representing the average color (R, G, B).
+        class_labels (list): A list of class names corresponding to class IDs.
+        class_colours (list): A list of colors corresponding to class IDs.
+        lab (tuple): The (L, a, b) color of `average_colour`, if already converted in a batch.
+        detection_id (int): The index of the detection within its frame.
+
+    Returns:
+        Detection: The bounding box coordinates, center coordinates, class name, 
+              Lab color representation, RGB color values and confidence score of the 
+              detection. Its object ID is None until it is tracked.
+
+    Preconditions:
+        - `class_id` must be a valid index in `class_labels` and `class_colours`.
+        - `box` must contain four numeric values representing the bounding box corners.
+        - `average_colour` must contain three numeric values representing RGB color.
+    """
+    confidence=round(score[0],2)
+    class_name=class_labels[class_id]
+    (x1, y1, x2, y2) = box
+    cx = int((x1 + x2) / 2)
+    cy = int((y1 + y2) / 2)
+
+    class_colour=class_colours[class_id]
+    B, G, R = class_colour[0], class_colour[1], class_colour[2]
+
+    if lab is None:
+        lab = lab_converter.convert([average_colour])[0]
+
+    return Detection(detection_id, x1, y1, x2, y2, cx, cy, class_name, lab, B, G, R, confidence)
+
+def track(detections_per_frame, params=None, class_labels=None, class_colours=None):
+    """
+    Track the detections of a whole video and build its annotations, without any video I/O.
+
+    Args:
+        detections_per_frame (iterable): The `detect_frame` results of each frame, in video 
+            order, or None for frames skipped by a detection stride, whose boxes are then 
+            interpolated (see `Interpolation.fill_skipped_frames`).
+        params (TrackingParams): The settings of the tracker, or None for the defaults.
+        class_labels (list): The class names by class ID, or None to name classes by their ID.
+        class_colours (list): The (B, G, R) display colour by class ID, or None for black.
+
+    Returns:
+        list: The annotations of each frame, in the same format as `ObjectTracking.media_capture`.
+
+    Preconditions:
+        - The first frame must not be None.
+    """
+    detections_per_frame = list(detections_per_frame)
+    class_count = 1 + max((max(results[0], default=-1) for results in detections_per_frame if results is not None),
+                          default=-1)
+    if class_labels is None:
+        class_labels = [str(class_id) for class_id in range(class_count)]
+    if class_colours is None:
+        class_colours = np.zeros((max(class_count, len(class_labels)), 3))
+
+    tracked_frames = track_detections(((None, results) for results in detections_per_frame),
+                                      class_labels, class_colours, params)
+    return [frame_annotations(detections) for _, detections in fill_skipped_frames(tracked_frames)]
+
+def track_detections(detected_frames, class_labels, class_colours, params=None):
+    """
+    Track detected objects across frames and assign each of them an object ID.
+
+    Each frame's detections are matched to the objects tracked in the previous frame, 
+    then to objects that disappeared earlier, and the remaining detections are given 
+    new IDs. Frames must be given in video order. Frames without detections (None) 
+    are passed through untouched, but still count towards `reid_ttl`. Objects are 
+    predicted to move once per frame with detections, so velocities are per keyframe.
+
+    Args:
+        detected_frames (iterable): (frame, detections) pairs, where detections are the 
+            `detect_frame` results of the frame, or None if it was not sent to the model. 
+            Frames are only passed through, so they may be None.
+        class_labels (list): The class names by class ID.
+        class_colours (list): The display colours by class ID.
+        params (TrackingParams): The settings of the tracker, or None for the defaults.
+
+    Yields:
+        tuple: A tuple containing:
+            - frame (np.ndarray): The frame, unchanged.
+            - detections (list): The Detection objects of the frame with their object IDs set, 
+              or None if the frame was not sent to the model.
+
+    Raises:
+        ValueError: If the motion model is unknown, or `max_distance` or `max_delta_e` is not positive.
+    """
+    if params is None:
+        params = TrackingParams()
+    if params.motion not in MOTION_MODELS:
+        raise ValueError(f"Unknown motion model '{params.motion}', expected one of {MOTION_MODELS}")
+    if params.max_distance <= 0 or params.max_delta_e <= 0:
+        # Both scale the matching cost, checked before the first frame rather than at the second
+        raise ValueError(f"max_distance and max_delta_e must be positive, got {params.max_distance} and {params.max_delta_e}")
+
+    count = 0 # Keeps track of number of frames
+    keyframes = 0 # Number of frames sent to the model, one motion prediction step each
+
+    tracking_objects = {}
+    track_id = 0
+    # Predicted boxes of the tracked objects
+    motion_model = KalmanTracks() if params.motion == "kalman" else None
+
+    # Disappeared objects kept for re-identification, bounded by age and size
+    disappeared_objects = ReidentificationStore(ttl=params.reid_ttl, max_size=params.reid_max_size,
+                                                max_delta_e=params.reappear_delta_e)
+
+    # Results from the YOLO model for each frame
+    for frame, results in detected_frames:
+        count += 1 
+        if results is None:
+            yield frame, None
+            continue
+        keyframes += 1
+        class_ids, scores, boxes, average_colours = results
+
+        # Lab colours of all the detections in one conversion
+        labs = lab_converter.convert(average_colours)
+
+        # Detections of the current frame, their detection_id is their index in this list
+        detections = [
+            parse_results(class_id, score, box, average_colour, class_labels, class_colours, lab, detection_id)
+            for detection_id, (class_id, score, box, average_colour, lab)
+            in enumerate(zip(class_ids, scores, boxes, average_colours, labs))
+        ]
+        detection_boxes, detection_centres, detection_labs, detection_classes = detection_arrays(detections)
+
+        # Only at the beginning we compare previous and current frame
+        if count == 1:
+            new_detections = range(len(detections))
+
+        else:
+            tracked_ids = list(tracking_objects.keys())
+            tracked_boxes, tracked_centres, tracked_labs, tracked_classes = detection_arrays(tracking_objects.values())
+            if motion_model is not None:
+                motion_model.predict()
+                tracked_boxes = motion_model.boxes(tracked_ids)
+                tracked_centres = (tracked_boxes[:, :2] + tracked_boxes[:, 2:]) / 2
+
+            # Only detections near a tracked object can pass the distance / overlap gate
+            rows, cols = GridIndex(detection_boxes).candidate_pairs(tracked_boxes, margin=params.max_distance)
+
+            # Overlap, distance and colour difference of the candidate (tracked object, detection) pairs
+            overlap = iou_pairs(tracked_boxes[rows], detection_boxes[cols])
+            distance = centroid_distance_pairs(tracked_centres[rows], detection_centres[cols])
+            delta_e = delta_e_cie2000_pairs(tracked_labs[rows], detection_labs[cols])
+            same_class = tracked_classes[rows] == detection_classes[cols]
+
+            # Pairs that were never candidates stay outside the gate
+            gate = np.zeros((len(tracked_ids), len(detections)), dtype=bool)
+            cost = np.zeros(gate.shape)
+            gate[rows, cols] = association_gate(same_class, distance, overlap, delta_e, params.max_distance,
+                                                  params.min_overlap, params.max_delta_e)
+            cost[rows, cols] = association_cost(overlap, distance, delta_e, params.max_distance, params.max_delta_e)
+
+            matched_tracks = np.zeros(len(tracked_ids), dtype=bool)
+            matched_detections = np.zeros(len(detections), dtype=bool)
+
+            # One-to-one matching of tracked objects to detections
+            for row, col in associate(cost, gate, params.association):
+                detections[col].object_id = tracked_ids[row]
+                tracking_objects[tracked_ids[row]] = detections[col]
+                matched_tracks[row] = True
+                matched_detections[col] = True
+
+            lost_ids = [tracked_ids[row] for row in np.flatnonzero(~matched_tracks)]
+            for lost_id in lost_ids:
+                lost = tracking_objects.pop(lost_id)
+                disappeared_objects.add(lost_id, (lost, keyframes), lost.class_name, lost.lab[0], count)
+
+            if motion_model is not None:
+                matched_rows = np.flatnonzero(matched_tracks)
+                motion_model.update([tracked_ids[row] for row in matched_rows], 
+                                    [tracking_objects[tracked_ids[row]].box for row in matched_rows])
+                motion_model.remove(lost_ids)
+
+            unmatched = np.flatnonzero(~matched_detections)
+
+            # Check for objects that may have reappeared, among those of the same class and lightness
+            disappeared_objects.expire(count)
+            candidates = disappeared_objects.candidates(
+                [(detections[index].class_name, detections[index].lab[0]) for index in unmatched])
+            disappeared_ids = [object_id for object_id, _ in candidates]
+            disappeared = [lost for _, (lost, _) in candidates]
+            disappeared_keyframes = [lost_keyframe for _, (_, lost_keyframe) in candidates]
+            _, _, disappeared_labs, disappeared_classes = detection_arrays(disappeared)
+
+            # Colour differences of every (disappeared object, unmatched detection) pair in one call
+            delta_e_disappeared = delta_e_cie2000_matrix(disappeared_labs, detection_labs[unmatched])
+            # The object reappears if it has the same class and nearly the same colour
+            reappear_gate = class_match_matrix(disappeared_classes, detection_classes[unmatched]) & (delta_e_disappeared < params.reappear_delta_e)
+            reappeared = np.zeros(len(unmatched), dtype=bool)
+
+            reappeared_ids = []
+            reappeared_boxes = []
+            last_boxes = [] # Where each reappeared object was last seen
+            steps_gone = [] # For how many prediction steps, that is keyframes, it was gone
+            for row, col in associate(delta_e_disappeared, reappear_gate, params.association):
+                detections[unmatched[col]].object_id = disappeared_ids[row]  # Reassign the same object_id
+                tracking_objects[disappeared_ids[row]] = detections[unmatched[col]]
+                reappeared[col] = True
+                reappeared_ids.append(disappeared_ids[row])
+                reappeared_boxes.append(detections[unmatched[col]].box)
+                last_boxes.append(disappeared[row].box)
+                steps_gone.append(keyframes - disappeared_keyframes[row] + 1)
+                disappeared_objects.remove(disappeared_ids[row])  # Remove from disappeared list
+
+            new_detections = unmatched[~reappeared]
+            if motion_model is not None:
+                # Reappeared objects restart with the velocity that brought them back
+                motion_model.add(reappeared_ids, reappeared_boxes, last_boxes, steps_gone)
+
+        # Add new IDs found
+        for index in new_detections:
+            detections[index].object_id = track_id
+            tracking_objects[track_id] = detections[index]
+            track_id += 1
+        if motion_model is not None:
+            motion_model.add([detections[index].object_id for index in new_detections], detection_boxes[new_detections])
+
+        yield frame, detections
+
+def frame_annotations(detections):
+    """
+    Build the JSON annotations of a frame from its tracked detections.
+
+    Args:
+        detections (list): The Detection objects of the frame with their object IDs set.
+
+    Returns:
+        list: One annotation dictionary per detection, with the keys "class", "confidence", 
+              "objectID", "colours" and "bounding_box", and "interpolated" set to True for 
+              boxes estimated between keyframes.
+    """
+    json_frame_annotations=[] # Array that keeps track of the json annotations of the current frame
+    for detection in detections:
+        x1, y1, x2, y2, B, G, R = map(int, (detection.x1, detection.y1, detection.x2, detection.y2, 
+                                            detection.B, detection.G, detection.R))
+        class_name = str(detection.class_name)
+        confidence = str(detection.confidence)
+        IDstr = str(detection.object_id)
+
+        annotation = {
+            "class": class_name,
+            "confidence": confidence,
+            "objectID": IDstr,
+            "colours": {
+                "B":B,
+                "G":G,
+                "R":R,
+            },
+
+            "bounding_box": {
+                "x1": x1,
+                "y1": y1,
+                "x2": x2,
+                "y2": y2,
+            },
+        }
+        if detection.interpolated:
+            annotation["interpolated"] = True
+        json_frame_annotations.append(annotation)
+    return json_frame_annotations
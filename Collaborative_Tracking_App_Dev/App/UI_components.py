@@ -140,6 +140,8 @@ class UI_Media_Components(tk.Tk):
         self.id_entry = tk.Entry(self.edit, font=("Helvetica", 14), validate="key", validatecommand=vcmd)
         self.id_button = tk.Button(self.edit, text="Submit ID", font=("Helvetica", 14), command=self.editObjID)
         
+        self.undo_button = tk.Button(self.edit, text="Undo", font=("Helvetica", 14), command=self.editUndo)
+        
         # Define button for saving changes
         self.save_changes_button = tk.Button(self.edit, text="Save Changes", font=("Helvetica", 16, "bold"), bg="#ECECEC", command=self.editSaveEdits)
         
@@ -168,6 +170,14 @@ class UI_Media_Components(tk.Tk):
         )
         self.YOLO_button.grid_forget()
 
+        # Whether the analysis is saved in the compact .npz format instead of JSON
+        self.compact_format = tk.BooleanVar(value=False)
+        self.compact_button = tk.Checkbutton(
+            self.view, text="Save as .npz", variable=self.compact_format,
+            font=("Helvetica", 14), bg="#ECECEC"
+        )
+        self.compact_button.grid_forget()
+
         #Sizing and spcing configuration
         self.edit.grid_columnconfigure(0, weight=1)
         self.edit.grid_columnconfigure(1, weight=1)
@@ -374,6 +384,7 @@ class UI_Media_Components(tk.Tk):
         self.stretch_vertically.grid(row=4, column=2, padx=5, pady=5)
         self.squeeze_horizontalally.grid(row=3, column=3, padx=5, pady=5)
         self.squeeze_vertically.grid(row=4, column=3, padx=5, pady=5)
+        self.undo_button.grid(row=2, column=2, padx=5, pady=5)
 
         # Save changes button at the bottom
         self.save_changes_button.grid(row=0, column=1, columnspan=3, padx=5, pady=10)
@@ -404,6 +415,7 @@ class UI_Media_Components(tk.Tk):
         self.class_button.grid_forget()
         self.id_entry.grid_forget()
         self.id_button.grid_forget()
+        self.undo_button.grid_forget()
         self.save_changes_button.grid_forget()
         
         self.edit_frame.update_idletasks()   
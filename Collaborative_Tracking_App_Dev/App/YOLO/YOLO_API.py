@@ -11,10 +11,12 @@ Usage:
     To run the application, create an instance of the `YOLO_model` class. 
     Use the detect_frame() method to analyze media and obtain 
     detected items, their confidence, bounding boxes, and average colors.
+    Use the detect_batch() method to analyze several frames in one model call.
 
 Dependencies:
     - ultralytics: For the YOLO model.
     - numpy: For handling numerical operations and arrays.
+    - torch: For gathering detection tensors before copying them to the host.
     - cv2 (OpenCV): For image processing tasks, including color calculations.
 
 Author: team 120
@@ -24,6 +26,7 @@ Date: 19/09/2024
 
 from ultralytics import YOLO
 import numpy as np
+import torch
 import cv2
 
 class YOLO_model:
@@ -35,17 +38,22 @@ class YOLO_model:
 
     Attributes:
         yolo_instance (YOLO): The YOLO model instance.
+        model_path (str): The path of the model weights.
+        conf (float): The minimum confidence of a detection.
         classes (list): List of class names the model can detect.
         colours (np.ndarray): Array of RGB colors for the classes.
     """
-    def __init__(self, model_path="yolov10m.pt"):
+    def __init__(self, model_path="yolov10m.pt", conf=0.6):
         """
         Initializes the YOLO model with the specified model path.
 
         Args:
             model_path (str): The path to the YOLO model file.
+            conf (float): The minimum confidence of a detection.
         """
         self.yolo_instance = YOLO(model_path, verbose=False) # YOLO model
+        self.model_path = model_path
+        self.conf = conf
         
         self.classes=list(self.yolo_instance.names.values()) # YOLO class names
         self.colours = np.random.uniform(0, 255, size=(len(self.classes), 3)) # Colours for the classes
@@ -64,32 +72,48 @@ class YOLO_model:
                 - bboxes (list): List of bounding boxes (x1, y1, x2, y2) for each detected object.
                 - average_colours (list): List of average colors for each detected object.
         """
-        # The unparsed results of the frame
-        results = self.yolo_instance(frame, verbose=False, conf=0.6)
-        
-        # Parse the detection results
-        bboxes = []
-        confidences = []
-        class_ids = []
-        average_colours = []
-
-        for result in results:
-            # Extract bounding boxes, confidences, and class IDs
-            for det in result.boxes:
-                bbox = det.xyxy[0].cpu().numpy().astype(int)
-                conf = det.conf.cpu().numpy()
-                class_id = int(det.cls.cpu().numpy())
-
-                roi = frame[bbox[1]:bbox[3], bbox[0]:bbox[2]]
-                average_colour = cv2.mean(roi)
-
-                # Append to the lists
-                bboxes.append(bbox)
-                confidences.append(conf)
-                class_ids.append(class_id)
-                average_colours.append(average_colour)
-
-        return class_ids, confidences, bboxes, average_colours
+        return self.detect_batch([frame])[0]
+
+    def detect_batch(self, frames):
+        """
+        Analyzes several frames with a single call to the YOLO model.
+
+        The boxes, confidences and classes of every frame are gathered into one tensor 
+        so that they are copied to the host once per batch instead of once per detection.
+
+        Args:
+            frames (list): The input images/frames to analyze.
+
+        Returns:
+            list: One tuple per frame, in the same format as `detect_frame`.
+
+        Preconditions:
+            - `frames` must not be empty.
+        """
+        # The unparsed results of the frames
+        results = self.yolo_instance(frames, verbose=False, conf=self.conf)
+
+        # Columns: x1, y1, x2, y2, confidence, class ID
+        detections = torch.cat([
+            torch.cat((result.boxes.xyxy, result.boxes.conf[:, None], result.boxes.cls[:, None]), dim=1)
+            for result in results
+        ]).cpu().numpy()
+        counts = [len(result.boxes) for result in results]
+
+        batch = []
+        start = 0
+        for frame, count in zip(frames, counts):
+            frame_detections = detections[start:start + count]
+            start += count
+
+            bboxes = list(frame_detections[:, :4].astype(int))
+            confidences = list(frame_detections[:, 4:5])
+            class_ids = frame_detections[:, 5].astype(int).tolist()
+            average_colours = [cv2.mean(frame[bbox[1]:bbox[3], bbox[0]:bbox[2]]) for bbox in bboxes]
+
+            batch.append((class_ids, confidences, bboxes, average_colours))
+
+        return batch
 
     # Returns the classes the YOLO model can identify
     def get_classes(self):
@@ -2,13 +2,17 @@ import sys
 import os
 import unittest
 import json
+import tempfile
 from io import StringIO
 from unittest.mock import patch
 
-# Add the TeamTJM directory to the system path
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Add the App directory to the system path, importing modules by the names the App modules use
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'App')))
 
-from App.ObjectManager import ObjManager
+from ObjectManager import ObjManager
+from Annotation_store import load_annotations
+from Annotation_stream import LazyAnnotations, index_path
+from Annotation_journal import compact_journal, journal_path, load_journaled, read_journal
 
 class TestObjManager(unittest.TestCase):
     
@@ -506,25 +510,35 @@ class TestObjManager(unittest.TestCase):
     
     def test_editBoundingBoxShape(self):
         self.obj_manager.editBoundingBoxShape(0, 0, "x1", 5)
-        self.assertEqual(self.initial_data[0][0]["bounding_box"]["x1"], 136)
+        self.assertEqual(self.obj_manager.data[0][0]["bounding_box"]["x1"], 136)
     
     def test_editMoveBoundingBoxVerticle(self):
         self.obj_manager.editMoveBoundingBoxVerticle(0, 0, 10)
-        self.assertEqual(self.initial_data[0][0]["bounding_box"]["y1"], 366)
-        self.assertEqual(self.initial_data[0][0]["bounding_box"]["y2"], 864)
+        self.assertEqual(self.obj_manager.data[0][0]["bounding_box"]["y1"], 366)
+        self.assertEqual(self.obj_manager.data[0][0]["bounding_box"]["y2"], 864)
     
     def test_editMoveBoundingBoxHorizontal(self):
         self.obj_manager.editMoveBoundingBoxHorizontal(0, 0, -5)
-        self.assertEqual(self.initial_data[0][0]["bounding_box"]["x1"], 126)
-        self.assertEqual(self.initial_data[0][0]["bounding_box"]["x2"], 293)
+        self.assertEqual(self.obj_manager.data[0][0]["bounding_box"]["x1"], 126)
+        self.assertEqual(self.obj_manager.data[0][0]["bounding_box"]["x2"], 293)
+
+    def test_fractional_edits(self):
+        # Boxes hold whole pixels, so fractional amounts are rounded and undo exactly
+        self.obj_manager.editBoundingBoxShape(0, 0, "x1", 2.6)
+        self.obj_manager.editMoveBoundingBoxVerticle(0, 0, -1.4)
+        self.obj_manager.editRangeMove(0, 0.5, 3.7)
+        self.assertEqual(self.obj_manager.data[0][0]["bounding_box"], {"x1": 134, "y1": 359, "x2": 298, "y2": 857})
+        for _ in range(3):
+            self.obj_manager.undo()
+        self.assertEqual(self.obj_manager.store.to_frames(), self.initial_data)
     
     def test_editLabel(self):
         self.obj_manager.editLabel(0, 1, "bus")
-        self.assertEqual(self.initial_data[0][1]["class"], "bus")
+        self.assertEqual(self.obj_manager.data[0][1]["class"], "bus")
     
     def test_editID(self):
         self.obj_manager.editID(1, 0, 3)
-        self.assertEqual(self.initial_data[1][0]["objectID"], 3)
+        self.assertEqual(self.obj_manager.data[1][0]["objectID"], 3)
     
     def test_filterClass(self):
         filtered = self.obj_manager.filterClass("handbag")
@@ -538,7 +552,7 @@ class TestObjManager(unittest.TestCase):
             {"class": "handbag","confidence": "0.26","objectID": 14,"colours": {"B": 123,"G": 155,"R": 218},
             "bounding_box": {"x1": 456,"y1": 622,"x2": 490,"y2": 728}}]
         ]
-        self.assertEqual(filtered, expected)
+        self.assertEqual(list(filtered), expected)
     
     def test_filterObjectID(self):
         filtered = self.obj_manager.filterObjectID(14)
@@ -548,10 +562,10 @@ class TestObjManager(unittest.TestCase):
             [{"class": "handbag","confidence": "0.26","objectID": 14,"colours": {"B": 123,"G": 155,"R": 218},
             "bounding_box": {"x1": 456,"y1": 622,"x2": 490,"y2": 728}}]
         ]
-        self.assertEqual(filtered, expected)
+        self.assertEqual(list(filtered), expected)
     
     def test_getBox(self):
-        box = self.initial_data[0][0]
+        box = self.obj_manager.data[0][0]
         result = ObjManager.getBox(box)
         self.assertEqual(result, [131, 298, 356, 854])
     
@@ -561,5 +575,102 @@ class TestObjManager(unittest.TestCase):
         index_not_found = self.obj_manager.getObjIndexInFrame(0, 187)
         self.assertEqual(index_not_found, -1)
 
+    def test_store_round_trip(self):
+        # The columnar store exports the annotations it was built from, edits only change the store
+        self.assertEqual(self.obj_manager.store.to_frames(), self.initial_data)
+        self.obj_manager.editLabel(1, 4, "suitcase")
+        self.assertEqual(self.initial_data[1][4]["class"], "handbag")
+        self.assertEqual(self.obj_manager.store.to_frames()[1][4]["class"], "suitcase")
+        self.assertEqual(len(list(self.obj_manager.filterClass("suitcase"))[1]), 1)
+
+    def test_index_after_edit(self):
+        # Relabelled and re-IDed boxes move between the class and object indexes
+        self.obj_manager.editID(1, 0, 14)
+        self.obj_manager.editLabel(1, 0, "handbag")
+        filtered = list(self.obj_manager.filterObjectID(14))
+        self.assertEqual([box["objectID"] for box in filtered[1]], [14, 14])
+        self.assertEqual(len(list(self.obj_manager.filterClass("handbag"))[1]), 3)
+        self.assertEqual(len(list(self.obj_manager.filterClass("person"))[1]), 9)
+        self.assertEqual(self.obj_manager.getObjIndexInFrame(1, 14), 0)
+        self.assertEqual(self.obj_manager.getObjIndexInFrame(1, 0), -1)
+
+    def test_writeChanges_npz(self):
+        # The compact format loads back the same annotations, with the same value types as the JSON
+        self.obj_manager.editMoveBoundingBoxHorizontal(1, 2, 7)
+        with tempfile.TemporaryDirectory() as directory:
+            npz_path = os.path.join(directory, "annotations.npz")
+            self.obj_manager.writeChanges(npz_path)
+            loaded = load_annotations(npz_path).to_frames()
+        self.assertEqual(loaded, self.obj_manager.store.to_frames())
+        self.assertEqual(loaded[1][2]["bounding_box"]["x1"], 726)
+        self.assertEqual(loaded[0][0]["confidence"], "0.92")
+
+    def test_lazy_annotations(self):
+        # Frames are read through the index sidecar, which is rebuilt when the file changes
+        self.initial_data[0][0]["class"] = 'a "quoted]" name\\'
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = os.path.join(directory, "annotations.json")
+            with open(json_path, "w") as json_file:
+                json.dump(self.initial_data, json_file, indent=4)
+            lazy = LazyAnnotations(json_path, chunk_frames=1)
+            self.assertTrue(os.path.exists(index_path(json_path)))
+            self.assertEqual(len(lazy), 2)
+            self.assertEqual(lazy[1], self.initial_data[1])
+            self.assertEqual(list(lazy), self.initial_data)
+
+            self.obj_manager.editLabel(1, 4, "suitcase")
+            self.obj_manager.writeChanges(json_path)
+            self.assertEqual(LazyAnnotations(json_path)[1][4]["class"], "suitcase")
+
+    def test_journaled_saves(self):
+        # Saves after the first only append the edits to the journal, which undo reverts
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = os.path.join(directory, "annotations.json")
+            self.obj_manager.writeChanges(json_path)
+            self.assertFalse(os.path.exists(journal_path(json_path)))
+            with open(json_path) as json_file:
+                base = json_file.read()
+
+            self.obj_manager.editMoveBoundingBoxVerticle(1, 2, 10)
+            self.obj_manager.editLabel(0, 0, "car")
+            self.obj_manager.writeChanges(json_path)
+            with open(json_path) as json_file:
+                self.assertEqual(json_file.read(), base)
+            self.assertEqual(len(read_journal(json_path)), 3)
+            self.assertEqual(load_journaled(json_path).to_frames(), self.obj_manager.store.to_frames())
+
+            self.assertEqual(self.obj_manager.undo(), [0])
+            self.assertEqual(self.obj_manager.undo(), [1])
+            self.assertEqual(self.obj_manager.undo(), [])
+            self.assertEqual(self.obj_manager.store.to_frames(), self.initial_data)
+            self.obj_manager.writeChanges(json_path)
+            self.assertEqual(load_journaled(json_path).to_frames(), self.initial_data)
+
+            self.assertTrue(compact_journal(json_path))
+            self.assertFalse(os.path.exists(journal_path(json_path)))
+            self.assertEqual(load_annotations(json_path).to_frames(), self.initial_data)
+
+    def test_range_edits(self):
+        # Range edits change every box of an object in the frames given, and undo one at a time
+        self.obj_manager.editRangeLabel(12, "suitcase")
+        self.assertEqual([len(frame) for frame in self.obj_manager.filterClass("suitcase")], [1, 1])
+        self.obj_manager.editRangeMove(0, 10, -5, 1, 1)
+        self.assertEqual(self.obj_manager.data[0][0]["bounding_box"]["x1"], 131)
+        self.assertEqual(self.obj_manager.data[1][0]["bounding_box"], {"x1": 141, "y1": 351, "x2": 308, "y2": 849})
+        self.obj_manager.editRangeScale(2, 2.0, 0, 0)
+        self.assertEqual(self.obj_manager.data[0][2]["bounding_box"], {"x1": 635, "y1": 215, "x2": 971, "y2": 971})
+        self.assertEqual(self.obj_manager.data[1][2]["bounding_box"]["x1"], 719)
+        self.obj_manager.mergeObjectIDs(14, 13)
+        self.assertEqual(self.obj_manager.getObjIndexInFrame(0, 13), -1)
+        self.assertEqual([len(frame) for frame in self.obj_manager.filterObjectID(14)], [2, 2])
+        self.assertEqual(self.obj_manager.splitObjectID(0, 1), 16)
+        self.assertEqual(self.obj_manager.data[0][0]["objectID"], 0)
+        self.assertEqual(self.obj_manager.data[1][0]["objectID"], 16)
+
+        for _ in range(5):
+            self.obj_manager.undo()
+        self.assertEqual(self.obj_manager.store.to_frames(), self.initial_data)
+        self.assertEqual([len(frame) for frame in self.obj_manager.filterObjectID(13)], [1, 1])
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
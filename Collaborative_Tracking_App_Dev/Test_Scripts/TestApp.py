@@ -1,10 +1,15 @@
 import os
 import sys
+import threading
 import unittest
 
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Add the App directory to the system path, importing modules by the names the App modules use
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'App')))
 
-from App.App import MediaPlayer
+import cv2
+import numpy as np
+from App import MediaPlayer
+from Frame_server import FrameServer
 
 class TestMediaPlayer(unittest.TestCase):
     def setUp(self):
@@ -30,5 +35,74 @@ class TestMediaPlayer(unittest.TestCase):
         self.player.manage_media()
         self.assertTrue(os.path.exists(self.jpg_file))
 
+    def test_run_YOLO_compact(self):
+        # With the compact format ticked, the analysis is saved as .npz and replayed from it
+        npz_path = os.path.join("App", "JSON_files", "test_video.npz")
+        self.player.media_path = self.mp4_file
+        self.player.compact_format.set(True)
+        try:
+            self.player.run_YOLO()
+            self.assertTrue(os.path.exists(npz_path))
+            self.assertFalse(os.path.exists(npz_path + ".part"))
+            self.assertEqual(len(self.player.overlay_annotations), len(self.player.current_frames))
+        finally:
+            self.player.release_frames()
+            if os.path.exists(npz_path):
+                os.remove(npz_path)
+
+class TestFrameServer(unittest.TestCase):
+    def setUp(self):
+        self.mp4_file = "Test_Scripts/Test_resources/test_video.mp4"
+        capture = cv2.VideoCapture(self.mp4_file)
+        self.frames = []
+        while True:
+            ret, frame = capture.read()
+            if not ret:
+                break
+            self.frames.append(frame)
+        capture.release()
+
+    def test_random_access(self):
+        # Steps, jumps forward and backward, and a read just ahead of the decoder
+        server = FrameServer(self.mp4_file, memory_budget=10 * self.frames[0].nbytes)
+        try:
+            self.assertEqual(len(server), len(self.frames))
+            for index in [0, 1, 2, 60, 59, 61, 70, 5, -1]:
+                self.assertTrue(np.array_equal(server[index], self.frames[index]), f"Frame {index} differs")
+            self.assertLessEqual(server.cached_bytes, server.memory_budget)
+            with self.assertRaises(IndexError):
+                server[len(self.frames)]
+        finally:
+            server.close()
+
+    def test_concurrent_requests(self):
+        # Threads stepping through the video at once get the right frames and leave the bookkeeping consistent
+        server = FrameServer(self.mp4_file, memory_budget=10 * self.frames[0].nbytes)
+        mismatches = []
+        def request(indexes):
+            for index in indexes:
+                if not np.array_equal(server[index], self.frames[index]):
+                    mismatches.append(index)
+        try:
+            threads = [threading.Thread(target=request, args=(range(start, len(self.frames), 4),)) for start in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(mismatches, [])
+            self.assertEqual(server.requests, 0)
+            with server.lock:
+                self.assertEqual(server.cached_bytes, sum(frame.nbytes for frame in server.cache.values()))
+        finally:
+            server.close()
+
+    def test_frame_count(self):
+        server = FrameServer(self.mp4_file, frame_count=5)
+        try:
+            self.assertEqual(len(server), 5)
+            self.assertEqual(len(list(server)), 5)
+        finally:
+            server.close()
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,17 +1,34 @@
 import sys
 import os
 
-# Add the TeamTJM directory to the system path
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Add the App directory to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'App')))
 
-# Now you can import modules as if running from the TeamTJM directory
-from App import ObjectTracking
-from App.YOLO.YOLO_API import YOLO_model
+# Import the modules by the same top-level names the App modules use for each other,
+# so each is loaded once (with a single YOLO model and set of class colours)
+import ObjectTracking, Pipeline, Sharding
+from Detection import Detection
+from Interpolation import fill_skipped_frames
+from YOLO.YOLO_API import YOLO_model
+from Colour_processing import LabConverter, srgb_to_lab, delta_e_cie2000_matrix
+from Box_geometry import iou_matrix, centroid_distance_matrix, class_match_matrix, association_gate
+from Spatial_index import GridIndex
+from Reidentification import ReidentificationStore
+from Motion_model import KalmanTracks
+import Tracker
+from Detection_cache import DetectionCache
+from Annotation_stream import AnnotationWriter, open_annotations
+from Tracker import track, TrackingParams
+from Association import associate, association_cost
+import numpy as np
 import cv2
 from colormath.color_objects import sRGBColor, LabColor
 from colormath.color_conversions import convert_color
+import tempfile
+import json
 import time
 import unittest
+from unittest.mock import patch
 
 # Add the TeamTJM directory to the system path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -26,19 +43,284 @@ class TestObjectTracking(unittest.TestCase):
         self.assertAlmostEqual(lab.lab_a, 0.000, places=0)
         self.assertAlmostEqual(lab.lab_b, 0.000, places=0)
 
+    # Unit: Test vectorised colour conversion against colormath
+    def test_srgb_to_lab(self):
+        colours = [(127.5, 127.5, 127.5), (255, 0, 0), (3, 200, 90), (0, 0, 0)]
+        lab = srgb_to_lab(colours)
+        for (R, G, B), (L, a, b) in zip(colours, lab):
+            expected = convert_color(sRGBColor(R / 255.0, G / 255.0, B / 255.0), LabColor)
+            self.assertAlmostEqual(L, expected.lab_l, places=6)
+            self.assertAlmostEqual(a, expected.lab_a, places=6)
+            self.assertAlmostEqual(b, expected.lab_b, places=6)
+
+    # Unit: Test the cached converter quantises and reuses colours
+    def test_lab_converter_cache(self):
+        converter = LabConverter(step=0.25, max_size=2)
+        first, second = converter.convert([(10.0, 20.0, 30.0, 0.0), (10.01, 20.0, 30.0, 0.0)])
+        self.assertEqual(first, second)
+        self.assertEqual(len(converter.cache), 1)
+        converter.convert([(50, 50, 50), (90, 90, 90)])
+        self.assertEqual(len(converter.cache), 2)
+        L, a, b = converter.convert([(127.5, 127.5, 127.5)])[0]
+        self.assertAlmostEqual(L, convert_color(sRGBColor(0.5, 0.5, 0.5), LabColor).lab_l, places=6)
+
+        # A batch with more colours than the cache holds, one of them cached by an earlier call
+        colours = [(127.5, 127.5, 127.5), (10, 10, 10), (200, 100, 0), (0, 0, 255)]
+        labs = converter.convert(colours)
+        self.assertEqual(labs, [converter.convert([colour])[0] for colour in colours])
+        self.assertEqual(len(converter.cache), 2)
+
     # Unit:Test overlap calculation
     def test_calculate_overlap_area(self):
         box1 = (0, 0, 100, 100)
         box2 = (50, 50, 150, 150)
         self.assertAlmostEqual(ObjectTracking.calculate_overlap_area(box1, box2), 14.29, places=2)  # Expected overlap percentage
 
+    # Unit: Test pairwise overlap and distance matrices
+    def test_geometry_matrices(self):
+        boxes1 = [(0, 0, 100, 100), (200, 200, 220, 220)]
+        boxes2 = [(50, 50, 150, 150), (0, 0, 100, 100), (300, 300, 310, 310)]
+        overlap = iou_matrix(boxes1, boxes2)
+        self.assertEqual(overlap.shape, (2, 3))
+        for i, box1 in enumerate(boxes1):
+            for j, box2 in enumerate(boxes2):
+                self.assertAlmostEqual(overlap[i, j], ObjectTracking.calculate_overlap_area(box1, box2))
+        self.assertAlmostEqual(overlap[0, 1], 100.0)
+        distance = centroid_distance_matrix([(0, 0)], [(3, 4), (0, 30)])
+        np.testing.assert_allclose(distance, [[5.0, 30.0]])
+
+    # Unit: Test the class / distance / overlap / colour gate
+    def test_association_gate(self):
+        distance = np.array([[5.0, 50.0, 50.0, 5.0]])
+        overlap = np.array([[0.0, 70.0, 10.0, 0.0]])
+        delta_e = np.array([[3.0, 3.0, 3.0, 12.0]])
+        same_class = class_match_matrix(["person"], ["person", "person", "person", "person"])
+        gate = association_gate(same_class, distance, overlap, delta_e)
+        self.assertEqual(gate.tolist(), [[True, True, False, False]])
+        same_class = class_match_matrix(["person"], ["dog"])
+        gate = association_gate(same_class, distance[:, :1], overlap[:, :1], delta_e[:, :1])
+        self.assertEqual(gate.tolist(), [[False]])
+
+    # Unit: Test that the grid index returns every pair the gate could accept
+    def test_grid_index_candidates(self):
+        detections = np.array([(0, 0, 40, 40), (30, 0, 70, 40), (900, 500, 1000, 700), (100, 100, 500, 500)])
+        tracked = np.array([(5, 5, 45, 45), (350, 350, 600, 600)])
+        rows, cols = GridIndex(detections).candidate_pairs(tracked, margin=20)
+        pairs = set(zip(rows.tolist(), cols.tolist()))
+        self.assertIn((0, 0), pairs)
+        self.assertIn((0, 1), pairs)
+        self.assertIn((1, 3), pairs)
+        self.assertNotIn((0, 2), pairs)
+        self.assertNotIn((1, 0), pairs)
+
+    # Unit: Test the re-identification store index, expiry and eviction
+    def test_reidentification_store(self):
+        store = ReidentificationStore(ttl=10, max_size=2)
+        store.add(0, "person 0", "person", 50.0, frame_index=1)
+        store.add(1, "dog 1", "dog", 50.0, frame_index=2)
+        self.assertEqual(store.candidates([("person", 55.0)]), [(0, "person 0")])
+        self.assertEqual(store.candidates([("person", 90.0)]), [])
+        store.add(2, "person 2", "person", 52.0, frame_index=3)
+        self.assertNotIn(0, store)  # Evicted as the least recently disappeared
+        store.expire(13)
+        self.assertNotIn(1, store)  # Disappeared more than 10 frames ago
+        self.assertEqual(store.remove(2), "person 2")
+        self.assertEqual(len(store), 0)
+
+    # Unit: Test splitting a video into segments
+    def test_split_segments(self):
+        self.assertEqual(Sharding.split_segments(10, 3), [(0, 4), (4, 4), (8, None)])
+        self.assertEqual(Sharding.split_segments(2, 4), [(0, 1), (1, None)])
+        self.assertEqual(Sharding.split_segments(0, 4), [(0, None)])
+
+    # Unit: Test that objects keep their ID across a segment boundary
+    def test_stitch_segments(self):
+        def detection(object_id, x, lab=(50.0, 0.0, 0.0), class_name="person"):
+            return Detection(0, x, 0, x + 40, 80, x + 20, 40, class_name, lab, 0, 0, 0, 0.9, object_id)
+        first = [[detection(0, 0), detection(1, 200)], [detection(0, 5)]]
+        # Local IDs restart in the second segment; object 1 was missed just before the boundary
+        second = [[detection(0, 10), detection(1, 400, lab=(90.0, 0.0, 0.0))], [detection(2, 205)]]
+        stitched = Sharding.stitch_segments([first, second])
+        self.assertEqual([[d.object_id for d in detections] for detections in stitched], [[0, 1], [0], [0, 2], [1]])
+
+        # Object 1 is missing for the last frame before the boundary and the first one after it
+        def segments():
+            return ([[detection(0, 0), detection(1, 200)], [detection(0, 5)]],
+                    [[detection(0, 10)], [detection(0, 15), detection(1, 600)]])
+        stitched = Sharding.stitch_segments(segments(), window=1)
+        self.assertEqual([[d.object_id for d in detections] for detections in stitched], [[0, 1], [0], [0], [0, 1]])
+        stitched = Sharding.stitch_segments(segments(), window=1, reid_ttl=2)
+        self.assertEqual([[d.object_id for d in detections] for detections in stitched], [[0, 1], [0], [0], [0, 2]])
+
+    # Unit: Test estimating the boxes of frames skipped by the detection stride
+    def test_fill_skipped_frames(self):
+        def detection(object_id, x):
+            return Detection(0, x, 0, x + 40, 80, x + 20, 40, "person", (50.0, 0.0, 0.0), 0, 0, 0, 0.9, object_id)
+        tracked = [("f0", [detection(0, 0)]), ("f1", None), ("f2", [detection(0, 10), detection(1, 300)]), ("f3", None)]
+
+        offline = list(fill_skipped_frames(tracked, "offline"))
+        self.assertEqual([frame for frame, _ in offline], ["f0", "f1", "f2", "f3"])
+        self.assertEqual([d.x1 for d in offline[1][1]], [5])  # Halfway between the keyframes
+        self.assertTrue(offline[1][1][0].interpolated)
+        self.assertEqual([(d.object_id, d.x1) for d in offline[3][1]], [(0, 15), (1, 300)])  # Past the last keyframe
+
+        live = list(fill_skipped_frames(tracked, "live"))
+        self.assertEqual([d.x1 for d in live[1][1]], [0])  # No velocity known yet
+        self.assertEqual([(d.object_id, d.x1) for d in live[3][1]], [(0, 15), (1, 300)])
+        with self.assertRaises(ValueError):
+            list(fill_skipped_frames(tracked, "cubic"))
+
+    # Unit: Test that the motion model learns a constant velocity and keeps its rows consistent
+    def test_kalman_tracks(self):
+        tracks = KalmanTracks()
+        tracks.add([0, 1], np.array([[0, 0, 20, 40], [100, 100, 120, 140]]))
+        for step in range(1, 6):
+            tracks.predict()
+            tracks.update([0, 1], np.array([[10 * step, 0, 10 * step + 20, 40], [100, 100, 120, 140]]))
+        tracks.predict()
+        np.testing.assert_allclose(tracks.boxes([0, 1]), [[60, 0, 80, 40], [100, 100, 120, 140]], atol=2)
+
+        tracks.remove([0])
+        tracks.add([2], np.array([[50, 0, 70, 40]]), previous_boxes=np.array([[30, 0, 50, 40]]), frames=[2])
+        self.assertNotIn(0, tracks)
+        tracks.predict()
+        np.testing.assert_allclose(tracks.boxes([2, 1]), [[60, 0, 80, 40], [100, 100, 120, 140]], atol=2)
+
+    # Unit: Test that cached detections load back in the detect_frame format
+    def test_detection_cache(self):
+        frames_detections = [
+            ([0, 2], [np.array([0.9], np.float32), np.array([0.7], np.float32)],
+             [np.array([1, 2, 30, 40]), np.array([5, 6, 70, 80])], [(10.0, 20.0, 30.0, 0.0), (1.5, 2.5, 3.5, 0.0)]),
+            ([], [], [], []),
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            cache = DetectionCache(directory)
+            self.assertIsNone(cache.load("missing"))
+            cache.save("key", frames_detections)
+            loaded = cache.load("key")
+        self.assertEqual(len(loaded), 2)
+        class_ids, confidences, boxes, colours = loaded[0]
+        self.assertEqual(class_ids, [0, 2])
+        np.testing.assert_allclose(confidences, [[0.9], [0.7]], rtol=1e-6)
+        np.testing.assert_array_equal(boxes, [[1, 2, 30, 40], [5, 6, 70, 80]])
+        self.assertEqual(colours, [(10.0, 20.0, 30.0, 0.0), (1.5, 2.5, 3.5, 0.0)])
+        self.assertEqual(loaded[1], ([], [], [], []))
+
+    # Unit: Test that only files written by an AnnotationWriter are resumed
+    def test_annotation_writer_resume(self):
+        frames = [[{"objectID": "0", "class": "person"}], [], [{"objectID": "3", "class": "car"}]]
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = os.path.join(directory, "annotations.json")
+            with AnnotationWriter(json_path) as writer:
+                for frame in frames[:2]:
+                    writer.write(frame)
+            # A closed file continues after its last frame
+            with AnnotationWriter(json_path, resume=True) as writer:
+                self.assertEqual((writer.frame_count, writer.max_object_id), (2, 0))
+                writer.write(frames[2])
+            with open(json_path) as json_file:
+                self.assertEqual(json.load(json_file), frames)
+
+            # An indented file, as saved by the app, is refused and left unchanged
+            with open(json_path, "w") as json_file:
+                json.dump(frames, json_file, indent=4)
+            with open(json_path, "rb") as json_file:
+                saved = json_file.read()
+            with self.assertRaises(ValueError):
+                AnnotationWriter(json_path, resume=True)
+            with open(json_path, "rb") as json_file:
+                self.assertEqual(json_file.read(), saved)
+
+    # Unit: Test that a writer given a .npz path streams to a JSON part file and converts it on close
+    def test_annotation_writer_npz(self):
+        frames = [[{"objectID": "0", "class": "person", "bounding_box": {"x1": 1, "y1": 2, "x2": 30, "y2": 40},
+                    "colours": {"B": 10, "G": 20, "R": 30}, "confidence": "0.9"}], []]
+        with tempfile.TemporaryDirectory() as directory:
+            npz_path = os.path.join(directory, "annotations.npz")
+            # Interrupted: only the part file exists, and the run resumes from it
+            with self.assertRaises(RuntimeError):
+                with AnnotationWriter(npz_path) as writer:
+                    writer.write(frames[0])
+                    raise RuntimeError()
+            self.assertFalse(os.path.exists(npz_path))
+            with AnnotationWriter(npz_path, resume=True) as writer:
+                self.assertEqual(writer.frame_count, 1)
+                writer.write(frames[1])
+            self.assertEqual(os.listdir(directory), ["annotations.npz"])
+            self.assertEqual(list(open_annotations(npz_path)), frames)
+            # A finished .npz file is not written over by a resumed run
+            with self.assertRaises(ValueError):
+                AnnotationWriter(npz_path, resume=True)
+
+    # Unit: Test tracking detections without a video or model
+    def test_track(self):
+        def frame(*xs):
+            return ([0] * len(xs), [np.array([0.9], np.float32)] * len(xs),
+                    [np.array([x, 0, x + 40, 80]) for x in xs], [(200.0, 30.0, 30.0, 0.0)] * len(xs))
+        detections_per_frame = [frame(0, 300), frame(15, 300), None, frame(45, 300)]
+
+        annotations = track(detections_per_frame, class_labels=["person"])
+        self.assertEqual([[a["objectID"] for a in f] for f in annotations], [["0", "1"], ["0", "1"], ["0", "1"], ["0", "1"]])
+        self.assertEqual(annotations[0][0]["class"], "person")
+        self.assertTrue(annotations[2][0]["interpolated"])
+        # The object moves 15 px per frame, beyond a 10 px gate without motion prediction
+        static = track(detections_per_frame, TrackingParams(max_distance=10, reappear_delta_e=0, motion="static"))
+        self.assertEqual([a["objectID"] for a in static[1]], ["2", "1"])
+
+        # Object 0 is missed in the third detected frame and found again in the fourth, with a
+        # stride of 2: it was gone for 2 prediction steps, although 4 frames passed
+        reappearances = []
+        class RecordingTracks(KalmanTracks):
+            def add(self, object_ids, boxes, previous_boxes=None, frames=None):
+                if previous_boxes is not None and len(object_ids):
+                    reappearances.append((list(object_ids), list(frames)))
+                super().add(object_ids, boxes, previous_boxes, frames)
+        strided = [frame(0, 300), None, frame(10, 300), None, frame(300), None, frame(30, 300)]
+        with patch.object(Tracker, "KalmanTracks", RecordingTracks):
+            annotations = track(strided, class_labels=["person"])
+        self.assertEqual([a["objectID"] for a in annotations[6]], ["0", "1"])
+        self.assertEqual(reappearances, [([0], [2])])
+
+    # Unit: Test one-to-one association engines
+    def test_associate(self):
+        cost = np.array([[1.0, 2.0], [1.5, 10.0]])
+        gate = np.array([[True, True], [True, False]])
+        # Greedy takes the cheapest pair first, the optimal assignment minimises the total
+        self.assertEqual(associate(cost, gate, "greedy"), [(0, 0)])
+        self.assertEqual(associate(cost, gate, "hungarian"), [(0, 1), (1, 0)])
+        self.assertEqual(associate(cost, np.zeros((2, 2), dtype=bool)), [])
+
+    # Unit: Test that the matching cost rejects thresholds it cannot scale by
+    def test_association_cost(self):
+        cost = association_cost(np.array([[100.0, 0.0]]), np.array([[0.0, 40.0]]), np.array([[0.0, 5.0]]))
+        np.testing.assert_allclose(cost, [[0.0, 2.5]])
+        for thresholds in ({"max_distance": 0}, {"max_delta_e": 0}, {"max_distance": -5}):
+            with self.assertRaises(ValueError):
+                association_cost(np.zeros((1, 1)), np.zeros((1, 1)), np.zeros((1, 1)), **thresholds)
+        with self.assertRaises(ValueError):
+            next(Tracker.track_detections(iter([]), ["person"], [(0, 0, 0)], TrackingParams(max_distance=0)))
+
+    # Unit: Test vectorised CIEDE2000 against the scalar version
+    def test_delta_e_cie2000_matrix(self):
+        lab1 = [(53.2, 0.0, 0.0), (50.0, 2.68, -79.78), (61.3, -30.1, 40.7)]
+        lab2 = [(50.0, 0.0, -82.75), (53.2, 0.0, 0.0)]
+        matrix = delta_e_cie2000_matrix(lab1, lab2)
+        self.assertEqual(matrix.shape, (3, 2))
+        for i, colour1 in enumerate(lab1):
+            for j, colour2 in enumerate(lab2):
+                expected = ObjectTracking.delta_e_cie2000(LabColor(*colour1), LabColor(*colour2))
+                self.assertAlmostEqual(matrix[i, j], expected, delta=1e-9)
+
     # Unit:Test bounding box parsing
     def test_parse_results(self):
         class_labels = {0: "person"}
         class_colours = {0: (255, 0, 0)}
-        result = ObjectTracking.parse_results(0, [0.9], [10, 10, 50, 50], [255, 0, 0], class_labels, class_colours)
-        self.assertEqual(result[6], "person")
-        self.assertEqual(result[11], 0.9)
+        result = ObjectTracking.parse_results(0, [0.9], [10, 10, 50, 50], [255, 0, 0], class_labels, class_colours, detection_id=3)
+        self.assertEqual(result.class_name, "person")
+        self.assertEqual(result.confidence, 0.9)
+        self.assertEqual(result.centre, (30, 30))
+        self.assertEqual(result.detection_id, 3)
+        self.assertIsNone(result.object_id)
 
     # Integration test: YOLO integration
     def test_yolo_integration(self):
@@ -47,12 +329,122 @@ class TestObjectTracking(unittest.TestCase):
         class_ids, scores, boxes, average_colours = model.detect_frame(sample_frame)
         self.assertGreater(len(class_ids), 0)
 
+    # Integration test: batched inference matches single frame inference
+    def test_detect_batch(self):
+        sample_frame = cv2.imread('Test_Scripts/Test_resources/test_image.jpg')
+        model = YOLO_model()
+        single = model.detect_frame(sample_frame)
+        batch = model.detect_batch([sample_frame, sample_frame])
+        self.assertEqual(len(batch), 2)
+        for class_ids, scores, boxes, average_colours in batch:
+            self.assertEqual(class_ids, single[0])
+            self.assertEqual([box.tolist() for box in boxes], [box.tolist() for box in single[2]])
+
+    # Integration test: batch size does not change the tracking results
+    def test_media_capture_batch_size(self):
+        video_path = 'Test_Scripts/Test_resources/test_video.mp4'
+        _, annotations = ObjectTracking.media_capture(video_path)
+        _, batched_annotations = ObjectTracking.media_capture(video_path, batch_size=4)
+        self.assertEqual(batched_annotations, annotations)
+
     # Integration test: tracking across frames
     def test_object_tracking(self):
         processed_frames, annotations = ObjectTracking.media_capture('Test_Scripts/Test_resources/test_video.mp4')
         self.assertGreater(len(processed_frames), 0)
         self.assertGreater(len(annotations), 0)
 
+    # Integration test: streaming yields the same annotations frame by frame
+    def test_media_capture_stream(self):
+        video_path = 'Test_Scripts/Test_resources/test_video.mp4'
+        _, annotations = ObjectTracking.media_capture(video_path)
+        streamed = list(ObjectTracking.media_capture_stream(video_path))
+        self.assertEqual([index for index, _, _ in streamed], list(range(len(annotations))))
+        self.assertEqual([frame_annotations for _, _, frame_annotations in streamed], annotations)
+
+    # Integration: Test that the threaded pipeline matches the sequential stream
+    def test_media_capture_pipeline(self):
+        video_path = 'Test_Scripts/Test_resources/test_video.mp4'
+        _, annotations = ObjectTracking.media_capture(video_path)
+        stats = {}
+        pipelined = list(Pipeline.media_capture_pipeline(video_path, batch_size=4, queue_size=2, stats=stats))
+        self.assertEqual([index for index, _, _ in pipelined], list(range(len(annotations))))
+        self.assertEqual([frame_annotations for _, _, frame_annotations in pipelined], annotations)
+        self.assertEqual({name: stage.frames for name, stage in stats.items()},
+                         {name: len(annotations) for name in Pipeline.STAGES})
+
+        # With a stride, only keyframes are detected and the others are filled in as when streaming
+        for interpolation in ("offline", "live"):
+            pipelined = Pipeline.media_capture_pipeline(video_path, batch_size=2, stats=stats, stride=3,
+                                                        interpolation=interpolation)
+            streamed = ObjectTracking.media_capture_stream(video_path, stride=3, interpolation=interpolation)
+            self.assertEqual([frame_annotations for _, _, frame_annotations in pipelined],
+                             [frame_annotations for _, _, frame_annotations in streamed])
+            self.assertEqual(stats["inference"].frames, len(range(0, len(annotations), 3)))
+
+    # Integration: Test that a single-segment worker run matches the sequential run
+    def test_media_capture_sharded(self):
+        video_path = 'Test_Scripts/Test_resources/test_video.mp4'
+        _, annotations = ObjectTracking.media_capture(video_path)
+        self.assertEqual(Sharding.media_capture_sharded(video_path, workers=1, segment_count=1), annotations)
+        sharded = Sharding.media_capture_sharded(video_path, workers=2, segment_count=3)
+        self.assertEqual([[a["bounding_box"] for a in frame] for frame in sharded],
+                         [[a["bounding_box"] for a in frame] for frame in annotations])
+        # The first segment is tracked as in a single run, and stitching re-identifies the objects
+        # that cross a boundary; only a few of them can be matched differently at each boundary
+        first_length = Sharding.split_segments(len(annotations), 3)[0][1]
+        self.assertEqual(sharded[:first_length], annotations[:first_length])
+        for frame in sharded:
+            self.assertEqual(len({a["objectID"] for a in frame}), len(frame))
+        sharded_objects = len({a["objectID"] for frame in sharded for a in frame})
+        single_objects = len({a["objectID"] for frame in annotations for a in frame})
+        self.assertLessEqual(abs(sharded_objects - single_objects), 2 * 2)  # Two boundaries
+
+    # Integration: Test that a detection stride keeps the detected frames and flags the others
+    def test_media_capture_stride(self):
+        video_path = 'Test_Scripts/Test_resources/test_video.mp4'
+        _, annotations = ObjectTracking.media_capture(video_path)
+        _, strided = ObjectTracking.media_capture(video_path, stride=3)
+        self.assertEqual(len(strided), len(annotations))
+        for index, frame_annotations in enumerate(strided):
+            self.assertEqual(any(a.get("interpolated", False) for a in frame_annotations), 
+                             index % 3 != 0 and len(frame_annotations) > 0)
+        self.assertEqual([[a["bounding_box"] for a in frame] for frame in strided[::3]],
+                         [[a["bounding_box"] for a in frame] for frame in annotations[::3]])
+
+    # Integration: Test that re-tracking from cached detections matches a fresh run
+    def test_media_capture_detection_cache(self):
+        video_path = 'Test_Scripts/Test_resources/test_video.mp4'
+        _, annotations = ObjectTracking.media_capture(video_path)
+        with tempfile.TemporaryDirectory() as directory:
+            cache = DetectionCache(directory)
+            _, first = ObjectTracking.media_capture(video_path, detection_cache=cache)
+            self.assertEqual(len(os.listdir(directory)), 1)
+            _, cached = ObjectTracking.media_capture(video_path, detection_cache=cache)
+        self.assertEqual(first, annotations)
+        self.assertEqual(cached, annotations)
+
+    # Integration: Test that streamed annotations are valid JSON and an interrupted run resumes
+    def test_media_capture_to_file(self):
+        video_path = 'Test_Scripts/Test_resources/test_video.mp4'
+        _, annotations = ObjectTracking.media_capture(video_path)
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = os.path.join(directory, "annotations.json")
+            self.assertEqual(ObjectTracking.media_capture_to_file(video_path, json_path), len(annotations))
+            with open(json_path) as json_file:
+                self.assertEqual(json.load(json_file), annotations)
+
+            # Keep the first 10 frames and a partly written 11th one
+            with open(json_path, "rb") as json_file:
+                lines = json_file.readlines()
+            with open(json_path, "wb") as json_file:
+                json_file.writelines(lines[:10])
+                json_file.write(lines[10][:20])
+            ObjectTracking.media_capture_to_file(video_path, json_path, resume=True)
+            with open(json_path) as json_file:
+                resumed = json.load(json_file)
+        self.assertEqual(len(resumed), len(annotations))
+        self.assertEqual(resumed[:10], annotations[:10])
+
     # End-to-End test: full pipeline
     def test_full_pipeline(self):
         video_path = 'Test_Scripts/Test_resources/test_video.mp4'